@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData
+from vnpy.trader.utility import ZoneInfo
+
+from vnpy_datamanager.columns import (
+    BAR_COLUMNS,
+    parse_datetimes,
+    localize_datetimes,
+    load_csv_columns,
+    split_csv_fields,
+    read_csv_columns,
+    columns_to_bars
+)
+
+
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+NEW_YORK_TZ = ZoneInfo("America/New_York")
+
+HEADS: Dict[str, str] = {name: name for name in BAR_COLUMNS}
+
+
+def test_parse_datetimes() -> None:
+    """"""
+    values: List[str] = ["2024-01-02 09:00:00", "2024-01-02 09:01:00"]
+
+    # Fixed layout parsed in bulk is the same as strptime
+    assert parse_datetimes(values, "%Y-%m-%d %H:%M:%S", CHINA_TZ) == [
+        datetime(2024, 1, 2, 9, 0, tzinfo=CHINA_TZ),
+        datetime(2024, 1, 2, 9, 1, tzinfo=CHINA_TZ),
+    ]
+
+    # Other formats and ISO strings without format
+    assert parse_datetimes(["02/01/2024 09:00"], "%d/%m/%Y %H:%M", CHINA_TZ) == [
+        datetime(2024, 1, 2, 9, 0, tzinfo=CHINA_TZ)
+    ]
+    assert parse_datetimes(["2024-01-02T09:00:00"], "", CHINA_TZ) == [
+        datetime(2024, 1, 2, 9, 0, tzinfo=CHINA_TZ)
+    ]
+
+    # Non zero-padded values fall back to strptime
+    assert parse_datetimes(["2024-1-2 9:00:00"], "%Y-%m-%d %H:%M:%S", CHINA_TZ) == [
+        datetime(2024, 1, 2, 9, 0, tzinfo=CHINA_TZ)
+    ]
+
+
+def test_localize_datetimes_across_dst() -> None:
+    """"""
+    values: np.ndarray = np.array(["2024-03-10T01:00", "2024-03-10T03:00"], dtype="M8[s]")
+    dts: List[datetime] = localize_datetimes(values, NEW_YORK_TZ)
+
+    assert dts == [
+        datetime(2024, 3, 10, 1, 0, tzinfo=NEW_YORK_TZ),
+        datetime(2024, 3, 10, 3, 0, tzinfo=NEW_YORK_TZ),
+    ]
+    assert [dt.utcoffset().total_seconds() for dt in dts] == [-5 * 3600, -4 * 3600]
+
+
+def test_load_csv_columns() -> None:
+    """"""
+    lines: List[str] = [
+        "2024-01-02 09:00:00,1,2,0.5,1.5,10\n",
+        "2024-01-02 09:01:00,1.5,2.5,1,2,20\n",
+    ]
+    indexes: Dict[str, int] = {"datetime": 0, "open": 1, "high": 2, "low": 3, "close": 4, "volume": 5}
+
+    columns: Dict[str, list] = load_csv_columns(lines, indexes, "%Y-%m-%d %H:%M:%S", CHINA_TZ)
+
+    assert columns["datetime"][1] == datetime(2024, 1, 2, 9, 1, tzinfo=CHINA_TZ)
+    assert columns["close"] == [1.5, 2.0]
+    assert columns["volume"] == [10.0, 20.0]
+    assert columns["turnover"] == [0.0, 0.0]
+
+    # Quoted values are left to csv.reader
+    assert load_csv_columns(['"2024-01-02 09:00:00",1,2,0.5,1.5,10\n'], indexes, "", CHINA_TZ) is None
+
+
+def test_split_csv_fields() -> None:
+    """"""
+    assert split_csv_fields(["a,1\n", "b,2\n"], 2) == [["a", "b"], ["1", "2"]]
+    assert split_csv_fields(['"a,x",1\n', "b,2\n"], 2) == [["a,x", "b"], ["1", "2"]]
+
+
+def test_read_csv_columns(tmp_path) -> None:
+    """"""
+    file_path: str = str(tmp_path.joinpath("bars.csv"))
+
+    with open(file_path, "w") as f:
+        f.write("volume,close,low,high,open,datetime\n")
+        for i in range(5):
+            f.write(f"{i},{i + 1.5},{i + 0.5},{i + 2},{i + 1},2024-01-02 09:0{i}:00\n")
+
+    batches: List[Dict[str, list]] = list(
+        read_csv_columns(file_path, HEADS, "%Y-%m-%d %H:%M:%S", CHINA_TZ, 2)
+    )
+
+    assert [len(batch["datetime"]) for batch in batches] == [2, 2, 1]
+    assert batches[-1]["open"] == [5.0]
+    assert batches[-1]["open_interest"] == [0.0]
+
+    bars: List[BarData] = columns_to_bars(batches[0], "rb2405", Exchange.SHFE, Interval.MINUTE)
+
+    assert bars[1].datetime == datetime(2024, 1, 2, 9, 1, tzinfo=CHINA_TZ)
+    assert (bars[1].open_price, bars[1].high_price, bars[1].low_price, bars[1].close_price) == (2, 3, 1.5, 2.5)
+    assert bars[1].vt_symbol == "rb2405.SHFE"
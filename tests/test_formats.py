@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.database import DB_TZ
+from vnpy.trader.object import BarData
+
+from vnpy_datamanager.columns import BAR_COLUMNS, columns_to_bars
+from vnpy_datamanager.formats import (
+    BAR_WRITERS,
+    BaseBarWriter,
+    bars_to_array,
+    array_to_bars,
+    get_bar_reader,
+    read_bar_file
+)
+
+
+HEADS: Dict[str, str] = {name: name for name in BAR_COLUMNS}
+
+FORMAT_NAMES: List[str] = ["CSV", "NumPy", "Parquet", "Feather"]
+
+
+def make_bars(count: int) -> List[BarData]:
+    """"""
+    start: datetime = datetime(2024, 1, 2, 9, 0, tzinfo=DB_TZ)
+
+    return [
+        BarData(
+            symbol="rb2405",
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            open_price=3800 + i,
+            high_price=3801.5 + i,
+            low_price=3799 + i,
+            close_price=3800.2 + i,
+            volume=10 * i,
+            turnover=1e6 * i,
+            open_interest=1000.5,
+            gateway_name="DB"
+        )
+        for i in range(count)
+    ]
+
+
+def get_values(bars: List[BarData]) -> List[tuple]:
+    """"""
+    return [
+        (
+            bar.datetime,
+            bar.open_price,
+            bar.high_price,
+            bar.low_price,
+            bar.close_price,
+            bar.volume,
+            bar.turnover,
+            bar.open_interest,
+        )
+        for bar in bars
+    ]
+
+
+@pytest.mark.parametrize("format_name", FORMAT_NAMES)
+def test_round_trip(tmp_path, format_name: str) -> None:
+    """"""
+    if format_name not in BAR_WRITERS:
+        pytest.skip(f"{format_name} is not available")
+
+    writer_class: type = BAR_WRITERS[format_name]
+    file_path: str = str(tmp_path.joinpath("rb2405.SHFE" + writer_class.suffix))
+
+    bars: List[BarData] = make_bars(250)
+
+    writer: BaseBarWriter = writer_class(file_path, "rb2405", Exchange.SHFE, Interval.MINUTE)
+    for i in range(0, len(bars), 100):
+        writer.write(bars[i: i + 100])
+    writer.close()
+
+    assert get_bar_reader(file_path).format_name == format_name
+
+    columns: Dict[str, list] = read_bar_file(
+        file_path, HEADS, "%Y-%m-%d %H:%M:%S", str(DB_TZ), 64
+    )
+    result: List[BarData] = columns_to_bars(columns, "rb2405", Exchange.SHFE, Interval.MINUTE)
+
+    assert get_values(result) == get_values(bars)
+
+
+def test_unsupported_format(tmp_path) -> None:
+    """"""
+    file_path: str = str(tmp_path.joinpath("rb2405.SHFE.txt"))
+
+    assert get_bar_reader(file_path) is None
+
+    with pytest.raises(ValueError):
+        read_bar_file(file_path, HEADS, "", str(DB_TZ), 64)
+
+
+def test_array_round_trip() -> None:
+    """"""
+    bars: List[BarData] = make_bars(10)
+    data: np.ndarray = bars_to_array(bars)
+
+    assert data["datetime"][0] == np.datetime64("2024-01-02T09:00:00")
+    assert get_values(array_to_bars(data, "rb2405", Exchange.SHFE, Interval.MINUTE)) == get_values(bars)
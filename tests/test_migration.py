@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+from threading import Event as ThreadEvent, Lock
+from typing import List
+
+import pytest
+
+from vnpy.event import EventEngine
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.database import BaseDatabase, BarOverview, DB_TZ
+from vnpy.trader.object import BarData
+
+import vnpy_datamanager.engine as engine_module
+from vnpy_datamanager.engine import ManagerEngine, MigrationResult, open_database, get_database_key
+
+
+# Daily bars are paged by 3650 days, so the series is copied in three windows
+BAR_COUNT: int = 8000
+
+
+class StopAfter(ThreadEvent):
+    """
+    Cancel flag which is set after being checked a number of times.
+    """
+
+    def __init__(self, count: int) -> None:
+        """"""
+        super().__init__()
+        self.count: int = count
+
+    def is_set(self) -> bool:
+        """"""
+        self.count -= 1
+        return self.count < 0
+
+
+def make_bars(start: datetime, count: int, symbol: str = "rb", exchange: Exchange = Exchange.SHFE) -> List[BarData]:
+    """"""
+    return [
+        BarData(
+            symbol=symbol,
+            exchange=exchange,
+            datetime=start + timedelta(days=i),
+            interval=Interval.DAILY,
+            open_price=100 + i,
+            high_price=101 + i,
+            low_price=99 + i,
+            close_price=100.5 + i,
+            volume=i,
+            gateway_name="DB"
+        )
+        for i in range(count)
+    ]
+
+
+def get_count(database: BaseDatabase, symbol: str = "rb") -> int:
+    """"""
+    overviews: List[BarOverview] = [
+        overview for overview in database.get_bar_overview() if overview.symbol == symbol
+    ]
+    return overviews[0].count if overviews else 0
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """"""
+    # Keep checkpoints away from the checkpoint file of the user
+    monkeypatch.setattr(engine_module, "CHECKPOINT_FILENAME", str(tmp_path.joinpath("checkpoint.json")))
+
+    event_engine: EventEngine = EventEngine()
+    main_engine: MainEngine = MainEngine(event_engine)
+    engine: ManagerEngine = main_engine.add_engine(ManagerEngine)
+
+    yield engine
+
+    main_engine.close()
+
+
+@pytest.fixture
+def source_settings(tmp_path) -> dict:
+    """"""
+    return {"database.name": "sqlite", "database.database": str(tmp_path.joinpath("source.db"))}
+
+
+@pytest.fixture
+def target_settings(tmp_path) -> dict:
+    """"""
+    return {"database.name": "sqlite", "database.database": str(tmp_path.joinpath("target.db"))}
+
+
+@pytest.fixture
+def source(source_settings) -> BaseDatabase:
+    """"""
+    database: BaseDatabase = open_database(source_settings)
+    database.save_bar_data(make_bars(datetime(2000, 1, 3, tzinfo=DB_TZ), BAR_COUNT))
+    database.save_bar_data(make_bars(datetime(2020, 1, 2, tzinfo=DB_TZ), 10, "IF", Exchange.CFFEX))
+    return database
+
+
+def test_first_run(engine, source, source_settings, target_settings) -> None:
+    """"""
+    results: List[MigrationResult] = engine.migrate_bar_data(target_settings, source_settings, 2)
+
+    assert sorted(result.count for result in results) == [10, BAR_COUNT]
+    assert not any(result.error for result in results)
+
+    target: BaseDatabase = open_database(target_settings)
+    assert get_count(target) == BAR_COUNT
+    assert get_count(target, "IF") == 10
+
+    bars: List[BarData] = target.load_bar_data(
+        "rb", Exchange.SHFE, Interval.DAILY, datetime(2000, 1, 1), datetime(2030, 1, 1)
+    )
+    assert len(bars) == BAR_COUNT
+    assert bars[-1].close_price == 100.5 + BAR_COUNT - 1
+
+    # Nothing new in source, so nothing is copied again
+    results = engine.migrate_bar_data(target_settings, source_settings, 2)
+    assert sum(result.count for result in results) == 0
+
+
+def test_resume(engine, source, source_settings, target_settings) -> None:
+    """"""
+    target: BaseDatabase = open_database(target_settings)
+    target_key: str = get_database_key(target_settings)
+    overview: BarOverview = [o for o in source.get_bar_overview() if o.symbol == "rb"][0]
+
+    # Interrupted after the first window
+    result: MigrationResult = engine.migrate_series_data(
+        source, target, target_key, Lock(), overview, False, True, StopAfter(1)
+    )
+    copied: int = result.count
+
+    assert not result.error
+    assert 0 < copied < BAR_COUNT
+    assert get_count(target) == copied
+
+    # Only bars after the checkpoint are copied
+    results: List[MigrationResult] = engine.migrate_bar_data(target_settings, source_settings, 2)
+    counts: dict = {result.symbol: result.count for result in results}
+
+    assert counts == {"rb": BAR_COUNT - copied, "IF": 10}
+    assert get_count(target) == BAR_COUNT
+
+    # New bars in source are copied incrementally
+    source.save_bar_data(make_bars(datetime(2000, 1, 3, tzinfo=DB_TZ) + timedelta(days=BAR_COUNT), 5))
+
+    results = engine.migrate_bar_data(target_settings, source_settings, 2)
+    counts = {result.symbol: result.count for result in results}
+
+    assert counts == {"rb": 5, "IF": 0}
+    assert get_count(target) == BAR_COUNT + 5
+
+
+def test_restart(engine, source, source_settings, target_settings) -> None:
+    """"""
+    engine.migrate_bar_data(target_settings, source_settings, 2)
+
+    # Everything is copied again, overwriting bars already stored
+    results: List[MigrationResult] = engine.migrate_bar_data(
+        target_settings, source_settings, 2, resume=False
+    )
+    counts: dict = {result.symbol: result.count for result in results}
+    assert counts == {"rb": BAR_COUNT, "IF": 10}
+
+    target: BaseDatabase = open_database(target_settings)
+    assert get_count(target) == BAR_COUNT
+    assert get_count(target, "IF") == 10
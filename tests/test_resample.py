@@ -0,0 +1,104 @@
+from datetime import time
+
+import numpy as np
+
+from vnpy.trader.constant import Interval
+from vnpy.trader.utility import ZoneInfo
+
+from vnpy_datamanager.formats import BAR_DTYPE
+from vnpy_datamanager.resample import can_resample, convert_wall_clock, resample_array
+from vnpy_datamanager.session import TradingSession
+
+
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+
+
+def make_array(datetimes: list) -> np.ndarray:
+    """"""
+    data: np.ndarray = np.zeros(len(datetimes), dtype=BAR_DTYPE)
+    data["datetime"] = np.array(datetimes, dtype="M8[s]")
+
+    values: np.ndarray = np.arange(len(datetimes), dtype=float)
+    data["open"] = 100 + values
+    data["high"] = 101 + values
+    data["low"] = 99 + values
+    data["close"] = 100.5 + values
+    data["volume"] = 1
+    data["turnover"] = 10
+    data["open_interest"] = values
+
+    return data
+
+
+def test_can_resample() -> None:
+    """"""
+    assert can_resample(Interval.MINUTE, Interval.DAILY)
+    assert not can_resample(Interval.DAILY, Interval.HOUR)
+    assert not can_resample(Interval.TICK, Interval.MINUTE)
+
+
+def test_convert_wall_clock() -> None:
+    """"""
+    dts: np.ndarray = np.array(["2024-01-02T01:00"], dtype="M8[s]")
+    result: np.ndarray = convert_wall_clock(dts, ZoneInfo("UTC"), CHINA_TZ)
+
+    assert result[0] == np.datetime64("2024-01-02T09:00")
+
+
+def test_resample_hour() -> None:
+    """"""
+    session: TradingSession = TradingSession([(time(9, 0), time(15, 0))], CHINA_TZ)
+    data: np.ndarray = make_array(["2024-01-02T09:00", "2024-01-02T09:59", "2024-01-02T10:00"])
+
+    result: np.ndarray = resample_array(data, Interval.HOUR, session, CHINA_TZ)
+
+    assert result["datetime"].tolist() == [
+        np.datetime64("2024-01-02T09:00", "s").item(),
+        np.datetime64("2024-01-02T10:00", "s").item(),
+    ]
+    assert result["open"].tolist() == [100, 102]
+    assert result["high"].tolist() == [102, 103]
+    assert result["low"].tolist() == [99, 101]
+    assert result["close"].tolist() == [101.5, 102.5]
+    assert result["volume"].tolist() == [2, 1]
+    assert result["turnover"].tolist() == [20, 10]
+    assert result["open_interest"].tolist() == [1, 2]
+
+
+def test_resample_daily_with_night_session() -> None:
+    """"""
+    session: TradingSession = TradingSession(
+        [(time(21, 0), time(2, 30)), (time(9, 0), time(15, 0))],
+        CHINA_TZ,
+        daily_end=time(15, 0)
+    )
+
+    # Friday night belongs to Monday, bars after Monday 15:00 to Tuesday
+    data: np.ndarray = make_array([
+        "2024-01-05T21:00",
+        "2024-01-06T01:00",
+        "2024-01-08T09:00",
+        "2024-01-08T21:00",
+    ])
+
+    result: np.ndarray = resample_array(data, Interval.DAILY, session, CHINA_TZ)
+
+    assert result["datetime"].astype("M8[D]").tolist() == [
+        np.datetime64("2024-01-08").item(),
+        np.datetime64("2024-01-09").item(),
+    ]
+    assert result["volume"].tolist() == [3, 1]
+
+
+def test_resample_weekly() -> None:
+    """"""
+    session: TradingSession = TradingSession([(time(9, 0), time(15, 0))], CHINA_TZ)
+    data: np.ndarray = make_array(["2024-01-03T10:00", "2024-01-05T10:00", "2024-01-08T10:00"])
+
+    result: np.ndarray = resample_array(data, Interval.WEEKLY, session, CHINA_TZ)
+
+    assert result["datetime"].astype("M8[D]").tolist() == [
+        np.datetime64("2024-01-01").item(),
+        np.datetime64("2024-01-08").item(),
+    ]
+    assert len(resample_array(data[:0], Interval.WEEKLY, session, CHINA_TZ)) == 0
@@ -0,0 +1,70 @@
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+
+from vnpy_datamanager.formats import BAR_DTYPE
+from vnpy_datamanager.snapshot import SnapshotReader, SnapshotWriter, encode_chunk, decode_chunk
+
+
+def make_array(count: int) -> np.ndarray:
+    """"""
+    data: np.ndarray = np.zeros(count, dtype=BAR_DTYPE)
+    data["datetime"] = np.datetime64("2024-01-02T09:00", "s") + np.arange(count) * 60
+
+    steps: np.ndarray = np.random.default_rng(0).integers(-5, 6, count)
+    data["open"] = 3800 + np.cumsum(steps) * 0.2
+    data["high"] = data["open"] + 1
+    data["low"] = data["open"] - 1
+    data["close"] = data["open"] + 0.4
+    data["volume"] = np.arange(count)
+    data["turnover"] = np.arange(count) * 1234.5678
+    data["open_interest"] = 1e5
+
+    return data
+
+
+def test_encode_decode() -> None:
+    """"""
+    data: np.ndarray = make_array(1000)
+
+    # Values which are no short decimals are stored by bit pattern
+    data["turnover"][3] = np.pi
+    data["low"][5] = -0.0
+
+    blob: bytes = encode_chunk(data)
+    result: np.ndarray = decode_chunk(blob)
+
+    assert len(blob) < data.nbytes / 4
+    assert result.tobytes() == data.tobytes()
+
+
+def test_encode_decode_special_values() -> None:
+    """"""
+    data: np.ndarray = make_array(3)
+    data["close"] = [np.nan, np.inf, 1e300]
+
+    assert decode_chunk(encode_chunk(data)).tobytes() == data.tobytes()
+    assert len(decode_chunk(encode_chunk(data[:0]))) == 0
+
+
+def test_snapshot_file(tmp_path) -> None:
+    """"""
+    path: str = str(tmp_path.joinpath("snapshot.zip"))
+    data: np.ndarray = make_array(250)
+
+    writer: SnapshotWriter = SnapshotWriter(path, chunk_size=100)
+    assert writer.write_series("rb2405", Exchange.SHFE, Interval.MINUTE, [data[:30], data[30:]]) == 250
+    assert writer.write_series("IF2401", Exchange.CFFEX, Interval.MINUTE, []) == 0
+    writer.close()
+
+    with SnapshotReader(path) as reader:
+        assert reader.count == 250
+        assert len(reader.series) == 1
+
+        info: dict = reader.series[0]
+        assert (info["symbol"], info["exchange"], info["interval"]) == ("rb2405", Exchange.SHFE, Interval.MINUTE)
+        assert len(info["chunks"]) == 3
+
+        result: np.ndarray = np.concatenate([reader.read_chunk(name) for name in info["chunks"]])
+
+    assert result.tobytes() == data.tobytes()
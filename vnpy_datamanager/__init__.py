@@ -22,18 +22,11 @@
 
 from pathlib import Path
 
-import importlib_metadata
 from vnpy.trader.app import BaseApp
 
 from .engine import APP_NAME, ManagerEngine
 
 
-try:
-    __version__ = importlib_metadata.version("vnpy_datamanager")
-except importlib_metadata.PackageNotFoundError:
-    __version__ = "dev"
-
-
 class DataManagerApp(BaseApp):
     """"""
 
@@ -44,3 +37,24 @@ class DataManagerApp(BaseApp):
     engine_class: ManagerEngine = ManagerEngine
     widget_name: str = "ManagerWidget"
     icon_name: str = str(app_path.joinpath("ui", "manager.ico"))
+
+
+def __getattr__(name: str) -> str:
+    """
+    Look up package version only when __version__ is accessed.
+    """
+    if name != "__version__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        from importlib_metadata import version, PackageNotFoundError
+
+    try:
+        value: str = version("vnpy_datamanager")
+    except PackageNotFoundError:
+        value: str = "dev"
+
+    globals()["__version__"] = value
+    return value
@@ -0,0 +1,380 @@
+import os
+import json
+import struct
+from glob import glob
+from datetime import datetime
+from threading import Lock
+from time import time
+from typing import BinaryIO, Dict, Optional
+from uuid import uuid4
+
+import numpy as np
+
+from vnpy.trader.constant import Interval, Exchange
+from vnpy.trader.database import BarOverview
+from vnpy.trader.utility import get_folder_path
+
+from .formats import BAR_DTYPE
+
+
+# Default disk space limit of cached bar files
+CACHE_SIZE: int = 1024 ** 3
+
+CACHE_FOLDER: str = "datamanager_cache"
+CACHE_INDEX: str = "index.json"
+
+# Space reserved for NumPy file header when bars are written page by page
+HEADER_SIZE: int = 512
+
+
+def get_npy_header(count: int) -> bytes:
+    """
+    Get NumPy file format 1.0 header of count bars, padded to HEADER_SIZE.
+    """
+    header: str = repr({
+        "descr": np.lib.format.dtype_to_descr(BAR_DTYPE),
+        "fortran_order": False,
+        "shape": (count,),
+    })
+
+    return (
+        np.lib.format.magic(1, 0)
+        + struct.pack("<H", HEADER_SIZE - 10)
+        + header.ljust(HEADER_SIZE - 11).encode("latin1")
+        + b"\n"
+    )
+
+
+class BarCache:
+    """
+    Read-through cache of bar data on local disk.
+
+    Each series is kept as a NumPy file of BAR_DTYPE records together with
+    the time range it covers, and is memory mapped when read. Files are
+    written page by page through BarCacheWriter. Once total file size
+    exceeds max_size, least recently used series are evicted. All
+    datetimes are naive in DB_TZ.
+
+    Entries also record the overview of the series when saved, and are
+    dropped on load if the overview has changed since then, e.g. by
+    another process writing into the database. Access times are kept in
+    memory and only written into the index on save or eviction.
+    """
+
+    def __init__(self, path: str = "", max_size: int = CACHE_SIZE) -> None:
+        """"""
+        self.path: str = path or str(get_folder_path(CACHE_FOLDER))
+        self.max_size: int = max_size
+        self.lock: Lock = Lock()
+
+        self.entries: Dict[str, dict] = self.load_index()
+
+        # Remove temp files of writers not finished in earlier sessions
+        for temp_path in glob(os.path.join(self.path, "*.tmp")):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+        # Increased on invalidation, so that bars loaded before are not saved
+        self.versions: Dict[str, int] = {}
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def load_index(self) -> Dict[str, dict]:
+        """"""
+        index_path: str = os.path.join(self.path, CACHE_INDEX)
+        if not os.path.exists(index_path):
+            return {}
+
+        with open(index_path, mode="r", encoding="UTF-8") as f:
+            entries: Dict[str, dict] = json.load(f)
+
+        # Drop entries whose file is gone
+        return {
+            name: entry for name, entry in entries.items()
+            if os.path.exists(self.get_file_path(name))
+        }
+
+    def save_index(self) -> None:
+        """"""
+        index_path: str = os.path.join(self.path, CACHE_INDEX)
+
+        with open(index_path, mode="w+", encoding="UTF-8") as f:
+            json.dump(self.entries, f, indent=4)
+
+    def get_name(self, symbol: str, exchange: Exchange, interval: Interval) -> str:
+        """"""
+        return f"{symbol}.{exchange.value}.{interval.value}"
+
+    def get_file_path(self, name: str) -> str:
+        """"""
+        return os.path.join(self.path, f"{name}.npy")
+
+    def get_stamp(self, overview: BarOverview) -> list:
+        """"""
+        return [overview.count, overview.start.isoformat(), overview.end.isoformat()]
+
+    def create_writer(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        overview: BarOverview
+    ) -> "BarCacheWriter":
+        """
+        Get a writer for storing all bars between start and end, which are
+        going to be loaded from database in time order.
+        """
+        name: str = self.get_name(symbol, exchange, interval)
+
+        with self.lock:
+            version: int = self.versions.get(name, 0)
+
+        return BarCacheWriter(self, name, start, end, version, overview)
+
+    def load(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        overview: BarOverview
+    ) -> Optional[np.ndarray]:
+        """
+        Get cached bars between start and end as a read only memory mapped
+        array, or None if the range is not fully cached or the series has
+        been changed according to its current overview.
+        """
+        name: str = self.get_name(symbol, exchange, interval)
+
+        with self.lock:
+            entry: Optional[dict] = self.entries.get(name, None)
+
+            if entry and entry.get("overview", None) != self.get_stamp(overview):
+                self.entries.pop(name)
+                self.remove_file(name)
+                self.save_index()
+                entry = None
+
+            if (
+                not entry
+                or datetime.fromisoformat(entry["start"]) > start
+                or datetime.fromisoformat(entry["end"]) < end
+            ):
+                self.misses += 1
+                return None
+
+            try:
+                data: np.ndarray = np.load(self.get_file_path(name), mmap_mode="r")
+            except (OSError, ValueError):
+                self.entries.pop(name)
+                self.save_index()
+
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            entry["access"] = time()
+
+        dts: np.ndarray = data["datetime"]
+        i: int = np.searchsorted(dts, np.datetime64(start, "s"), "left")
+        j: int = np.searchsorted(dts, np.datetime64(end, "s"), "right")
+
+        return data[i:j]
+
+    def add_file(self, writer: "BarCacheWriter") -> None:
+        """
+        Add file finished by writer into the cache.
+
+        version and overview are got before loading, the file is dropped if
+        the series has been invalidated since then.
+        """
+        name: str = writer.name
+        file_path: str = self.get_file_path(name)
+
+        with self.lock:
+            if writer.version != self.versions.get(name, 0):
+                os.remove(writer.temp_path)
+                return
+
+            # Readers never see partial file, since it is only renamed once finished
+            try:
+                os.replace(writer.temp_path, file_path)
+            except OSError:
+                # Old file still mapped by reader on some platforms
+                os.remove(writer.temp_path)
+                return
+
+            self.entries[name] = {
+                "start": writer.start.isoformat(),
+                "end": writer.end.isoformat(),
+                "size": os.path.getsize(file_path),
+                "access": time(),
+                "overview": self.get_stamp(writer.overview)
+            }
+
+            self.evict()
+            self.save_index()
+
+    def remove(self, symbol: str, exchange: Exchange, interval: Interval) -> None:
+        """
+        Invalidate cached bars of a series.
+        """
+        name: str = self.get_name(symbol, exchange, interval)
+
+        with self.lock:
+            self.versions[name] = self.versions.get(name, 0) + 1
+
+            if not self.entries.pop(name, None):
+                return
+
+            self.remove_file(name)
+            self.save_index()
+
+    def clear(self) -> None:
+        """"""
+        with self.lock:
+            for name in self.entries:
+                self.remove_file(name)
+
+            self.entries.clear()
+            self.save_index()
+
+    def evict(self) -> None:
+        """
+        Remove least recently used files until total size is within limit.
+        """
+        size: int = sum(entry["size"] for entry in self.entries.values())
+
+        for name in sorted(self.entries, key=lambda name: self.entries[name]["access"]):
+            if size <= self.max_size:
+                break
+
+            entry: dict = self.entries.pop(name)
+            self.remove_file(name)
+
+            size -= entry["size"]
+            self.evictions += 1
+
+    def remove_file(self, name: str) -> None:
+        """"""
+        try:
+            os.remove(self.get_file_path(name))
+        except OSError:
+            pass
+
+    def get_stats(self) -> dict:
+        """
+        Get hit/miss statistics and disk usage of the cache.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "count": len(self.entries),
+                "size": sum(entry["size"] for entry in self.entries.values()),
+                "max_size": self.max_size,
+            }
+
+
+class BarCacheWriter:
+    """
+    Write bars of a series into a temp NumPy file page by page, so that
+    filling the cache never holds the whole series in memory.
+
+    The file is added into the cache once closed, or dropped as soon as it
+    grows larger than max_size of the cache.
+    """
+
+    def __init__(
+        self,
+        cache: BarCache,
+        name: str,
+        start: datetime,
+        end: datetime,
+        version: int,
+        overview: BarOverview
+    ) -> None:
+        """"""
+        self.cache: BarCache = cache
+        self.name: str = name
+        self.start: datetime = start
+        self.end: datetime = end
+        self.version: int = version
+        self.overview: BarOverview = overview
+
+        self.temp_path: str = os.path.join(cache.path, f"{name}.{uuid4().hex}.tmp")
+        self.file: Optional[BinaryIO] = None
+        self.count: int = 0
+        self.size: int = HEADER_SIZE
+        self.closed: bool = False
+
+    def open_file(self) -> None:
+        """"""
+        if not self.file:
+            self.file = open(self.temp_path, "wb")
+            self.file.write(bytes(HEADER_SIZE))
+
+    def write(self, data: np.ndarray) -> None:
+        """
+        Append bars of BAR_DTYPE after those written before.
+        """
+        if self.closed:
+            return
+
+        buffer: bytes = np.ascontiguousarray(data, dtype=BAR_DTYPE).tobytes()
+
+        self.size += len(buffer)
+        if self.size > self.cache.max_size:
+            self.drop()
+            return
+
+        self.open_file()
+        self.file.write(buffer)
+        self.count += len(data)
+
+    def close(self) -> None:
+        """
+        Finish the file and add it into the cache.
+        """
+        if self.closed:
+            return
+
+        self.open_file()
+        self.file.seek(0)
+        self.file.write(get_npy_header(self.count))
+        self.file.close()
+        self.file = None
+        self.closed = True
+
+        self.cache.add_file(self)
+
+    def drop(self) -> None:
+        """
+        Stop writing and remove the temp file.
+        """
+        self.closed = True
+
+        if not self.file:
+            return
+
+        self.file.close()
+        self.file = None
+
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+    def __del__(self) -> None:
+        """
+        Remove the temp file if bars are not all loaded, e.g. paging stopped early.
+        """
+        self.drop()
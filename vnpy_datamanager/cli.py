@@ -0,0 +1,554 @@
+"""
+Command line interface for running data operations without GUI.
+
+Usage examples:
+
+    python -m vnpy_datamanager import rb2401.SHFE.csv --symbol rb2401 --exchange SHFE --interval 1m
+    python -m vnpy_datamanager export rb2401.parquet --symbol rb2401 --exchange SHFE --interval 1m
+    python -m vnpy_datamanager update --fill-gaps
+    python -m vnpy_datamanager delete --symbol rb2401 --exchange SHFE --interval 1m --start 2023-12-01
+    python -m vnpy_datamanager scan --fix repair
+    python -m vnpy_datamanager snapshot backup.zip
+    python -m vnpy_datamanager migrate mysql_setting.json --max-workers 8
+    python -m vnpy_datamanager run nightly.yaml --workers 4
+
+A manifest is a JSON or YAML file with a list of tasks, each task has an
+action and the same options as the command of that action, e.g.
+
+    workers: 4
+    tasks:
+      - action: import
+        path: data/*.csv
+        interval: 1m
+      - action: update
+        fill_gaps: true
+"""
+
+import os
+import json
+import argparse
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.constant import Interval, Exchange
+from vnpy.trader.database import DB_TZ
+from vnpy.trader.event import EVENT_LOG
+from vnpy.trader.object import LogData
+
+from .engine import FILE_NAME_PATTERN, ManagerEngine, ImportSummary, MigrationResult
+from .quality import JUMP_LIMIT, ScanAction, ScanResult
+
+
+# Default options of tasks, same as the import dialog of GUI
+TASK_DEFAULTS: dict = {
+    "tz": DB_TZ.key,
+    "datetime_head": "datetime",
+    "open_head": "open",
+    "high_head": "high",
+    "low_head": "low",
+    "close_head": "close",
+    "volume_head": "volume",
+    "turnover_head": "turnover",
+    "open_interest_head": "open_interest",
+    "datetime_format": "%Y-%m-%d %H:%M:%S",
+    "pattern": FILE_NAME_PATTERN,
+    "format": "",
+    "start": None,
+    "end": None,
+    "fill_gaps": False,
+    "merge": False,
+    "fix": "report",
+    "jump_limit": JUMP_LIMIT,
+    "source": None,
+    "max_workers": 0,
+    "restart": False,
+}
+
+DEFAULT_WORKERS: int = 4
+
+# Task fields holding file paths, which are relative to working directory
+PATH_FIELDS: List[str] = ["path", "target", "source"]
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse ISO format time, naive time is treated as in DB_TZ.
+    """
+    if not value:
+        return None
+
+    dt: datetime = datetime.fromisoformat(str(value))
+    if not dt.tzinfo:
+        dt = dt.replace(tzinfo=DB_TZ)
+
+    return dt
+
+
+def get_series(task: dict) -> Tuple[str, Exchange, Interval]:
+    """"""
+    return task["symbol"], Exchange(task["exchange"]), Interval(task["interval"])
+
+
+def run_import(engine: ManagerEngine, task: dict) -> int:
+    """
+    Import a file, or all files in a folder or matching a glob.
+    """
+    path: str = task["path"]
+    interval: Interval = Interval(task["interval"])
+
+    heads: tuple = (
+        task["datetime_head"],
+        task["open_head"],
+        task["high_head"],
+        task["low_head"],
+        task["close_head"],
+        task["volume_head"],
+        task["turnover_head"],
+        task["open_interest_head"],
+        task["datetime_format"],
+    )
+
+    # Symbol and exchange are extracted from file names if not given
+    if os.path.isdir(path) or "*" in path or "?" in path or not task.get("symbol", None):
+        summary: ImportSummary = engine.import_data_from_folder(
+            path,
+            task["pattern"],
+            interval,
+            task["tz"],
+            *heads,
+            merge=task["merge"],
+            format_name=task["format"]
+        )
+
+        for file_path, error in summary.errors.items():
+            print(f"Failed to import {file_path}: {error}")
+
+        # Task only succeeds if some file is imported, e.g. not for unsupported formats
+        if summary.errors and not summary.results:
+            raise ValueError(f"No file imported from {path}")
+
+        if summary.merged:
+            print(f"Import {path}: {summary.merged}")
+
+        return summary.count
+
+    start, end, count = engine.import_data_from_file(
+        path,
+        task["symbol"],
+        Exchange(task["exchange"]),
+        interval,
+        task["tz"],
+        *heads,
+        format_name=task["format"],
+        merge=task["merge"]
+    )
+    return count
+
+
+def run_export(engine: ManagerEngine, task: dict) -> int:
+    """
+    Export a series into file, format is chosen by file suffix if not given.
+    """
+    path: str = task["path"]
+    symbol, exchange, interval = get_series(task)
+
+    start: datetime = parse_datetime(task["start"]) or datetime(1970, 1, 2, tzinfo=DB_TZ)
+    end: datetime = parse_datetime(task["end"]) or datetime.now(DB_TZ)
+
+    if interval == Interval.TICK:
+        count: Optional[int] = engine.write_tick_file(path, symbol, exchange, start, end)
+    else:
+        format_name: str = task["format"]
+        if not format_name:
+            for name, suffix in engine.get_export_formats().items():
+                if path.lower().endswith(suffix):
+                    format_name = name
+                    break
+            else:
+                format_name = "CSV"
+
+        count: Optional[int] = engine.write_bar_file(
+            path, symbol, exchange, interval, start, end, format_name
+        )
+
+    if count is None:
+        raise PermissionError(f"Cannot open file {path}")
+
+    return count
+
+
+def run_update(engine: ManagerEngine, task: dict) -> int:
+    """
+    Update all bar data in database.
+    """
+    return engine.run_update_all(engine.get_bar_overview(), task["fill_gaps"])
+
+
+def run_download(engine: ManagerEngine, task: dict) -> int:
+    """"""
+    symbol, exchange, interval = get_series(task)
+
+    start: datetime = parse_datetime(task["start"])
+    end: datetime = parse_datetime(task["end"]) or datetime.now(DB_TZ)
+
+    if interval == Interval.TICK:
+        return engine.download_tick_data(symbol, exchange, start, engine.write_log)
+
+    return engine.download_bar_range(
+        symbol, exchange, interval, start, end, engine.write_log, task["merge"]
+    )
+
+
+def run_delete(engine: ManagerEngine, task: dict) -> int:
+    """
+    Delete a series, or only bars between start and end if either is given.
+    """
+    symbol, exchange, interval = get_series(task)
+
+    if interval == Interval.TICK:
+        return engine.delete_tick_data(symbol, exchange)
+
+    if task["start"] or task["end"]:
+        start: datetime = parse_datetime(task["start"]) or datetime(1970, 1, 2, tzinfo=DB_TZ)
+        end: datetime = parse_datetime(task["end"]) or datetime.now(DB_TZ)
+        return engine.delete_bar_range(symbol, exchange, interval, start, end)
+
+    return engine.delete_bar_data(symbol, exchange, interval)
+
+
+def run_scan(engine: ManagerEngine, task: dict) -> int:
+    """
+    Check quality of a series, or of all bar data if symbol is not given.
+    """
+    action: ScanAction = ScanAction(task["fix"])
+    jump_limit: float = float(task["jump_limit"])
+
+    if task.get("symbol", None):
+        symbol, exchange, interval = get_series(task)
+
+        result: ScanResult = engine.scan_bar_data(
+            symbol,
+            exchange,
+            interval,
+            parse_datetime(task["start"]),
+            parse_datetime(task["end"]),
+            jump_limit
+        )
+        if action != ScanAction.REPORT:
+            engine.fix_bar_data(result, action)
+
+        results: List[ScanResult] = [result]
+    else:
+        results: List[ScanResult] = engine.scan_all_bar_data(action, jump_limit)
+
+    for result in results:
+        if not result.bad:
+            continue
+
+        issues: str = ", ".join(f"{name} {n}" for name, n in result.issues.items() if n)
+        print(
+            f"{result.symbol}.{result.exchange.value} {result.interval.value}: {issues}, "
+            f"{result.removed} removed, {result.fixed} repaired"
+        )
+
+        if result.quarantine_path:
+            print(f"Quarantined into {result.quarantine_path}")
+
+    return sum(result.count for result in results)
+
+
+def run_snapshot(engine: ManagerEngine, task: dict) -> int:
+    """"""
+    return engine.create_snapshot(task["path"])
+
+
+def run_restore(engine: ManagerEngine, task: dict) -> int:
+    """"""
+    return engine.restore_snapshot(task["path"], task["merge"])
+
+
+def load_settings(value: object) -> dict:
+    """
+    Get database settings given directly in a manifest, or from a JSON
+    file with the same keys as vt_setting.json.
+    """
+    if isinstance(value, dict):
+        return value
+
+    with open(value, mode="r", encoding="UTF-8") as f:
+        return json.load(f)
+
+
+def run_migrate(engine: ManagerEngine, task: dict) -> int:
+    """
+    Copy all bar data into target database, from source database if given.
+    """
+    target_settings: dict = load_settings(task["target"])
+    source_settings: Optional[dict] = load_settings(task["source"]) if task["source"] else None
+
+    results: List[MigrationResult] = engine.migrate_bar_data(
+        target_settings,
+        source_settings,
+        int(task["max_workers"]),
+        not task["restart"]
+    )
+
+    for result in results:
+        msg: str = (
+            f"{result.symbol}.{result.exchange.value} {result.interval.value}: "
+            f"{result.count} bars in {result.cost:.2f}s, {result.speed:.0f} bars/s"
+        )
+        if result.error:
+            msg += f", failed: {result.error}"
+        print(msg)
+
+    errors: int = sum(1 for result in results if result.error)
+    if errors:
+        raise RuntimeError(f"{errors} series failed, migrate again to resume")
+
+    return sum(result.count for result in results)
+
+
+TASK_FUNCTIONS: Dict[str, Callable[[ManagerEngine, dict], int]] = {
+    "import": run_import,
+    "export": run_export,
+    "update": run_update,
+    "download": run_download,
+    "delete": run_delete,
+    "scan": run_scan,
+    "snapshot": run_snapshot,
+    "restore": run_restore,
+    "migrate": run_migrate,
+}
+
+
+def get_task_name(task: dict) -> str:
+    """"""
+    words: List[str] = [task["action"]]
+
+    if task.get("symbol", None):
+        words.append(f"{task['symbol']}.{task['exchange']}")
+    if task.get("interval", None) and task["action"] != "import":
+        words.append(task["interval"])
+    if task.get("path", None):
+        words.append(os.path.basename(task["path"]))
+    if isinstance(task.get("target", None), str):
+        words.append(os.path.basename(task["target"]))
+
+    return " ".join(words)
+
+
+def load_manifest(file_path: str) -> dict:
+    """
+    Load tasks from JSON or YAML manifest, a plain list of tasks is also accepted.
+    """
+    with open(file_path, mode="r", encoding="UTF-8") as f:
+        if file_path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("PyYAML is required for YAML manifest") from None
+
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+
+    if isinstance(manifest, list):
+        manifest = {"tasks": manifest}
+
+    return manifest
+
+
+def run_tasks(engine: ManagerEngine, tasks: List[dict], workers: int) -> bool:
+    """
+    Run tasks concurrently, print throughput summary and get whether all succeeded.
+    """
+    results: List[tuple] = []
+    futures: Dict[Future, str] = {}
+
+    def run_task(task: dict) -> Tuple[int, float]:
+        start_time: float = perf_counter()
+        count: int = TASK_FUNCTIONS[task["action"]](engine, task)
+        return count, perf_counter() - start_time
+
+    start_time: float = perf_counter()
+
+    with ThreadPoolExecutor(workers) as executor:
+        for task in tasks:
+            task = {**TASK_DEFAULTS, **task}
+            futures[executor.submit(run_task, task)] = get_task_name(task)
+
+        for future, name in futures.items():
+            try:
+                count, cost = future.result()
+            except Exception as e:
+                print(f"Task {name} failed: {e}")
+                results.append((name, "failed", 0, 0))
+            else:
+                results.append((name, "ok", count, cost))
+
+    total_cost: float = perf_counter() - start_time
+    total_count: int = sum(result[2] for result in results)
+
+    width: int = max([len(result[0]) for result in results] + [4])
+    print(f"\n{'Task':<{width}}  {'Status':<6}  {'Rows':>10}  {'Time(s)':>8}  {'Rows/s':>10}")
+
+    for name, status, count, cost in results:
+        print(f"{name:<{width}}  {status:<6}  {count:>10}  {cost:>8.2f}  {count / max(cost, 1e-6):>10.0f}")
+
+    print(
+        f"{'Total':<{width}}  {'':<6}  {total_count:>10}  {total_cost:>8.2f}  "
+        f"{total_count / max(total_cost, 1e-6):>10.0f}"
+    )
+
+    return all(result[1] == "ok" for result in results)
+
+
+def add_series_arguments(parser: argparse.ArgumentParser, required: bool = True) -> None:
+    """"""
+    parser.add_argument("--symbol", required=required)
+    parser.add_argument("--exchange", required=required, help="e.g. SHFE")
+    parser.add_argument("--interval", required=required, help="1m, 1h, d, w or tick")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="python -m vnpy_datamanager",
+        description="Manage historical data of VeighNa without GUI."
+    )
+    parser.add_argument("--workers", type=int, default=None, help="number of tasks run concurrently")
+    parser.add_argument("--quiet", action="store_true", help="do not print log messages")
+
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    import_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "import", help="import a file, or all CSV files in a folder or matching a glob"
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument("--symbol", help="extracted from file names by --pattern if not given")
+    import_parser.add_argument("--exchange")
+    import_parser.add_argument("--interval", required=True)
+    import_parser.add_argument("--tz", default=TASK_DEFAULTS["tz"])
+    import_parser.add_argument("--pattern", default=FILE_NAME_PATTERN)
+    import_parser.add_argument("--format", default="", help="file format, by file suffix if not given")
+    import_parser.add_argument("--merge", action="store_true", help="skip bars already stored")
+    for name in [
+        "datetime_head",
+        "open_head",
+        "high_head",
+        "low_head",
+        "close_head",
+        "volume_head",
+        "turnover_head",
+        "open_interest_head",
+        "datetime_format",
+    ]:
+        import_parser.add_argument("--" + name.replace("_", "-"), dest=name, default=TASK_DEFAULTS[name])
+
+    export_parser: argparse.ArgumentParser = subparsers.add_parser("export", help="export a series into file")
+    export_parser.add_argument("path")
+    add_series_arguments(export_parser)
+    export_parser.add_argument("--start")
+    export_parser.add_argument("--end")
+    export_parser.add_argument("--format", default="", help="file format, by file suffix if not given")
+
+    update_parser: argparse.ArgumentParser = subparsers.add_parser("update", help="update all bar data in database")
+    update_parser.add_argument("--fill-gaps", action="store_true")
+
+    download_parser: argparse.ArgumentParser = subparsers.add_parser("download", help="download data from datafeed")
+    add_series_arguments(download_parser)
+    download_parser.add_argument("--start", required=True)
+    download_parser.add_argument("--end")
+    download_parser.add_argument("--merge", action="store_true", help="skip bars already stored")
+
+    delete_parser: argparse.ArgumentParser = subparsers.add_parser("delete", help="delete a series")
+    add_series_arguments(delete_parser)
+    delete_parser.add_argument("--start", help="delete only bars from this time")
+    delete_parser.add_argument("--end", help="delete only bars up to this time")
+
+    scan_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "scan", help="check quality of a series, or of all bar data if no symbol given"
+    )
+    add_series_arguments(scan_parser, False)
+    scan_parser.add_argument("--start")
+    scan_parser.add_argument("--end")
+    scan_parser.add_argument(
+        "--fix", default="report", choices=[action.value for action in ScanAction],
+        help="quarantine or repair bad bars, only report by default"
+    )
+    scan_parser.add_argument("--jump-limit", type=float, default=JUMP_LIMIT)
+
+    snapshot_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "snapshot", help="save all bar data into a compressed snapshot file"
+    )
+    snapshot_parser.add_argument("path")
+
+    restore_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "restore", help="load all bar data from a snapshot file"
+    )
+    restore_parser.add_argument("path")
+    restore_parser.add_argument("--merge", action="store_true", help="skip bars already stored")
+
+    migrate_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "migrate", help="copy all bar data into another database"
+    )
+    migrate_parser.add_argument("target", help="JSON file of target database settings, same keys as vt_setting.json")
+    migrate_parser.add_argument("--source", help="JSON file of source database settings, current database if not given")
+    migrate_parser.add_argument("--max-workers", type=int, default=0, help="number of series copied at the same time")
+    migrate_parser.add_argument("--restart", action="store_true", help="copy all bars again instead of resuming")
+
+    run_parser: argparse.ArgumentParser = subparsers.add_parser("run", help="run tasks of a JSON or YAML manifest")
+    run_parser.add_argument("manifest")
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    """"""
+    parser: argparse.ArgumentParser = create_parser()
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    if args.action == "run":
+        manifest: dict = load_manifest(args.manifest)
+        tasks: List[dict] = manifest.get("tasks", [])
+        workers: int = args.workers or manifest.get("workers", DEFAULT_WORKERS)
+
+        for task in tasks:
+            if task.get("action", None) not in TASK_FUNCTIONS:
+                parser.error(f"Unknown action of task: {task}")
+    else:
+        task: dict = {
+            name: value for name, value in vars(args).items()
+            if name not in {"workers", "quiet"}
+        }
+        tasks: List[dict] = [task]
+        workers: int = args.workers or DEFAULT_WORKERS
+
+    # MainEngine changes working directory into TRADER_DIR
+    for task in tasks:
+        for name in PATH_FIELDS:
+            if isinstance(task.get(name, None), str):
+                task[name] = os.path.abspath(task[name])
+
+    event_engine: EventEngine = EventEngine()
+    main_engine: MainEngine = MainEngine(event_engine)
+    engine: ManagerEngine = main_engine.add_engine(ManagerEngine)
+
+    if not args.quiet:
+        def print_log(event: Event) -> None:
+            log: LogData = event.data
+            print(f"{log.time:%H:%M:%S}  {log.msg}")
+
+        event_engine.register(EVENT_LOG, print_log)
+
+    try:
+        succeeded: bool = run_tasks(engine, tasks, workers)
+    finally:
+        main_engine.close()
+
+    return 0 if succeeded else 1
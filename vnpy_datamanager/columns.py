@@ -0,0 +1,243 @@
+import csv
+from datetime import datetime, tzinfo
+from itertools import islice, repeat
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from vnpy.trader.constant import Interval, Exchange
+from vnpy.trader.object import BarData
+
+
+# Column names used by columnar bar batches
+BAR_COLUMNS: List[str] = [
+    "datetime",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "turnover",
+    "open_interest",
+]
+
+# Fixed layouts (with their string length) which NumPy datetime64 parses
+# identically to strptime
+ISO_DATETIME_FORMATS: Dict[str, int] = {
+    "%Y-%m-%d %H:%M:%S": 19,
+    "%Y-%m-%dT%H:%M:%S": 19,
+    "%Y-%m-%d %H:%M": 16,
+    "%Y-%m-%d": 10,
+}
+
+
+def localize_datetimes(values: np.ndarray, tz: tzinfo) -> List[datetime]:
+    """
+    Convert naive wall clock times of datetime64[s] into datetime objects
+    in tz.
+
+    UTC offset is looked up once per batch. If it is the same for all
+    values, they are shifted to UTC in bulk and created directly by
+    datetime.fromtimestamp, otherwise tz is attached one by one.
+    """
+    seconds: np.ndarray = values.view(np.int64)
+
+    if tz and len(seconds):
+        # Offset only changes on whole hours, so checking each distinct hour is enough
+        hours: list = np.unique(seconds // 3600).astype("M8[h]").tolist()
+        offsets: set = {tz.utcoffset(dt) for dt in hours}
+
+        if len(offsets) == 1 and None not in offsets:
+            timestamps: np.ndarray = seconds - int(offsets.pop().total_seconds())
+
+            # Negative timestamps are not supported by fromtimestamp on Windows
+            if timestamps.min() >= 0:
+                return list(map(datetime.fromtimestamp, timestamps.tolist(), repeat(tz)))
+
+    return [dt.replace(tzinfo=tz) for dt in values.tolist()]
+
+
+def parse_datetimes(values: List[str], datetime_format: str, tz: tzinfo) -> List[datetime]:
+    """
+    Convert a column of datetime strings into datetime objects.
+
+    Known fixed layouts are parsed in bulk as NumPy datetime64, other
+    formats (or non zero-padded values) fall back to strptime.
+    """
+    if not datetime_format:
+        return [dt.replace(tzinfo=tz) for dt in map(datetime.fromisoformat, values)]
+
+    # datetime64 is more lenient than strptime, so only use it when every
+    # value matches the fixed layout length
+    length: int = ISO_DATETIME_FORMATS.get(datetime_format, 0)
+    if length and set(map(len, values)) == {length}:
+        try:
+            return localize_datetimes(np.array(values, dtype="M8[s]"), tz)
+        except ValueError:
+            pass
+
+    strptime = datetime.strptime
+    return [strptime(v, datetime_format).replace(tzinfo=tz) for v in values]
+
+
+def load_csv_columns(
+    lines: List[str],
+    indexes: Dict[str, int],
+    datetime_format: str,
+    tz: tzinfo
+) -> Optional[Dict[str, list]]:
+    """
+    Parse a batch of plain CSV lines into columns with np.loadtxt, or None
+    if the lines have quoting or values it can not parse.
+
+    Float columns are converted into arrays in bulk, and so is the datetime
+    column when its format is a known fixed layout.
+    """
+    text: str = "".join(lines).replace("\0", "").replace("\r", "")
+    if '"' in text:
+        return None
+
+    rows: List[str] = [row for row in text.split("\n") if row]
+    if not rows:
+        return None
+
+    names: List[str] = [name for name in BAR_COLUMNS if name in indexes and name != "datetime"]
+    length: int = ISO_DATETIME_FORMATS.get(datetime_format, 0)
+
+    try:
+        arrays: np.ndarray = np.loadtxt(
+            rows, dtype=float, delimiter=",", comments=None,
+            usecols=[indexes[name] for name in names], ndmin=2, unpack=True
+        )
+
+        # One more character, so that longer values are not truncated unnoticed
+        values: np.ndarray = np.loadtxt(
+            rows, dtype=f"U{length + 1}" if length else str, delimiter=",",
+            comments=None, usecols=[indexes["datetime"]], ndmin=1
+        )
+    except ValueError:
+        return None
+
+    columns: Dict[str, list] = {name: [0.0] * len(rows) for name in BAR_COLUMNS}
+    for name, array in zip(names, arrays):
+        columns[name] = array.tolist()
+
+    # datetime64 is more lenient than strptime, so only use it when every
+    # value matches the fixed layout length
+    if length and (np.char.str_len(values) == length).all():
+        try:
+            columns["datetime"] = localize_datetimes(values.astype("M8[s]"), tz)
+            return columns
+        except ValueError:
+            pass
+
+    columns["datetime"] = parse_datetimes(values.tolist(), datetime_format, tz)
+    return columns
+
+
+def split_csv_fields(lines: List[str], width: int) -> List[list]:
+    """
+    Split a batch of CSV lines into a list of field columns.
+
+    Plain files are split in bulk on the joined text and each column is a
+    strided slice of the flat field list. Files with quoting, blank lines
+    or ragged rows fall back to csv.reader.
+    """
+    text: str = "".join(lines).replace("\0", "").replace("\r", "")
+
+    if '"' not in text:
+        fields: list = text.replace("\n", ",").split(",")
+        size: int = len(lines) * width
+
+        if len(fields) == size or (len(fields) == size + 1 and not fields[-1]):
+            return [fields[i:size:width] for i in range(width)]
+
+    rows: list = [row for row in csv.reader(text.splitlines()) if row]
+    return [list(column) for column in zip(*rows)]
+
+
+def read_csv_columns(
+    file_path: str,
+    heads: Dict[str, str],
+    datetime_format: str,
+    tz: tzinfo,
+    batch_size: int
+) -> Iterator[Dict[str, list]]:
+    """
+    Read CSV file in batches and yield each batch as a dict of columns.
+
+    heads maps column names in BAR_COLUMNS to the header names in the file.
+    Turnover and open interest are optional and filled with 0 if missing.
+    """
+    with open(file_path, "rt") as f:
+        first_line: str = next(f, "").replace("\0", "")
+        header: list = next(csv.reader([first_line]), [])
+        if not header:
+            return
+
+        indexes: Dict[str, int] = {}
+        for name in BAR_COLUMNS:
+            head: str = heads.get(name, "")
+            if head in header:
+                indexes[name] = header.index(head)
+            elif name not in {"turnover", "open_interest"}:
+                raise KeyError(head)
+
+        while True:
+            lines: List[str] = list(islice(f, batch_size))
+            if not lines:
+                break
+
+            columns: Optional[Dict[str, list]] = load_csv_columns(
+                lines, indexes, datetime_format, tz
+            )
+            if columns:
+                yield columns
+                continue
+
+            fields: List[list] = split_csv_fields(lines, len(header))
+            if not fields:
+                continue
+            size: int = len(fields[0])
+
+            columns = {}
+            for name in BAR_COLUMNS:
+                if name not in indexes:
+                    columns[name] = [0.0] * size
+                elif name == "datetime":
+                    columns[name] = parse_datetimes(fields[indexes[name]], datetime_format, tz)
+                else:
+                    columns[name] = np.array(fields[indexes[name]], dtype=float).tolist()
+
+            yield columns
+
+
+def columns_to_bars(
+    columns: Dict[str, list],
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval
+) -> List[BarData]:
+    """
+    Build BarData objects from a batch of columns.
+    """
+    bars: List[BarData] = [
+        BarData(
+            symbol=symbol,
+            exchange=exchange,
+            datetime=dt,
+            interval=interval,
+            volume=volume,
+            open_price=open_price,
+            high_price=high_price,
+            low_price=low_price,
+            close_price=close_price,
+            turnover=turnover,
+            open_interest=open_interest,
+            gateway_name="DB",
+        )
+        for dt, open_price, high_price, low_price, close_price, volume, turnover, open_interest
+        in zip(*[columns[name] for name in BAR_COLUMNS])
+    ]
+
+    return bars
@@ -1,16 +1,493 @@
-import csv
-from datetime import datetime
-from typing import List, Optional, Callable
+import os
+import re
+import sys
+from glob import glob
+from importlib import import_module
+from importlib.machinery import ModuleSpec
+from importlib.util import find_spec, module_from_spec
+from time import sleep, monotonic, perf_counter
+from threading import Lock, Event as ThreadEvent, local
+from collections import deque
+from itertools import takewhile
+from contextlib import nullcontext
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    Future,
+    wait,
+    as_completed,
+    FIRST_COMPLETED
+)
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from types import ModuleType
+from typing import List, Optional, Callable, Iterator, Dict, Tuple, Type, TYPE_CHECKING
 
+import numpy as np
+
+from vnpy.event import Event
 from vnpy.trader.engine import BaseEngine, MainEngine, EventEngine
 from vnpy.trader.constant import Interval, Exchange
 from vnpy.trader.object import BarData, TickData, ContractData, HistoryRequest
-from vnpy.trader.database import BaseDatabase, get_database, BarOverview, DB_TZ
+from vnpy.trader.database import (
+    BaseDatabase,
+    get_database,
+    BarOverview,
+    TickOverview,
+    DB_TZ,
+    convert_tz
+)
 from vnpy.trader.datafeed import BaseDatafeed, get_datafeed
-from vnpy.trader.utility import ZoneInfo
+from vnpy.trader.setting import SETTINGS
+from vnpy.trader.utility import ZoneInfo, load_json, save_json, get_folder_path
+
+from .session import INTERVAL_DELTA_MAP, TradingSession, get_trading_session
+
+# Modules for files, cache, quality check, resampling and tick bars are only
+# imported by the methods using them, so that adding the app stays light
+if TYPE_CHECKING:
+    from .cache import BarCache, BarCacheWriter
+    from .formats import BaseBarReader, BaseBarWriter
+    from .quality import ScanAction, ScanResult
+    from .snapshot import SnapshotWriter
 
 APP_NAME = "DataManager"
 
+IMPORT_BATCH_SIZE: int = 100_000
+
+EVENT_DATAMANAGER_JOB = "eDataManagerJob"
+EVENT_DATAMANAGER_OVERVIEW = "eDataManagerOverview"
+
+# Number of background jobs run at the same time
+JOB_WORKERS: int = 4
+
+# Default concurrency and per source query rate limit of batch update
+UPDATE_WORKERS: int = 4
+QUERY_RATE: float = 5.0
+
+# Time span of each database query or datafeed request for long ranges
+WINDOW_DELTA_MAP: Dict[Interval, timedelta] = {
+    Interval.MINUTE: timedelta(days=30),
+    Interval.HOUR: timedelta(days=365),
+    Interval.DAILY: timedelta(days=3650),
+    Interval.WEEKLY: timedelta(days=3650),
+}
+
+# Time span of each database query of tick data
+TICK_WINDOW: timedelta = timedelta(days=1)
+
+# Gaps already requested from datafeed without getting any data
+GAP_FILENAME: str = "datamanager_gap.json"
+
+# Progress of unfinished chunked downloads, and last bars copied by migration
+CHECKPOINT_FILENAME: str = "datamanager_checkpoint.json"
+
+# Number of bar times in each delete statement
+DELETE_BATCH_SIZE: int = 500
+
+# Bars removed by quality scan, and backups of series being rewritten
+QUARANTINE_FOLDER: str = "datamanager_quarantine"
+
+# Default rule for extracting symbol and exchange from file name, e.g. rb2401.SHFE.csv
+FILE_NAME_PATTERN: str = r"^(?P<symbol>[^._]+)[._](?P<exchange>[A-Za-z]+)"
+
+# Guards SETTINGS while it is patched for opening another database
+settings_lock: Lock = Lock()
+
+
+@dataclass
+class MergeResult:
+    """
+    Number of bars inserted, updated and skipped when merging into database.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+    def add(self, result: "MergeResult") -> None:
+        """"""
+        self.inserted += result.inserted
+        self.updated += result.updated
+        self.skipped += result.skipped
+
+    def __str__(self) -> str:
+        """"""
+        return f"{self.inserted} inserted, {self.updated} updated, {self.skipped} skipped"
+
+
+@dataclass
+class MigrationResult:
+    """
+    Bars of a series copied into another database, cost is in seconds.
+
+    error is the exception message if copying the series failed.
+    """
+
+    symbol: str
+    exchange: Exchange
+    interval: Interval
+    count: int = 0
+    cost: float = 0
+    error: str = ""
+
+    @property
+    def speed(self) -> float:
+        """
+        Number of bars copied per second.
+        """
+        if not self.cost:
+            return 0
+        return self.count / self.cost
+
+
+@dataclass
+class ImportSummary:
+    """
+    Aggregated result of importing multiple files.
+
+    merged is only set if imported in merge mode.
+    """
+
+    results: Dict[str, tuple] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    count: int = 0
+    start: datetime = None
+    end: datetime = None
+    merged: Optional[MergeResult] = None
+
+
+class JobStatus(Enum):
+    """"""
+
+    PENDING = "Pending"
+    RUNNING = "Running"
+    FINISHED = "Finished"
+    FAILED = "Failed"
+    CANCELLED = "Cancelled"
+
+
+@dataclass
+class JobData:
+    """
+    State of a background job, published with EVENT_DATAMANAGER_JOB.
+
+    result is the return value of the job function once finished, error
+    is the exception message if failed.
+    """
+
+    job_id: int
+    name: str
+    status: JobStatus = JobStatus.PENDING
+    finished: int = 0
+    total: int = 0
+    msg: str = ""
+    result: object = None
+    error: str = ""
+
+    @property
+    def active(self) -> bool:
+        """"""
+        return self.status in {JobStatus.PENDING, JobStatus.RUNNING}
+
+
+@dataclass
+class OverviewChange:
+    """
+    Change of a series in the overview index, published with EVENT_DATAMANAGER_OVERVIEW.
+
+    overview is None if the series has been removed.
+    """
+
+    symbol: str
+    exchange: Exchange
+    interval: Interval
+    overview: Optional[BarOverview] = None
+
+
+class RateLimiter:
+    """
+    Limit calls to at most rate per second across threads.
+    """
+
+    def __init__(self, rate: float) -> None:
+        """"""
+        self.interval: float = 1 / rate if rate else 0
+        self.next_time: float = 0
+        self.lock: Lock = Lock()
+
+    def acquire(self) -> None:
+        """Block until the next call is allowed"""
+        with self.lock:
+            now: float = monotonic()
+            delay: float = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+
+        if delay > 0:
+            sleep(delay)
+
+
+def to_db_tz(dt: datetime) -> datetime:
+    """
+    Convert datetime into DB_TZ, naive datetime is treated as in DB_TZ.
+    """
+    if dt.tzinfo:
+        return dt.astimezone(DB_TZ)
+    return dt.replace(tzinfo=DB_TZ)
+
+
+def open_database(settings: dict) -> BaseDatabase:
+    """
+    Create a database object from settings with the same keys as SETTINGS,
+    e.g. {"database.name": "mysql", "database.host": "localhost"}, missing
+    keys are taken from SETTINGS.
+
+    Database modules of vn.py connect with SETTINGS when imported, so a
+    fresh copy of the module is loaded while SETTINGS is patched. The
+    object is independent of the global database from get_database.
+    """
+    settings = {**SETTINGS, **settings}
+
+    package: ModuleType = import_module(f"vnpy_{settings['database.name']}")
+    database_class: Type[BaseDatabase] = package.Database
+
+    spec: ModuleSpec = find_spec(database_class.__module__)
+    module: ModuleType = module_from_spec(spec)
+
+    with settings_lock:
+        backup: dict = dict(SETTINGS)
+        SETTINGS.update(settings)
+
+        try:
+            spec.loader.exec_module(module)
+            return getattr(module, database_class.__name__)()
+        finally:
+            for key in SETTINGS.keys() - backup.keys():
+                SETTINGS.pop(key)
+            SETTINGS.update(backup)
+
+
+def get_database_key(settings: dict) -> str:
+    """
+    Get text identifying the database of settings, used for checkpoints.
+    """
+    settings = {**SETTINGS, **settings}
+
+    return "{}://{}:{}/{}".format(
+        settings["database.name"],
+        settings.get("database.host", ""),
+        settings.get("database.port", ""),
+        settings.get("database.database", "")
+    )
+
+
+class BarPager:
+    """
+    Load bars of a time range from database window by window.
+    """
+
+    def __init__(
+        self,
+        database: BaseDatabase,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        window: Optional[timedelta] = None,
+        cache: Optional["BarCache"] = None,
+        overview: Optional[BarOverview] = None
+    ) -> None:
+        """
+        If cache is given, bars are written into it page by page and added
+        once all pages are loaded, together with overview of the series
+        before loading.
+        """
+        self.database: BaseDatabase = database
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.interval: Interval = interval
+        self.window: timedelta = window or WINDOW_DELTA_MAP[interval]
+
+        # Database is queried with naive datetime in DB_TZ
+        self.start: datetime = convert_tz(to_db_tz(start))
+        self.end: datetime = convert_tz(to_db_tz(end))
+        self.next_start: datetime = self.start
+        self.last_dt: Optional[datetime] = None
+
+        self.cache_writer: Optional[BarCacheWriter] = None
+        if cache:
+            self.cache_writer = cache.create_writer(
+                symbol, exchange, interval, self.start, self.end, overview
+            )
+
+    @property
+    def finished(self) -> bool:
+        """"""
+        return self.next_start > self.end
+
+    def next_page(self) -> List[BarData]:
+        """
+        Load bars of the next non-empty window, empty list if all loaded.
+        """
+        from .formats import bars_to_array
+
+        while not self.finished:
+            window_start: datetime = self.next_start
+            window_end: datetime = min(window_start + self.window, self.end)
+            self.next_start = window_end + timedelta(seconds=1)
+
+            bars: List[BarData] = self.database.load_bar_data(
+                self.symbol, self.exchange, self.interval, window_start, window_end
+            )
+
+            # Bars on window boundary are loaded twice
+            if bars and self.last_dt:
+                bars = [bar for bar in bars if bar.datetime > self.last_dt]
+
+            if bars:
+                self.last_dt = bars[-1].datetime
+
+                if self.cache_writer:
+                    self.cache_writer.write(bars_to_array(bars))
+                    if self.finished:
+                        self.save_cache()
+
+                return bars
+
+        self.save_cache()
+        return []
+
+    def save_cache(self) -> None:
+        """"""
+        if not self.cache_writer:
+            return
+
+        self.cache_writer.close()
+        self.cache_writer = None
+
+    def __iter__(self) -> Iterator[List[BarData]]:
+        """"""
+        while True:
+            bars: List[BarData] = self.next_page()
+            if not bars:
+                return
+            yield bars
+
+
+class CachedBarPager(BarPager):
+    """
+    Page bars of a cached array with the same windows as BarPager.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        window: Optional[timedelta] = None
+    ) -> None:
+        """"""
+        self.data: np.ndarray = data
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.interval: Interval = interval
+        self.window: timedelta = window or WINDOW_DELTA_MAP[interval]
+
+        self.index: int = 0
+
+    @property
+    def finished(self) -> bool:
+        """"""
+        return self.index >= len(self.data)
+
+    def next_page(self) -> List[BarData]:
+        """"""
+        from .formats import array_to_bars
+
+        if self.finished:
+            return []
+
+        dts: np.ndarray = self.data["datetime"]
+        window_end: np.datetime64 = dts[self.index] + np.timedelta64(self.window)
+
+        i: int = self.index
+        self.index = np.searchsorted(dts, window_end, "right")
+
+        return array_to_bars(self.data[i:self.index], self.symbol, self.exchange, self.interval)
+
+
+class TickPager:
+    """
+    Load ticks of a time range from database window by window.
+    """
+
+    def __init__(
+        self,
+        database: BaseDatabase,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        window: Optional[timedelta] = None
+    ) -> None:
+        """"""
+        self.database: BaseDatabase = database
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.window: timedelta = window or TICK_WINDOW
+
+        self.start: datetime = convert_tz(to_db_tz(start))
+        self.end: datetime = convert_tz(to_db_tz(end))
+        self.next_start: datetime = self.start
+        self.last_dt: Optional[datetime] = None
+
+        self.finished: bool = self.start > self.end
+        self.loaded: int = 0
+
+    @property
+    def total(self) -> int:
+        """
+        Number of windows in the range.
+        """
+        return max(1, -(-(self.end - self.start) // self.window))
+
+    def next_page(self) -> List[TickData]:
+        """
+        Load ticks of the next non-empty window, empty list if all loaded.
+        """
+        while not self.finished:
+            window_start: datetime = self.next_start
+            window_end: datetime = min(window_start + self.window, self.end)
+
+            # Ticks are not aligned to seconds, so windows share their boundary
+            self.next_start = window_end
+            self.finished = window_end >= self.end
+            self.loaded += 1
+
+            ticks: List[TickData] = self.database.load_tick_data(
+                self.symbol, self.exchange, window_start, window_end
+            )
+
+            if ticks and self.last_dt:
+                ticks = [tick for tick in ticks if tick.datetime > self.last_dt]
+
+            if ticks:
+                self.last_dt = ticks[-1].datetime
+                return ticks
+
+        return []
+
+    def __iter__(self) -> Iterator[List[TickData]]:
+        """"""
+        while True:
+            ticks: List[TickData] = self.next_page()
+            if not ticks:
+                return
+            yield ticks
+
 
 class ManagerEngine(BaseEngine):
     """"""
@@ -23,8 +500,92 @@ class ManagerEngine(BaseEngine):
         """"""
         super().__init__(main_engine, event_engine, APP_NAME)
 
-        self.database: BaseDatabase = get_database()
-        self.datafeed: BaseDatafeed = get_datafeed()
+        # Database and datafeed are created on first use, so that adding the
+        # app does not connect to them
+        self._database: Optional[BaseDatabase] = None
+        self._datafeed: Optional[BaseDatafeed] = None
+        self.init_lock: Lock = Lock()
+
+        self.update_workers: int = UPDATE_WORKERS
+        self.query_rate: float = QUERY_RATE
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.limiters_lock: Lock = Lock()
+
+        # Job pool, empty gaps and checkpoints are also created on first use,
+        # so that constructing the engine neither starts threads nor touches files
+        self._job_executor: Optional[ThreadPoolExecutor] = None
+        self.jobs: Dict[int, JobData] = {}
+        self.job_cancels: Dict[int, ThreadEvent] = {}
+        self.job_futures: Dict[int, Future] = {}
+        self.job_count: int = 0
+        self.jobs_lock: Lock = Lock()
+        self.job_local: local = local()
+
+        self.update_job_id: int = 0
+
+        self._empty_gaps: Optional[Dict[str, list]] = None
+        self.empty_gaps_lock: Lock = Lock()
+
+        self._checkpoints: Optional[Dict[str, str]] = None
+        self.checkpoints_lock: Lock = Lock()
+
+        self.overviews: Dict[Tuple[str, Exchange, Interval], BarOverview] = {}
+        self.overviews_loaded: bool = False
+        self.overviews_lock: Lock = Lock()
+
+        self.cache: Optional[BarCache] = None
+
+    @property
+    def database(self) -> BaseDatabase:
+        """"""
+        if not self._database:
+            with self.init_lock:
+                if not self._database:
+                    self._database = get_database()
+
+        return self._database
+
+    @property
+    def datafeed(self) -> BaseDatafeed:
+        """"""
+        if not self._datafeed:
+            with self.init_lock:
+                if not self._datafeed:
+                    self._datafeed = get_datafeed()
+
+        return self._datafeed
+
+    @property
+    def job_executor(self) -> ThreadPoolExecutor:
+        """"""
+        if not self._job_executor:
+            with self.init_lock:
+                if not self._job_executor:
+                    self._job_executor = ThreadPoolExecutor(
+                        JOB_WORKERS, thread_name_prefix="DataManagerJob"
+                    )
+
+        return self._job_executor
+
+    @property
+    def empty_gaps(self) -> Dict[str, list]:
+        """"""
+        if self._empty_gaps is None:
+            with self.init_lock:
+                if self._empty_gaps is None:
+                    self._empty_gaps = load_json(GAP_FILENAME)
+
+        return self._empty_gaps
+
+    @property
+    def checkpoints(self) -> Dict[str, str]:
+        """"""
+        if self._checkpoints is None:
+            with self.init_lock:
+                if self._checkpoints is None:
+                    self._checkpoints = load_json(CHECKPOINT_FILENAME)
+
+        return self._checkpoints
 
     def import_data_from_csv(
         self,
@@ -41,58 +602,269 @@ class ManagerEngine(BaseEngine):
         volume_head: str,
         turnover_head: str,
         open_interest_head: str,
-        datetime_format: str
+        datetime_format: str,
+        batch_size: int = IMPORT_BATCH_SIZE
     ) -> tuple:
-        """"""
-        with open(file_path, "rt") as f:
-            buf: list = [line.replace("\0", "") for line in f]
+        """
+        Import bar data from CSV file.
+
+        The file is parsed column by column in batches of batch_size rows
+        and each batch is flushed into database, so memory usage is bounded
+        by batch size rather than file size.
+        """
+        return self.import_data_from_file(
+            file_path,
+            symbol,
+            exchange,
+            interval,
+            tz_name,
+            datetime_head,
+            open_head,
+            high_head,
+            low_head,
+            close_head,
+            volume_head,
+            turnover_head,
+            open_interest_head,
+            datetime_format,
+            batch_size,
+            "CSV"
+        )
+
+    def import_data_from_file(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        tz_name: str,
+        datetime_head: str,
+        open_head: str,
+        high_head: str,
+        low_head: str,
+        close_head: str,
+        volume_head: str,
+        turnover_head: str,
+        open_interest_head: str,
+        datetime_format: str,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        format_name: str = "",
+        merge: bool = False
+    ) -> tuple:
+        """
+        Import bar data from CSV, Parquet, Feather or NumPy file.
+
+        The reader is chosen by format_name, or by file suffix if not given.
+        Column heads and timezone are handled the same for all formats, and
+        batches are flushed into database one by one. In merge mode, only
+        bars not stored yet or changed are written, see merge_bar_data.
+        """
+        from .columns import columns_to_bars
+        from .formats import BAR_READERS, get_bar_reader
+
+        if format_name:
+            reader_class: Type[BaseBarReader] = BAR_READERS[format_name]
+        else:
+            reader_class: Optional[Type[BaseBarReader]] = get_bar_reader(file_path)
+            if not reader_class:
+                raise ValueError(f"Unsupported file format: {file_path}")
+
+        heads: Dict[str, str] = {
+            "datetime": datetime_head,
+            "open": open_head,
+            "high": high_head,
+            "low": low_head,
+            "close": close_head,
+            "volume": volume_head,
+            "turnover": turnover_head,
+            "open_interest": open_interest_head,
+        }
 
-        reader: csv.DictReader = csv.DictReader(buf, delimiter=",")
+        reader: BaseBarReader = reader_class(file_path, heads, datetime_format, ZoneInfo(tz_name))
 
-        bars: List[BarData] = []
         start: datetime = None
+        end: datetime = None
         count: int = 0
-        tz = ZoneInfo(tz_name)
+        merged: MergeResult = MergeResult()
 
-        for item in reader:
-            if datetime_format:
-                dt: datetime = datetime.strptime(item[datetime_head], datetime_format)
-            else:
-                dt: datetime = datetime.fromisoformat(item[datetime_head])
-            dt = dt.replace(tzinfo=tz)
-
-            turnover = item.get(turnover_head, 0)
-            open_interest = item.get(open_interest_head, 0)
-
-            bar: BarData = BarData(
-                symbol=symbol,
-                exchange=exchange,
-                datetime=dt,
-                interval=interval,
-                volume=float(item[volume_head]),
-                open_price=float(item[open_head]),
-                high_price=float(item[high_head]),
-                low_price=float(item[low_head]),
-                close_price=float(item[close_head]),
-                turnover=float(turnover),
-                open_interest=float(open_interest),
-                gateway_name="DB",
-            )
-
-            bars.append(bar)
+        for columns in reader.read(batch_size):
+            dts: List[datetime] = columns["datetime"]
+            if not dts:
+                continue
 
             # do some statistics
-            count += 1
+            count += len(dts)
             if not start:
-                start = bar.datetime
+                start = dts[0]
+            end = dts[-1]
+
+            # bar objects are only created when the batch is saved
+            bars: List[BarData] = columns_to_bars(columns, symbol, exchange, interval)
+            if merge:
+                merged.add(self.merge_bar_data(bars))
+            else:
+                self.save_bar_data(bars)
 
-        end: datetime = bar.datetime
+            self.update_job(count, 0, f"{count} bars imported from {os.path.basename(file_path)}")
+            if self.is_job_cancelled():
+                break
 
-        # insert into database
-        self.database.save_bar_data(bars)
+        if merge:
+            self.write_log(f"Imported {os.path.basename(file_path)} in merge mode, {merged}")
 
         return start, end, count
 
+    def import_data_from_folder(
+        self,
+        path: str,
+        name_pattern: str,
+        interval: Interval,
+        tz_name: str,
+        datetime_head: str,
+        open_head: str,
+        high_head: str,
+        low_head: str,
+        close_head: str,
+        volume_head: str,
+        turnover_head: str,
+        open_interest_head: str,
+        datetime_format: str,
+        max_workers: int = 0,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        merge: bool = False,
+        format_name: str = ""
+    ) -> ImportSummary:
+        """
+        Import bar data from all files in a folder or matching a glob.
+
+        The reader of each file is chosen by format_name, or by file suffix
+        if not given, and files of other formats in a folder are skipped.
+        Symbol and exchange of each file are extracted from its file name
+        by name_pattern, which must define symbol and exchange groups.
+        Files are parsed concurrently in a process pool, while the calling
+        thread is the single writer saving results into database. In merge
+        mode, only bars not stored yet or changed are written.
+        """
+        from .columns import columns_to_bars
+        from .formats import BAR_READERS, get_bar_reader, read_bar_file
+
+        if format_name and format_name not in BAR_READERS:
+            raise ValueError(f"Unsupported file format: {format_name}")
+
+        if os.path.isdir(path):
+            file_paths: List[str] = [
+                file_path for file_path in sorted(glob(os.path.join(path, "*")))
+                if os.path.isfile(file_path) and (format_name or get_bar_reader(file_path))
+            ]
+        else:
+            file_paths: List[str] = sorted(glob(path))
+
+        heads: Dict[str, str] = {
+            "datetime": datetime_head,
+            "open": open_head,
+            "high": high_head,
+            "low": low_head,
+            "close": close_head,
+            "volume": volume_head,
+            "turnover": turnover_head,
+            "open_interest": open_interest_head,
+        }
+
+        summary: ImportSummary = ImportSummary()
+        if merge:
+            summary.merged = MergeResult()
+
+        # Map file names to symbol and exchange
+        tasks: List[Tuple[str, str, Exchange]] = []
+        regex: re.Pattern = re.compile(name_pattern)
+
+        for file_path in file_paths:
+            # Unsupported files matched by glob are reported instead of ignored
+            if not format_name and not get_bar_reader(file_path):
+                summary.errors[file_path] = "Unsupported file format"
+                continue
+
+            match: Optional[re.Match] = regex.search(os.path.basename(file_path))
+            try:
+                symbol: str = match["symbol"]
+                exchange: Exchange = Exchange(match["exchange"].upper())
+            except (TypeError, IndexError, ValueError):
+                summary.errors[file_path] = "Failed to extract symbol and exchange from file name"
+                continue
+
+            tasks.append((file_path, symbol, exchange))
+
+        if not tasks:
+            return summary
+
+        max_workers = max_workers or os.cpu_count()
+        task_iter: Iterator[tuple] = iter(tasks)
+        pending: Dict[Future, tuple] = {}
+
+        with ProcessPoolExecutor(max_workers) as executor:
+            while True:
+                # Keep a bounded number of parsed files waiting for the writer
+                while len(pending) < max_workers * 2 and not self.is_job_cancelled():
+                    task: Optional[tuple] = next(task_iter, None)
+                    if not task:
+                        break
+
+                    future: Future = executor.submit(
+                        read_bar_file, task[0], heads, datetime_format, tz_name, batch_size, format_name
+                    )
+                    pending[future] = task
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    file_path, symbol, exchange = pending.pop(future)
+
+                    try:
+                        columns: Dict[str, list] = future.result()
+                    except Exception as e:
+                        summary.errors[file_path] = str(e)
+                        continue
+
+                    dts: List[datetime] = columns["datetime"]
+                    if not dts:
+                        summary.results[file_path] = (None, None, 0)
+                        continue
+
+                    for i in range(0, len(dts), batch_size):
+                        batch: Dict[str, list] = {
+                            name: values[i: i + batch_size] for name, values in columns.items()
+                        }
+                        bars: List[BarData] = columns_to_bars(batch, symbol, exchange, interval)
+                        if merge:
+                            summary.merged.add(self.merge_bar_data(bars))
+                        else:
+                            self.save_bar_data(bars)
+
+                    # do some statistics
+                    start: datetime = dts[0]
+                    end: datetime = dts[-1]
+                    count: int = len(dts)
+
+                    summary.results[file_path] = (start, end, count)
+                    summary.count += count
+
+                    if not summary.start or start < summary.start:
+                        summary.start = start
+                    if not summary.end or end > summary.end:
+                        summary.end = end
+
+                    finished: int = len(summary.results) + len(summary.errors)
+                    msg: str = f"{os.path.basename(file_path)} imported, {count} bars"
+                    self.update_job(finished, len(file_paths), msg)
+
+        if merge:
+            self.write_log(f"Imported {len(summary.results)} files in merge mode, {summary.merged}")
+
+        return summary
+
     def output_data_to_csv(
         self,
         file_path: str,
@@ -103,60 +875,294 @@ class ManagerEngine(BaseEngine):
         end: datetime
     ) -> bool:
         """"""
-        bars: List[BarData] = self.load_bar_data(symbol, exchange, interval, start, end)
-
-        fieldnames: list = [
-            "symbol",
-            "exchange",
-            "datetime",
-            "open",
-            "high",
-            "low",
-            "close",
-            "volume",
-            "turnover",
-            "open_interest"
-        ]
-
-        try:
-            with open(file_path, "w") as f:
-                writer: csv.DictWriter = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
-                writer.writeheader()
-
-                for bar in bars:
-                    d: dict = {
-                        "symbol": bar.symbol,
-                        "exchange": bar.exchange.value,
-                        "datetime": bar.datetime.strftime("%Y-%m-%d %H:%M:%S"),
-                        "open": bar.open_price,
-                        "high": bar.high_price,
-                        "low": bar.low_price,
-                        "close": bar.close_price,
-                        "turnover": bar.turnover,
-                        "volume": bar.volume,
-                        "open_interest": bar.open_interest,
-                    }
-                    writer.writerow(d)
-
-            return True
-        except PermissionError:
-            return False
-
-    def get_bar_overview(self) -> List[BarOverview]:
-        """"""
-        return self.database.get_bar_overview()
+        return self.export_bar_data(file_path, symbol, exchange, interval, start, end, "CSV")
 
-    def load_bar_data(
+    def export_bar_data(
         self,
+        file_path: str,
         symbol: str,
         exchange: Exchange,
         interval: Interval,
         start: datetime,
-        end: datetime
-    ) -> List[BarData]:
-        """"""
-        bars: List[BarData] = self.database.load_bar_data(
-            symbol,
+        end: datetime,
+        format_name: str
+    ) -> bool:
+        """
+        Export bar data into file with the writer registered for format_name.
+        """
+        count: Optional[int] = self.write_bar_file(
+            file_path, symbol, exchange, interval, start, end, format_name
+        )
+        return count is not None
+
+    def write_bar_file(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        format_name: str
+    ) -> Optional[int]:
+        """
+        Write bar data into file and get number of bars written, or None
+        if the file cannot be opened.
+
+        Bars are loaded from database window by window and passed to the
+        writer batch by batch, so memory usage does not grow with the
+        exported range.
+        """
+        from .formats import BAR_WRITERS
+
+        writer_class: Type[BaseBarWriter] = BAR_WRITERS[format_name]
+
+        count: int = 0
+        start_time: float = perf_counter()
+
+        try:
+            writer: BaseBarWriter = writer_class(file_path, symbol, exchange, interval)
+        except PermissionError:
+            return None
+
+        try:
+            for bars in self.iter_bar_data(symbol, exchange, interval, start, end):
+                writer.write(bars)
+                count += len(bars)
+
+                self.update_job(count, 0, f"{count} bars exported")
+                if self.is_job_cancelled():
+                    break
+        finally:
+            writer.close()
+
+        cost: float = perf_counter() - start_time
+        self.write_log(
+            f"Exported {count} bars of {symbol}.{exchange.value} {interval.value} "
+            f"to {format_name} in {cost:.2f}s, {count / max(cost, 1e-6):.0f} rows/s"
+        )
+
+        return count
+
+    def get_export_formats(self) -> Dict[str, str]:
+        """
+        Get available export formats and their file suffixes.
+        """
+        from .formats import BAR_WRITERS
+
+        return {name: writer_class.suffix for name, writer_class in BAR_WRITERS.items()}
+
+    def get_bar_overview(self) -> List[BarOverview]:
+        """
+        Get overviews of all bar data from the in-memory index.
+
+        The index is loaded from database on first use, and then kept up to
+        date by data saved and deleted through this engine.
+        """
+        if not self.overviews_loaded:
+            self.refresh_bar_overview()
+
+        with self.overviews_lock:
+            return list(self.overviews.values())
+
+    def get_series_overview(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> Optional[BarOverview]:
+        """
+        Get overview of a series from the in-memory index.
+        """
+        if not self.overviews_loaded:
+            self.refresh_bar_overview()
+
+        with self.overviews_lock:
+            return self.overviews.get((symbol, exchange, interval), None)
+
+    def refresh_bar_overview(self) -> List[OverviewChange]:
+        """
+        Reload the overview index from database, e.g. to see data written by
+        other programs. Only series changed since last load are published.
+        """
+        overviews: List[BarOverview] = self.database.get_bar_overview()
+
+        # Copy into plain objects, since database may return its own records
+        index: Dict[Tuple[str, Exchange, Interval], BarOverview] = {}
+        for data in overviews:
+            key: Tuple[str, Exchange, Interval] = (data.symbol, data.exchange, data.interval)
+
+            index[key] = BarOverview(
+                *key,
+                data.count,
+                convert_tz(to_db_tz(data.start)),
+                convert_tz(to_db_tz(data.end))
+            )
+
+        changes: List[OverviewChange] = []
+
+        with self.overviews_lock:
+            if self.overviews_loaded:
+                for key, overview in index.items():
+                    if self.overviews.get(key, None) != overview:
+                        changes.append(OverviewChange(*key, overview))
+
+                for key in self.overviews.keys() - index.keys():
+                    changes.append(OverviewChange(*key))
+
+            self.overviews = index
+            self.overviews_loaded = True
+
+        # Data changed by other programs
+        if self.cache:
+            for change in changes:
+                self.cache.remove(change.symbol, change.exchange, change.interval)
+
+        if changes:
+            self.put_overview_event(changes)
+
+        return changes
+
+    def save_bar_data(self, bars: List[BarData], count: Optional[int] = None) -> None:
+        """
+        Save bars of one series into database and update the overview index.
+
+        count is the number of bars not stored before. If not given, bars
+        outside the stored range are counted as new.
+        """
+        if not bars:
+            return
+
+        # Read before saving, since database may convert fields of bars in place
+        bar: BarData = bars[0]
+        key: Tuple[str, Exchange, Interval] = (bar.symbol, bar.exchange, bar.interval)
+
+        dts: List[datetime] = [to_db_tz(bar.datetime) for bar in bars]
+        start: datetime = convert_tz(min(dts))
+        end: datetime = convert_tz(max(dts))
+
+        self.database.save_bar_data(bars)
+
+        if self.cache:
+            self.cache.remove(*key)
+
+        with self.overviews_lock:
+            # Index not loaded yet, it will be read from database later
+            if not self.overviews_loaded:
+                return
+
+            old: Optional[BarOverview] = self.overviews.get(key, None)
+
+            if not old:
+                overview: BarOverview = BarOverview(*key, len(bars), start, end)
+            else:
+                if count is None:
+                    old_start: datetime = to_db_tz(old.start)
+                    old_end: datetime = to_db_tz(old.end)
+                    count = sum(1 for dt in dts if dt < old_start or dt > old_end)
+
+                overview: BarOverview = BarOverview(
+                    *key,
+                    old.count + count,
+                    min(old.start, start),
+                    max(old.end, end)
+                )
+
+            self.overviews[key] = overview
+
+        self.put_overview_event([OverviewChange(*key, overview)])
+
+    def merge_bar_data(self, bars: List[BarData]) -> MergeResult:
+        """
+        Save bars of one series into database, skipping bars already stored
+        with the same values.
+
+        Only the part of bars inside the stored range is compared, with
+        stored bars loaded for that part only. Bars outside of it are new
+        and saved without loading anything.
+        """
+        from .formats import BAR_DTYPE, bars_to_array
+        from .resample import convert_wall_clock
+
+        if not bars:
+            return MergeResult()
+
+        bar: BarData = bars[0]
+        symbol, exchange, interval = bar.symbol, bar.exchange, bar.interval
+
+        # Wall clock in DB_TZ, same as stored bars
+        timestamps: np.ndarray = np.array([to_db_tz(bar.datetime).timestamp() for bar in bars])
+        utc: np.ndarray = np.round(timestamps).astype("M8[s]")
+        dts: np.ndarray = convert_wall_clock(utc, timezone.utc, DB_TZ)
+
+        start: datetime = dts.min().astype(datetime)
+        end: datetime = dts.max().astype(datetime)
+
+        overview: Optional[BarOverview] = self.get_series_overview(symbol, exchange, interval)
+        if overview:
+            start = max(start, overview.start)
+            end = min(end, overview.end)
+
+        if not overview or start > end:
+            self.save_bar_data(bars, len(bars))
+            return MergeResult(inserted=len(bars))
+
+        stored: np.ndarray = self.load_bar_array(symbol, exchange, interval, start, end)
+
+        data: np.ndarray = bars_to_array(bars)
+        data["datetime"] = dts
+
+        if len(stored):
+            index: np.ndarray = np.searchsorted(stored["datetime"], dts).clip(max=len(stored) - 1)
+            matched: np.ndarray = stored[index]
+            found: np.ndarray = matched["datetime"] == dts
+
+            changed: np.ndarray = np.zeros(len(bars), dtype=bool)
+            for name in BAR_DTYPE.names[1:]:
+                old: np.ndarray = matched[name]
+                new: np.ndarray = data[name]
+                changed |= (old != new) & ~(np.isnan(old) & np.isnan(new))
+            changed &= found
+        else:
+            found: np.ndarray = np.zeros(len(bars), dtype=bool)
+            changed: np.ndarray = found
+
+        inserted: int = len(bars) - int(np.count_nonzero(found))
+        updated: int = int(np.count_nonzero(changed))
+
+        written: List[BarData] = [bars[i] for i in np.flatnonzero(~found | changed)]
+        self.save_bar_data(written, inserted)
+
+        return MergeResult(inserted, updated, len(bars) - inserted - updated)
+
+    def remove_bar_overview(self, symbol: str, exchange: Exchange, interval: Interval) -> None:
+        """"""
+        if self.cache:
+            self.cache.remove(symbol, exchange, interval)
+
+        with self.overviews_lock:
+            overview: Optional[BarOverview] = self.overviews.pop((symbol, exchange, interval), None)
+
+        if overview:
+            self.put_overview_event([OverviewChange(symbol, exchange, interval)])
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> List[BarData]:
+        """"""
+        if self.cache:
+            return [
+                bar for bars in self.iter_bar_data(symbol, exchange, interval, start, end)
+                for bar in bars
+            ]
+
+        bars: List[BarData] = self.database.load_bar_data(
+            symbol,
             exchange,
             interval,
             start,
@@ -165,6 +1171,107 @@ class ManagerEngine(BaseEngine):
 
         return bars
 
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> np.ndarray:
+        """
+        Load bar data as a structured array of BAR_DTYPE.
+
+        Bars are converted window by window, so only one window of BarData
+        objects exists at any time.
+        """
+        from .formats import BAR_DTYPE
+
+        arrays: List[np.ndarray] = list(self.iter_bar_arrays(symbol, exchange, interval, start, end))
+
+        if not arrays:
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        return np.concatenate(arrays)
+
+    def iter_bar_arrays(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> Iterator[np.ndarray]:
+        """
+        Load bar data window by window as structured arrays of BAR_DTYPE.
+        """
+        from .formats import bars_to_array
+
+        pager: BarPager = self.iter_bar_data(symbol, exchange, interval, start, end)
+
+        # Cached bars need no conversion
+        if isinstance(pager, CachedBarPager):
+            yield np.array(pager.data)
+            return
+
+        for bars in pager:
+            yield bars_to_array(bars)
+
+    def resample_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        target: Interval,
+        incremental: bool = True
+    ) -> int:
+        """
+        Derive bars of target interval from stored bars and save them into database.
+
+        Bars are grouped by the trading session of exchange. If incremental
+        is set and derived bars exist, only bars from the last derived one
+        are computed and saved again.
+        """
+        from .formats import array_to_bars
+        from .resample import can_resample, resample_array
+
+        if not can_resample(interval, target):
+            raise ValueError(f"Cannot resample {interval.value} bars into {target.value}")
+
+        self.get_bar_overview()
+
+        with self.overviews_lock:
+            source: Optional[BarOverview] = self.overviews.get((symbol, exchange, interval), None)
+            derived: Optional[BarOverview] = self.overviews.get((symbol, exchange, target), None)
+
+        if not source:
+            return 0
+
+        session: TradingSession = get_trading_session(exchange, interval)
+
+        start: datetime = source.start
+        last_dt: Optional[datetime] = None
+
+        if incremental and derived:
+            last_dt = to_db_tz(derived.end)
+
+            # Load bars some days earlier, so that group of the last derived bar is complete
+            margin: timedelta = timedelta(days=7) + session.get_day_shift()
+            start = max(start, convert_tz(last_dt - margin))
+
+        data: np.ndarray = self.load_bar_array(symbol, exchange, interval, start, source.end)
+        result: np.ndarray = resample_array(data, target, session)
+
+        bars: List[BarData] = array_to_bars(result, symbol, exchange, target, session.tz)
+
+        # Groups before the last derived bar may be incomplete
+        if last_dt:
+            bars = [bar for bar in bars if bar.datetime >= last_dt]
+
+        self.save_bar_data(bars)
+
+        return len(bars)
+
     def delete_bar_data(
         self,
         symbol: str,
@@ -178,44 +1285,1527 @@ class ManagerEngine(BaseEngine):
             interval
         )
 
+        self.remove_bar_overview(symbol, exchange, interval)
+
         return count
 
-    def download_bar_data(
+    def delete_bar_range(
         self,
         symbol: str,
         exchange: Exchange,
-        interval: str,
+        interval: Interval,
         start: datetime,
-        output: Callable
+        end: datetime
     ) -> int:
         """
-        Query bar data from datafeed.
+        Delete bars of a series between start and end, both inclusive.
+
+        For databases based on peewee (e.g. SQLite, MySQL, PostgreSQL),
+        rows are deleted directly with one statement per time window, so
+        that huge ranges never hold a long write lock. Otherwise the series
+        is rewritten without the range.
         """
-        req: HistoryRequest = HistoryRequest(
-            symbol=symbol,
-            exchange=exchange,
-            interval=Interval(interval),
-            start=start,
-            end=datetime.now(DB_TZ)
+        overview: Optional[BarOverview] = self.get_series_overview(symbol, exchange, interval)
+        if not overview:
+            return 0
+
+        start = max(convert_tz(to_db_tz(start)), overview.start)
+        end = min(convert_tz(to_db_tz(end)), overview.end)
+
+        if start > end:
+            return 0
+
+        if start == overview.start and end == overview.end:
+            return self.delete_bar_data(symbol, exchange, interval)
+
+        models: Optional[tuple] = self.get_bar_models()
+
+        if not models:
+            return self.rewrite_bar_data(
+                symbol,
+                exchange,
+                interval,
+                lambda dts: (dts < np.datetime64(start, "s")) | (dts > np.datetime64(end, "s"))
+            )
+
+        bar_model: type = models[0]
+        delta: timedelta = WINDOW_DELTA_MAP.get(interval, TICK_WINDOW)
+
+        conditions: list = []
+        window_start: datetime = start
+
+        while window_start <= end:
+            window_end: datetime = window_start + delta
+
+            if window_end > end:
+                conditions.append((bar_model.datetime >= window_start) & (bar_model.datetime <= end))
+            else:
+                conditions.append((bar_model.datetime >= window_start) & (bar_model.datetime < window_end))
+
+            window_start = window_end
+
+        return self.delete_bar_rows(symbol, exchange, interval, conditions)
+
+    def delete_bar_datetimes(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        dts: np.ndarray
+    ) -> int:
+        """
+        Delete bars at given times, as M8[s] wall clock in DB_TZ.
+
+        Rows are deleted directly in batches for databases based on peewee,
+        otherwise the series is rewritten without those bars.
+        """
+        if not len(dts):
+            return 0
+
+        models: Optional[tuple] = self.get_bar_models()
+
+        if not models:
+            return self.rewrite_bar_data(symbol, exchange, interval, lambda data: ~np.isin(data, dts))
+
+        bar_model: type = models[0]
+        values: List[datetime] = dts.astype("M8[us]").tolist()
+
+        conditions: list = [
+            bar_model.datetime.in_(values[i: i + DELETE_BATCH_SIZE])
+            for i in range(0, len(values), DELETE_BATCH_SIZE)
+        ]
+
+        return self.delete_bar_rows(symbol, exchange, interval, conditions)
+
+    def delete_bulk_bar_data(
+        self,
+        keys: List[Tuple[str, Exchange, Interval]],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> int:
+        """
+        Delete multiple series, or only bars between start and end of them.
+        """
+        count: int = 0
+
+        for i, (symbol, exchange, interval) in enumerate(keys):
+            if self.is_job_cancelled():
+                break
+
+            if start and end:
+                count += self.delete_bar_range(symbol, exchange, interval, start, end)
+            else:
+                count += self.delete_bar_data(symbol, exchange, interval)
+
+            self.update_job(i + 1, len(keys), f"{symbol}.{exchange.value} {interval.value} deleted")
+
+        self.write_log(f"Deleted {count} bars of {len(keys)} series")
+
+        return count
+
+    def get_bar_models(self) -> Optional[tuple]:
+        """
+        Get peewee models of bar and bar overview tables, if defined by
+        module of the database, e.g. vnpy_sqlite, vnpy_mysql.
+        """
+        module: object = sys.modules.get(type(self.database).__module__, None)
+
+        bar_model: Optional[type] = getattr(module, "DbBarData", None)
+        overview_model: Optional[type] = getattr(module, "DbBarOverview", None)
+
+        if not hasattr(bar_model, "delete") or not hasattr(overview_model, "delete"):
+            return None
+
+        return bar_model, overview_model
+
+    def delete_bar_rows(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        conditions: list
+    ) -> int:
+        """
+        Delete rows of a series matching each condition with peewee models,
+        then update overview of the series in database and in the index.
+        """
+        bar_model, overview_model = self.get_bar_models()
+
+        series: object = (
+            (bar_model.symbol == symbol)
+            & (bar_model.exchange == exchange.value)
+            & (bar_model.interval == interval.value)
         )
 
-        vt_symbol: str = f"{symbol}.{exchange.value}"
-        contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
+        count: int = 0
 
-        # If history data provided in gateway, then query
-        if contract and contract.history_data:
-            data: List[BarData] = self.main_engine.query_history(
-                req, contract.gateway_name
+        for condition in conditions:
+            count += bar_model.delete().where(series & condition).execute()
+
+            if self.is_job_cancelled():
+                break
+
+        if not count:
+            return 0
+
+        overview_series: object = (
+            (overview_model.symbol == symbol)
+            & (overview_model.exchange == exchange.value)
+            & (overview_model.interval == interval.value)
+        )
+
+        query: object = bar_model.select(bar_model.datetime).where(series)
+        first: object = query.order_by(bar_model.datetime.asc()).first()
+
+        if not first:
+            overview_model.delete().where(overview_series).execute()
+            self.remove_bar_overview(symbol, exchange, interval)
+            return count
+
+        last: object = query.order_by(bar_model.datetime.desc()).first()
+
+        row: object = overview_model.get_or_none(overview_series)
+        if row:
+            row.count -= count
+            row.start = first.datetime
+            row.end = last.datetime
+            row.save()
+
+        if self.cache:
+            self.cache.remove(symbol, exchange, interval)
+
+        key: Tuple[str, Exchange, Interval] = (symbol, exchange, interval)
+
+        with self.overviews_lock:
+            old: Optional[BarOverview] = self.overviews.get(key, None)
+            if not old:
+                return count
+
+            overview: BarOverview = BarOverview(
+                *key, old.count - count, first.datetime, last.datetime
             )
-        # Otherwise use datafeed to query data
-        else:
-            data: List[BarData] = self.datafeed.query_bar_history(req, output)
+            self.overviews[key] = overview
 
-        if data:
-            self.database.save_bar_data(data)
-            return (len(data))
+        self.put_overview_event([OverviewChange(*key, overview)])
 
-        return 0
+        return count
+
+    def rewrite_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        kept_func: Callable[[np.ndarray], np.ndarray]
+    ) -> int:
+        """
+        Rewrite the whole series with only bars whose time is kept by
+        kept_func, and get number of bars removed.
+
+        Used when BaseDatabase can only delete a whole series: all stored
+        bars are deleted and the remaining ones saved again. Remaining bars
+        are kept in a backup file under QUARANTINE_FOLDER until they are
+        saved, and are restored from it if rewriting fails.
+        """
+        overview: Optional[BarOverview] = self.get_series_overview(symbol, exchange, interval)
+        if not overview:
+            return 0
+
+        data: np.ndarray = self.load_bar_array(symbol, exchange, interval, overview.start, overview.end)
+        kept: np.ndarray = kept_func(data["datetime"])
+
+        count: int = len(data) - int(np.count_nonzero(kept))
+        if not count:
+            return 0
+
+        data = data[kept]
+
+        vt_symbol: str = f"{symbol}.{exchange.value}"
+        backup_path: str = str(
+            get_folder_path(QUARANTINE_FOLDER).joinpath(
+                f"{symbol}.{exchange.value}.{interval.value}.backup.npy"
+            )
+        )
+        np.save(backup_path, data)
+
+        self.write_log(
+            f"Rewriting whole series {vt_symbol} {interval.value} to remove {count} bars, "
+            f"{len(data)} remaining bars backed up in {backup_path}"
+        )
+
+        try:
+            self.delete_bar_data(symbol, exchange, interval)
+            self.save_bar_array(symbol, exchange, interval, data)
+        except Exception as e:
+            self.write_log(f"Failed to rewrite {vt_symbol} {interval.value}: {e}, restoring from {backup_path}")
+
+            try:
+                self.delete_bar_data(symbol, exchange, interval)
+                self.save_bar_array(symbol, exchange, interval, np.load(backup_path))
+            except Exception:
+                self.write_log(f"Failed to restore {vt_symbol} {interval.value}, remaining bars kept in {backup_path}")
+                raise
+
+            self.write_log(f"Restored {len(data)} bars of {vt_symbol} {interval.value} from {backup_path}")
+
+        os.remove(backup_path)
+
+        return count
+
+    def save_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        data: np.ndarray
+    ) -> None:
+        """"""
+        from .formats import array_to_bars
+
+        for i in range(0, len(data), IMPORT_BATCH_SIZE):
+            bars: List[BarData] = array_to_bars(data[i: i + IMPORT_BATCH_SIZE], symbol, exchange, interval)
+            self.save_bar_data(bars)
+
+    def scan_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        jump_limit: Optional[float] = None
+    ) -> "ScanResult":
+        """
+        Check quality of bars between start and end, or of all stored bars
+        of the series if not given.
+
+        Bars are streamed window by window and checked with BarScanner.
+        Nothing is changed in database, pass the result to fix_bar_data for
+        quarantining or repairing bad bars.
+        """
+        from .quality import JUMP_LIMIT, BarScanner, ScanResult
+
+        if jump_limit is None:
+            jump_limit = JUMP_LIMIT
+
+        result: ScanResult = ScanResult(symbol, exchange, interval)
+
+        if not start or not end:
+            overview: Optional[BarOverview] = self.get_series_overview(symbol, exchange, interval)
+            if not overview:
+                return result
+
+            start = start or overview.start
+            end = end or overview.end
+
+        scanner: BarScanner = BarScanner(interval, jump_limit)
+
+        for data in self.iter_bar_arrays(symbol, exchange, interval, start, end):
+            masks: Dict[str, np.ndarray] = scanner.check(data)
+            result.update(data, masks)
+
+            bad: np.ndarray = np.logical_or.reduce(list(masks.values()))
+            if bad.any():
+                result.bad.append(data[bad])
+                result.duplicates.append(data["datetime"][masks["duplicate"]])
+
+            repaired: np.ndarray = scanner.repair(data, masks)
+            if len(repaired):
+                result.repaired.append(repaired)
+
+        return result
+
+    def fix_bar_data(self, result: "ScanResult", action: "ScanAction") -> "ScanResult":
+        """
+        Quarantine or repair bad bars found by scan_bar_data.
+
+        Quarantine writes all bad bars into a CSV file under
+        QUARANTINE_FOLDER and deletes them from database. Repair deletes
+        duplicates, saves repaired bars and leaves other bad bars, e.g.
+        jumps, as they are.
+        """
+        from .formats import BAR_WRITERS, array_to_bars
+        from .quality import ScanAction
+
+        symbol: str = result.symbol
+        exchange: Exchange = result.exchange
+        interval: Interval = result.interval
+
+        if action == ScanAction.QUARANTINE and result.bad:
+            bad: np.ndarray = np.concatenate(result.bad)
+
+            file_name: str = f"{symbol}.{exchange.value}.{interval.value}.{datetime.now():%Y%m%d%H%M%S}.csv"
+            result.quarantine_path = str(get_folder_path(QUARANTINE_FOLDER).joinpath(file_name))
+
+            writer: BaseBarWriter = BAR_WRITERS["CSV"](result.quarantine_path, symbol, exchange, interval)
+            writer.write(array_to_bars(bad, symbol, exchange, interval))
+            writer.close()
+
+            result.removed = self.delete_bar_datetimes(symbol, exchange, interval, bad["datetime"])
+        elif action == ScanAction.REPAIR:
+            if result.duplicates:
+                duplicates: np.ndarray = np.concatenate(result.duplicates)
+                result.removed = self.delete_bar_datetimes(symbol, exchange, interval, duplicates)
+
+            if result.repaired:
+                repaired: np.ndarray = np.concatenate(result.repaired)
+                self.save_bar_data(array_to_bars(repaired, symbol, exchange, interval), 0)
+                result.fixed = len(repaired)
+
+        return result
+
+    def scan_all_bar_data(
+        self,
+        action: Optional["ScanAction"] = None,
+        jump_limit: Optional[float] = None
+    ) -> List["ScanResult"]:
+        """
+        Check quality of all bar data in database, and quarantine or repair
+        bad bars unless action is report.
+
+        Series are scanned concurrently by a bounded worker pool, while
+        changes are written into database by the calling thread only.
+        """
+        from .quality import ScanAction
+
+        action = action or ScanAction.REPORT
+
+        overviews: List[BarOverview] = self.get_bar_overview()
+        results: List[ScanResult] = []
+
+        total: int = len(overviews)
+        cancelled: ThreadEvent = self.get_job_cancel_event()
+
+        self.update_job(0, total)
+
+        with ThreadPoolExecutor(self.update_workers) as executor:
+            futures: Dict[Future, BarOverview] = {}
+
+            for overview in overviews:
+                future: Future = executor.submit(
+                    self.scan_series_data,
+                    overview.symbol,
+                    overview.exchange,
+                    overview.interval,
+                    jump_limit,
+                    cancelled
+                )
+                futures[future] = overview
+
+            for future in as_completed(futures):
+                overview: BarOverview = futures[future]
+                vt_symbol: str = f"{overview.symbol}.{overview.exchange.value}"
+
+                try:
+                    result: Optional[ScanResult] = future.result()
+                except Exception as e:
+                    self.write_log(f"Failed to scan {vt_symbol} {overview.interval.value}: {e}")
+                    continue
+
+                if not result:
+                    continue
+
+                if action != ScanAction.REPORT and result.bad:
+                    self.fix_bar_data(result, action)
+
+                results.append(result)
+
+                msg: str = f"{vt_symbol} {overview.interval.value} scanned, {result.bad_count} bad bars"
+                self.update_job(len(results), total, msg)
+
+        bad_count: int = sum(result.bad_count for result in results)
+        self.write_log(f"Scanned {len(results)} series, {bad_count} bad bars found")
+
+        return results
+
+    def scan_series_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        jump_limit: float,
+        cancelled: ThreadEvent
+    ) -> Optional["ScanResult"]:
+        """"""
+        if cancelled.is_set():
+            return None
+
+        return self.scan_bar_data(symbol, exchange, interval, jump_limit=jump_limit)
+
+    def create_snapshot(self, path: str, max_workers: int = 0) -> int:
+        """
+        Save all bar data into a compressed snapshot file, and get number of
+        bars saved.
+
+        Series are loaded and compressed concurrently by a bounded worker
+        pool. The file is written under a temporary name and only replaces
+        path when finished, so a failed or cancelled snapshot never leaves
+        a broken file.
+        """
+        from .snapshot import SnapshotWriter
+
+        overviews: List[BarOverview] = self.get_bar_overview()
+
+        total: int = len(overviews)
+        finished: int = 0
+        count: int = 0
+
+        cancelled: ThreadEvent = self.get_job_cancel_event()
+        temp_path: str = path + ".tmp"
+        writer: SnapshotWriter = SnapshotWriter(temp_path)
+
+        self.update_job(0, total)
+
+        try:
+            with ThreadPoolExecutor(max_workers or self.update_workers) as executor:
+                futures: Dict[Future, BarOverview] = {
+                    executor.submit(self.write_snapshot_series, writer, overview, cancelled): overview
+                    for overview in overviews
+                }
+
+                for future in as_completed(futures):
+                    overview: BarOverview = futures[future]
+                    count += future.result()
+                    finished += 1
+
+                    msg: str = f"{overview.symbol}.{overview.exchange.value} {overview.interval.value} saved"
+                    self.update_job(finished, total, msg)
+        finally:
+            writer.close()
+
+            if cancelled.is_set() or finished < total:
+                os.remove(temp_path)
+
+        if cancelled.is_set():
+            return 0
+
+        os.replace(temp_path, path)
+
+        self.write_log(f"Saved snapshot of {count} bars in {total} series into {path}")
+
+        return count
+
+    def write_snapshot_series(
+        self,
+        writer: "SnapshotWriter",
+        overview: BarOverview,
+        cancelled: ThreadEvent
+    ) -> int:
+        """"""
+        arrays: Iterator[np.ndarray] = self.iter_bar_arrays(
+            overview.symbol, overview.exchange, overview.interval, overview.start, overview.end
+        )
+
+        # Stop loading as soon as the job is cancelled
+        arrays = takewhile(lambda _: not cancelled.is_set(), arrays)
+
+        return writer.write_series(overview.symbol, overview.exchange, overview.interval, arrays)
+
+    def restore_snapshot(self, path: str, merge: bool = False, max_workers: int = 0) -> int:
+        """
+        Load all bar data from a snapshot file into database, and get number
+        of bars loaded.
+
+        Chunks are decompressed ahead by a bounded worker pool, while the
+        calling thread saves them in order as large batches. In merge mode,
+        only bars not stored yet or changed are written.
+        """
+        from .formats import array_to_bars
+        from .snapshot import SnapshotReader
+
+        with SnapshotReader(path) as reader:
+            tasks: List[Tuple[dict, str]] = [
+                (info, name) for info in reader.series for name in info["chunks"]
+            ]
+            task_iter: Iterator[Tuple[dict, str]] = iter(tasks)
+
+            total: int = len(tasks)
+            finished: int = 0
+            count: int = 0
+            merged: MergeResult = MergeResult()
+
+            max_workers = max_workers or self.update_workers
+            pending: deque = deque()
+
+            with ThreadPoolExecutor(max_workers) as executor:
+                while True:
+                    # Keep a bounded number of decoded chunks waiting for the writer
+                    while len(pending) < max_workers * 2 and not self.is_job_cancelled():
+                        task: Optional[Tuple[dict, str]] = next(task_iter, None)
+                        if not task:
+                            break
+
+                        info, name = task
+                        pending.append((info, executor.submit(reader.read_chunk, name)))
+
+                    if not pending or self.is_job_cancelled():
+                        break
+
+                    info, future = pending.popleft()
+                    data: np.ndarray = future.result()
+
+                    bars: List[BarData] = array_to_bars(data, info["symbol"], info["exchange"], info["interval"])
+                    if merge:
+                        merged.add(self.merge_bar_data(bars))
+                    else:
+                        self.save_bar_data(bars)
+
+                    count += len(bars)
+                    finished += 1
+
+                    msg: str = f"{info['symbol']}.{info['exchange'].value} {info['interval'].value} restored"
+                    self.update_job(finished, total, msg)
+
+        if merge:
+            self.write_log(f"Restored {count} bars of {len(reader.series)} series from {path} in merge mode, {merged}")
+        else:
+            self.write_log(f"Restored {count} bars of {len(reader.series)} series from {path}")
+
+        return count
+
+    def migrate_bar_data(
+        self,
+        target_settings: dict,
+        source_settings: Optional[dict] = None,
+        max_workers: int = 0,
+        resume: bool = True
+    ) -> List[MigrationResult]:
+        """
+        Copy all bar data from source database into target database, both
+        opened from settings by open_database. The database of this engine
+        is the source if source settings are not given.
+
+        Series are copied window by window by a bounded worker pool. The
+        last bar copied of each series is recorded in the checkpoint file,
+        so migrating into the same target again resumes interrupted series
+        and only copies bars newer than finished ones, unless resume is
+        False.
+        """
+        if source_settings is None:
+            source: BaseDatabase = self.database
+        else:
+            source: BaseDatabase = open_database(source_settings)
+
+        target: BaseDatabase = open_database(target_settings)
+        target_key: str = get_database_key(target_settings)
+
+        # SQLite allows only one writer at a time, series are still loaded concurrently
+        if {**SETTINGS, **target_settings}["database.name"] == "sqlite":
+            write_lock: object = Lock()
+        else:
+            write_lock: object = nullcontext()
+
+        overviews: List[BarOverview] = source.get_bar_overview()
+        results: List[MigrationResult] = []
+
+        target_series: set = {
+            (overview.symbol, overview.exchange, overview.interval)
+            for overview in target.get_bar_overview()
+        }
+
+        total: int = len(overviews)
+        cancelled: ThreadEvent = self.get_job_cancel_event()
+        start_time: float = perf_counter()
+
+        self.update_job(0, total)
+
+        with ThreadPoolExecutor(max_workers or self.update_workers) as executor:
+            futures: Dict[Future, BarOverview] = {
+                executor.submit(
+                    self.migrate_series_data,
+                    source,
+                    target,
+                    target_key,
+                    write_lock,
+                    overview,
+                    (overview.symbol, overview.exchange, overview.interval) in target_series,
+                    resume,
+                    cancelled
+                ): overview
+                for overview in overviews
+            }
+
+            for future in as_completed(futures):
+                result: MigrationResult = future.result()
+                results.append(result)
+
+                vt_symbol: str = f"{result.symbol}.{result.exchange.value}"
+
+                if result.error:
+                    self.write_log(f"Failed to migrate {vt_symbol} {result.interval.value}: {result.error}")
+
+                msg: str = f"{vt_symbol} {result.interval.value} migrated, {result.speed:.0f} bars/s"
+                self.update_job(len(results), total, msg)
+
+        cost: float = perf_counter() - start_time
+        count: int = sum(result.count for result in results)
+
+        self.write_log(
+            f"Migrated {count} bars of {total} series into {target_key} "
+            f"in {cost:.1f}s, {count / max(cost, 1e-6):.0f} bars/s"
+        )
+
+        return results
+
+    def migrate_series_data(
+        self,
+        source: BaseDatabase,
+        target: BaseDatabase,
+        target_key: str,
+        write_lock: object,
+        overview: BarOverview,
+        existing: bool,
+        resume: bool,
+        cancelled: ThreadEvent
+    ) -> MigrationResult:
+        """"""
+        symbol, exchange, interval = overview.symbol, overview.exchange, overview.interval
+        result: MigrationResult = MigrationResult(symbol, exchange, interval)
+
+        key: str = f"migrate.{target_key}.{symbol}.{exchange.value}.{interval.value}"
+        start: datetime = overview.start
+
+        with self.checkpoints_lock:
+            checkpoint: Optional[str] = self.checkpoints.get(key, None)
+
+        resumed: bool = bool(checkpoint and resume)
+        if resumed:
+            start = datetime.fromisoformat(checkpoint) + timedelta(seconds=1)
+
+        start_time: float = perf_counter()
+
+        # Count of target overview is recalculated for the first batch, and
+        # for all batches if bars stored in target may be overwritten
+        stream: bool = False
+
+        try:
+            for bars in BarPager(source, symbol, exchange, interval, start, overview.end):
+                if cancelled.is_set():
+                    break
+
+                # Read before saving, since database may convert fields of bars in place
+                end: datetime = to_db_tz(bars[-1].datetime)
+                count: int = len(bars)
+
+                with write_lock:
+                    target.save_bar_data(bars, stream)
+                stream = resumed or not existing
+
+                self.save_checkpoint(key, end)
+                result.count += count
+        except Exception as e:
+            result.error = str(e)
+
+        result.cost = perf_counter() - start_time
+
+        return result
+
+    def query_bar_history(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        output: Callable
+    ) -> Optional[List[BarData]]:
+        """
+        Query bar data from gateway or datafeed, limited by query rate of the source.
+
+        None is returned if the query failed.
+        """
+        req: HistoryRequest = HistoryRequest(
+            symbol=symbol,
+            exchange=exchange,
+            interval=Interval(interval),
+            start=start,
+            end=end
+        )
+
+        vt_symbol: str = f"{symbol}.{exchange.value}"
+        contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
+
+        # If history data provided in gateway, then query
+        if contract and contract.history_data:
+            self.get_limiter(contract.gateway_name).acquire()
+
+            data: Optional[List[BarData]] = self.main_engine.query_history(
+                req, contract.gateway_name
+            )
+        # Otherwise use datafeed to query data
+        else:
+            self.get_limiter("datafeed").acquire()
+
+            data: Optional[List[BarData]] = self.datafeed.query_bar_history(req, output)
+
+        return data
+
+    def download_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: str,
+        start: datetime,
+        output: Callable,
+        merge: bool = False
+    ) -> int:
+        """
+        Query bar data from datafeed.
+        """
+        return self.download_bar_range(
+            symbol,
+            exchange,
+            Interval(interval),
+            start,
+            datetime.now(DB_TZ),
+            output,
+            merge
+        )
+
+    def download_bar_range(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        output: Callable,
+        merge: bool = False
+    ) -> int:
+        """
+        Download bars between start and end chunk by chunk.
+
+        Each chunk is saved into database as soon as it is received and
+        recorded in a checkpoint file. If the download is interrupted or a
+        query fails, downloading the same range again resumes after the
+        last finished chunk. In merge mode, only bars not stored yet or
+        changed are written.
+        """
+        start = to_db_tz(start)
+        end = to_db_tz(end)
+        delta: timedelta = WINDOW_DELTA_MAP[interval]
+
+        key: str = f"{symbol}.{exchange.value}.{interval.value}.{start.isoformat()}"
+
+        with self.checkpoints_lock:
+            checkpoint: Optional[str] = self.checkpoints.get(key, None)
+
+        if checkpoint:
+            chunk_start: datetime = datetime.fromisoformat(checkpoint)
+            output(f"Resume downloading {symbol}.{exchange.value} from {chunk_start}")
+        else:
+            chunk_start: datetime = start
+
+        count: int = 0
+        merged: MergeResult = MergeResult()
+
+        while chunk_start < end:
+            chunk_end: datetime = min(chunk_start + delta, end)
+
+            data: Optional[List[BarData]] = self.query_bar_history(
+                symbol, exchange, interval, chunk_start, chunk_end, output
+            )
+
+            # Query failed, keep checkpoint for resuming later
+            if data is None:
+                return count
+
+            # Bar on chunk boundary is already saved with the previous chunk
+            if chunk_start > start:
+                data = [bar for bar in data if bar.datetime > chunk_start]
+
+            if data and merge:
+                merged.add(self.merge_bar_data(data))
+                count += len(data)
+            elif data:
+                self.save_bar_data(data)
+                count += len(data)
+
+            self.save_checkpoint(key, chunk_end)
+            chunk_start = chunk_end
+
+            self.update_job(count, 0, f"{symbol}.{exchange.value} downloaded until {chunk_end}")
+
+            # Cancelled, keep checkpoint for resuming later
+            if self.is_job_cancelled():
+                return count
+
+        self.save_checkpoint(key, None)
+
+        if merge:
+            self.write_log(f"Downloaded {symbol}.{exchange.value} {interval.value} in merge mode, {merged}")
+
+        return count
+
+    def save_checkpoint(self, key: str, dt: Optional[datetime]) -> None:
+        """
+        Record end of the last finished chunk, or remove the record if dt is None.
+        """
+        with self.checkpoints_lock:
+            if dt:
+                self.checkpoints[key] = dt.isoformat()
+            else:
+                self.checkpoints.pop(key, None)
+
+            save_json(CHECKPOINT_FILENAME, self.checkpoints)
+
+    def download_missing_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        output: Callable,
+        fill_gaps: bool = True
+    ) -> int:
+        """
+        Download bars missing in database, see iter_missing_bar_data.
+
+        Each gap or window of new bars is saved as soon as it is received.
+        """
+        count: int = 0
+
+        # Only bars inside gaps or after stored end are kept, so all are new
+        for data in self.iter_missing_bar_data(
+            symbol, exchange, interval, start, end, output, fill_gaps
+        ):
+            self.save_bar_data(data, len(data))
+            count += len(data)
+
+        return count
+
+    def query_missing_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        output: Callable,
+        fill_gaps: bool = True
+    ) -> List[BarData]:
+        """
+        Query bars missing in database, see iter_missing_bar_data.
+        """
+        data: List[BarData] = []
+
+        for bars in self.iter_missing_bar_data(
+            symbol, exchange, interval, start, end, output, fill_gaps
+        ):
+            data.extend(bars)
+
+        return data
+
+    def iter_missing_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        output: Callable,
+        fill_gaps: bool = True
+    ) -> Iterator[List[BarData]]:
+        """
+        Query bars missing in database given the stored range [start, end],
+        and yield them gap by gap and window by window.
+
+        New bars are queried from stored end in windows of WINDOW_DELTA_MAP,
+        unless the trading session tells that no bar can be due yet. Bars
+        not finished yet are dropped, so that they are downloaded again once
+        finished. If fill_gaps is set, gaps inside the stored range are also
+        queried, gaps which the source has no data for are remembered and
+        skipped.
+        """
+        now: datetime = datetime.now(DB_TZ)
+        start = to_db_tz(start)
+        end = to_db_tz(end)
+
+        if fill_gaps:
+            key: str = f"{symbol}.{exchange.value}.{interval.value}"
+
+            for gap_start, gap_end in self.find_bar_gaps(symbol, exchange, interval, start, end):
+                if self.is_empty_gap(key, gap_start, gap_end):
+                    continue
+
+                bars: List[BarData] = self.query_bar_history(
+                    symbol, exchange, interval, gap_start, gap_end, output
+                )
+
+                # None means query failed, only remember gaps without data
+                if bars:
+                    # Source may return whole days, keep only bars inside the gap
+                    data: List[BarData] = [
+                        bar for bar in bars if gap_start <= to_db_tz(bar.datetime) <= gap_end
+                    ]
+                    if data:
+                        yield data
+                elif bars is not None:
+                    self.add_empty_gap(key, gap_start, gap_end)
+
+        # Skip querying new bars only if session covers all trading hours
+        # and no trading bar is expected after stored end
+        step: Optional[timedelta] = INTERVAL_DELTA_MAP.get(interval, None)
+        due: bool = True
+
+        if step:
+            session: TradingSession = get_trading_session(exchange, interval)
+            if session.complete:
+                due = bool(session.next_bar_time(end + step, step, now))
+
+        if not due:
+            return
+
+        # Long tails are split into windows, so that neither the request nor
+        # the bars held in memory grow with the time since last update
+        delta: timedelta = WINDOW_DELTA_MAP[interval]
+        window_start: datetime = end
+
+        while window_start < now:
+            window_end: datetime = min(window_start + delta, now)
+
+            bars: Optional[List[BarData]] = self.query_bar_history(
+                symbol, exchange, interval, window_start, window_end, output
+            )
+
+            # Query failed, later windows would leave a gap after stored end
+            if bars is None:
+                return
+
+            # Bar on window boundary is already kept with the previous window,
+            # and source may return whole days beyond the window
+            data: List[BarData] = []
+
+            for bar in bars:
+                dt: datetime = to_db_tz(bar.datetime)
+                if dt <= window_start or dt > window_end or (step and dt + step > now):
+                    continue
+                data.append(bar)
+
+            if data:
+                yield data
+
+            window_start = window_end
+
+    def find_bar_gaps(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Find ranges of bars missing in database between start and end.
+
+        Missing bars are only counted inside the trading session of the
+        exchange, so breaks, nights and weekends are not reported.
+        """
+        step: Optional[timedelta] = INTERVAL_DELTA_MAP.get(interval, None)
+        if not step:
+            return []
+
+        session: TradingSession = get_trading_session(exchange, interval)
+
+        gaps: List[Tuple[datetime, datetime]] = []
+        last_dt: Optional[datetime] = None
+
+        for bars in self.iter_bar_data(symbol, exchange, interval, start, end):
+            for bar in bars:
+                dt: datetime = bar.datetime
+
+                if last_dt and dt - last_dt > step:
+                    gap_start: Optional[datetime] = session.next_bar_time(last_dt + step, step, dt)
+                    if gap_start:
+                        gaps.append((gap_start, dt - step))
+
+                last_dt = dt
+
+        return gaps
+
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        window: Optional[timedelta] = None
+    ) -> "BarPager":
+        """
+        Load bars between start and end lazily, one time window per page.
+
+        The returned pager can be iterated over lists of bars, or paged
+        manually with next_page. Each page is only queried from database
+        when it is requested. If cache is enabled, cached bars are read
+        from local disk instead.
+        """
+        if not self.cache:
+            return BarPager(self.database, symbol, exchange, interval, start, end, window)
+
+        start = convert_tz(to_db_tz(start))
+        end = convert_tz(to_db_tz(end))
+
+        # Limit range to stored data, so that same series is cached only once
+        with self.overviews_lock:
+            overview: Optional[BarOverview] = self.overviews.get((symbol, exchange, interval), None)
+
+        # Cached bars can not be validated without overview
+        if not overview:
+            return BarPager(self.database, symbol, exchange, interval, start, end, window)
+
+        start = max(start, overview.start)
+        end = min(end, overview.end)
+
+        if start > end:
+            return BarPager(self.database, symbol, exchange, interval, start, end, window)
+
+        data: Optional[np.ndarray] = self.cache.load(symbol, exchange, interval, start, end, overview)
+
+        if data is not None:
+            return CachedBarPager(data, symbol, exchange, interval, window)
+
+        return BarPager(
+            self.database, symbol, exchange, interval, start, end, window, self.cache, overview
+        )
+
+    def enable_cache(self, max_size: Optional[int] = None, path: str = "") -> None:
+        """
+        Enable local disk cache of loaded bars, limited to max_size bytes.
+        """
+        from .cache import CACHE_SIZE, BarCache
+
+        self.cache = BarCache(path, max_size or CACHE_SIZE)
+
+    def disable_cache(self) -> None:
+        """"""
+        self.cache = None
+
+    def get_cache_stats(self) -> dict:
+        """
+        Get hit/miss statistics of the cache, empty if not enabled.
+        """
+        if not self.cache:
+            return {}
+        return self.cache.get_stats()
+
+    def is_empty_gap(self, key: str, start: datetime, end: datetime) -> bool:
+        """"""
+        with self.empty_gaps_lock:
+            gaps: list = self.empty_gaps.get(key, [])
+            return [start.isoformat(), end.isoformat()] in gaps
+
+    def add_empty_gap(self, key: str, start: datetime, end: datetime) -> None:
+        """"""
+        with self.empty_gaps_lock:
+            gaps: list = self.empty_gaps.setdefault(key, [])
+            gaps.append([start.isoformat(), end.isoformat()])
+            save_json(GAP_FILENAME, self.empty_gaps)
+
+    def start_update_all(self, fill_gaps: bool = False) -> int:
+        """
+        Start updating all bar data in database as a background job, and
+        get the job ID, or 0 if an update is already running.
+
+        Only bars after the stored end are queried, plus gaps inside the
+        stored range if fill_gaps is set. Queries are run concurrently by a
+        bounded worker pool, while data is saved into database by the job
+        thread only.
+        """
+        job: Optional[JobData] = self.get_job(self.update_job_id)
+        if job and job.active:
+            return 0
+
+        overviews: List[BarOverview] = self.get_bar_overview()
+        self.update_job_id = self.submit_job("Update data", self.run_update_all, overviews, fill_gaps)
+
+        return self.update_job_id
+
+    def stop_update_all(self) -> None:
+        """
+        Cancel the running batch update, queries already sent are finished.
+        """
+        self.cancel_job(self.update_job_id)
+
+    def run_update_all(self, overviews: List[BarOverview], fill_gaps: bool) -> int:
+        """"""
+        total: int = len(overviews)
+        finished: int = 0
+        count: int = 0
+
+        # Query threads can not see the job of this thread
+        cancelled: ThreadEvent = self.get_job_cancel_event()
+
+        self.update_job(finished, total)
+
+        with ThreadPoolExecutor(self.update_workers) as executor:
+            futures: Dict[Future, BarOverview] = {}
+
+            for overview in overviews:
+                future: Future = executor.submit(
+                    self.query_update_data,
+                    overview.symbol,
+                    overview.exchange,
+                    overview.interval,
+                    overview.start,
+                    overview.end,
+                    fill_gaps,
+                    cancelled
+                )
+                futures[future] = overview
+
+            for future in as_completed(futures):
+                overview: BarOverview = futures[future]
+                vt_symbol: str = f"{overview.symbol}.{overview.exchange.value}"
+
+                try:
+                    data: List[BarData] = future.result()
+                except Exception as e:
+                    self.write_log(f"Failed to update {vt_symbol} {overview.interval.value}: {e}")
+                    data = []
+
+                # Bars are all new, see query_missing_bar_data
+                if data:
+                    self.save_bar_data(data, len(data))
+                    count += len(data)
+
+                finished += 1
+                msg: str = f"{vt_symbol} {overview.interval.value} updated, {len(data)} bars"
+                self.update_job(finished, total, msg)
+
+        if cancelled.is_set():
+            msg: str = f"Update cancelled, {finished} of {total} processed, {count} bars saved"
+        else:
+            msg: str = f"Update finished, {total} processed, {count} bars saved"
+
+        self.write_log(msg)
+        self.update_job(finished, total, msg)
+
+        return count
+
+    def query_update_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        fill_gaps: bool,
+        cancelled: ThreadEvent
+    ) -> List[BarData]:
+        """"""
+        if cancelled.is_set():
+            return []
+
+        return self.query_missing_bar_data(
+            symbol, exchange, interval, start, end, self.write_log, fill_gaps
+        )
+
+    def get_limiter(self, source: str) -> RateLimiter:
+        """
+        Get the query rate limiter of gateway or datafeed.
+        """
+        with self.limiters_lock:
+            limiter: Optional[RateLimiter] = self.limiters.get(source, None)
+            if not limiter:
+                limiter = RateLimiter(self.query_rate)
+                self.limiters[source] = limiter
+
+        return limiter
+
+    def get_tick_overview(self) -> List[TickOverview]:
+        """"""
+        return self.database.get_tick_overview()
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        window: Optional[timedelta] = None
+    ) -> TickPager:
+        """
+        Load ticks between start and end lazily, one time window per page.
+        """
+        return TickPager(self.database, symbol, exchange, start, end, window)
+
+    def export_tick_data(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> bool:
+        """
+        Export tick data into CSV file.
+        """
+        count: Optional[int] = self.write_tick_file(file_path, symbol, exchange, start, end)
+        return count is not None
+
+    def write_tick_file(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> Optional[int]:
+        """
+        Write tick data into CSV file streamed window by window, and get
+        number of ticks written, or None if the file cannot be opened.
+        """
+        from .formats import CsvTickWriter
+
+        count: int = 0
+        start_time: float = perf_counter()
+
+        try:
+            writer: CsvTickWriter = CsvTickWriter(file_path, symbol, exchange)
+        except PermissionError:
+            return None
+
+        try:
+            for ticks in self.iter_tick_data(symbol, exchange, start, end):
+                writer.write(ticks)
+                count += len(ticks)
+
+                self.update_job(count, 0, f"{count} ticks exported")
+                if self.is_job_cancelled():
+                    break
+        finally:
+            writer.close()
+
+        cost: float = perf_counter() - start_time
+        self.write_log(
+            f"Exported {count} ticks of {symbol}.{exchange.value} "
+            f"in {cost:.2f}s, {count / max(cost, 1e-6):.0f} rows/s"
+        )
+
+        return count
+
+    def delete_tick_data(self, symbol: str, exchange: Exchange) -> int:
+        """"""
+        count: int = self.database.delete_tick_data(symbol, exchange)
+        return count
+
+    def build_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> int:
+        """
+        Build minute bars from ticks stored between start and end.
+
+        Ticks are streamed from database one window at a time, so memory
+        usage is bounded by the window size. Bars are saved after each
+        window.
+        """
+        from .tickbar import TickBarBuilder
+
+        vt_symbol: str = f"{symbol}.{exchange.value}"
+
+        pager: TickPager = self.iter_tick_data(symbol, exchange, start, end)
+        builder: TickBarBuilder = TickBarBuilder()
+
+        total: int = pager.total
+        finished: int = 0
+        count: int = 0
+
+        self.update_job(finished, total)
+
+        while not pager.finished and not self.is_job_cancelled():
+            ticks: List[TickData] = pager.next_page()
+            count += self.save_built_bars(builder.update(ticks), symbol, exchange)
+
+            finished = pager.loaded
+            msg: str = f"{vt_symbol} built until {pager.next_start}, {count} bars"
+            self.update_job(finished, total, msg)
+
+        if self.is_job_cancelled():
+            msg: str = f"Building bars of {vt_symbol} cancelled, {count} bars saved"
+        else:
+            count += self.save_built_bars(builder.flush(), symbol, exchange)
+            msg: str = f"Building bars of {vt_symbol} finished, {count} bars saved"
+
+        self.write_log(msg)
+        self.update_job(finished, total, msg)
+
+        return count
+
+    def save_built_bars(self, data: np.ndarray, symbol: str, exchange: Exchange) -> int:
+        """"""
+        from .formats import array_to_bars
+
+        if not len(data):
+            return 0
+
+        bars: List[BarData] = array_to_bars(data, symbol, exchange, Interval.MINUTE)
+        self.save_bar_data(bars)
+
+        return len(bars)
+
+    def submit_job(self, name: str, func: Callable, *args, **kwargs) -> int:
+        """
+        Run func(*args, **kwargs) in the background job pool and get the job ID.
+
+        Jobs are run concurrently up to JOB_WORKERS. Every change of job
+        state is published with EVENT_DATAMANAGER_JOB, including the return
+        value once finished. Inside func, progress is reported with
+        update_job and cancellation checked with is_job_cancelled.
+        """
+        with self.jobs_lock:
+            self.job_count += 1
+            job: JobData = JobData(self.job_count, name)
+
+            self.jobs[job.job_id] = job
+            self.job_cancels[job.job_id] = ThreadEvent()
+
+        self.put_job_event(job)
+        future: Future = self.job_executor.submit(self.run_job, job, func, args, kwargs)
+
+        with self.jobs_lock:
+            # Job may be already finished
+            if job.job_id in self.jobs:
+                self.job_futures[job.job_id] = future
+
+        return job.job_id
+
+    def run_job(self, job: JobData, func: Callable, args: tuple, kwargs: dict) -> None:
+        """"""
+        cancelled: ThreadEvent = self.job_cancels[job.job_id]
+
+        if not cancelled.is_set():
+            job.status = JobStatus.RUNNING
+            self.put_job_event(job)
+
+            self.job_local.job = job
+
+            try:
+                job.result = func(*args, **kwargs)
+            except Exception as e:
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+                self.write_log(f"Job {job.name} failed: {e}")
+            finally:
+                self.job_local.job = None
+
+        if job.status != JobStatus.FAILED:
+            if cancelled.is_set():
+                job.status = JobStatus.CANCELLED
+            else:
+                job.status = JobStatus.FINISHED
+
+        with self.jobs_lock:
+            self.jobs.pop(job.job_id)
+            self.job_cancels.pop(job.job_id)
+            self.job_futures.pop(job.job_id, None)
+
+        self.put_job_event(job)
+
+    def cancel_job(self, job_id: int) -> None:
+        """
+        Request a job to stop, pending job is never started.
+        """
+        with self.jobs_lock:
+            cancelled: Optional[ThreadEvent] = self.job_cancels.get(job_id, None)
+
+        if cancelled:
+            cancelled.set()
+
+    def get_job(self, job_id: int) -> Optional[JobData]:
+        """
+        Get state of a pending or running job.
+        """
+        with self.jobs_lock:
+            job: Optional[JobData] = self.jobs.get(job_id, None)
+
+        if job:
+            return replace(job)
+        return None
+
+    def get_all_jobs(self) -> List[JobData]:
+        """
+        Get state of all pending and running jobs.
+        """
+        with self.jobs_lock:
+            return [replace(job) for job in self.jobs.values()]
+
+    def update_job(self, finished: int, total: int, msg: str = "") -> None:
+        """
+        Report progress of the job run by current thread, total is 0 if unknown.
+
+        Does nothing if not called inside a job.
+        """
+        job: Optional[JobData] = getattr(self.job_local, "job", None)
+        if not job:
+            return
+
+        job.finished = finished
+        job.total = total
+        if msg:
+            job.msg = msg
+
+        self.put_job_event(job)
+
+    def get_job_cancel_event(self) -> ThreadEvent:
+        """
+        Get cancel flag of the job run by current thread, which can be passed
+        to other threads. A flag never set is returned if not inside a job.
+        """
+        job: Optional[JobData] = getattr(self.job_local, "job", None)
+        if not job:
+            return ThreadEvent()
+
+        return self.job_cancels[job.job_id]
+
+    def is_job_cancelled(self) -> bool:
+        """"""
+        return self.get_job_cancel_event().is_set()
+
+    def put_job_event(self, job: JobData) -> None:
+        """"""
+        event: Event = Event(EVENT_DATAMANAGER_JOB, replace(job))
+        self.event_engine.put(event)
+
+    def put_overview_event(self, changes: List[OverviewChange]) -> None:
+        """"""
+        event: Event = Event(EVENT_DATAMANAGER_OVERVIEW, changes)
+        self.event_engine.put(event)
+
+    def close(self) -> None:
+        """"""
+        dropped: List[JobData] = []
+
+        with self.jobs_lock:
+            for cancelled in self.job_cancels.values():
+                cancelled.set()
+
+            # Pending jobs are dropped without being started, so run_job
+            # never publishes their final state
+            for job_id, future in list(self.job_futures.items()):
+                if not future.cancel():
+                    continue
+
+                job: JobData = self.jobs.pop(job_id)
+                job.status = JobStatus.CANCELLED
+                dropped.append(job)
+
+                self.job_cancels.pop(job_id)
+                self.job_futures.pop(job_id)
+
+        for job in dropped:
+            self.put_job_event(job)
+
+        if self._job_executor:
+            self._job_executor.shutdown(wait=False)
+
+    def write_log(self, msg: str) -> None:
+        """"""
+        self.main_engine.write_log(msg, APP_NAME)
 
     def download_tick_data(
         self,
@@ -0,0 +1,645 @@
+import csv
+import struct
+from abc import ABC, abstractmethod
+from importlib.util import find_spec
+from datetime import datetime, tzinfo
+from operator import attrgetter
+from typing import Callable, Dict, List, Type, TextIO, BinaryIO, Iterator, Optional, TYPE_CHECKING
+
+import numpy as np
+
+from vnpy.trader.constant import Interval, Exchange
+from vnpy.trader.object import BarData, TickData
+from vnpy.trader.database import DB_TZ
+from vnpy.trader.utility import ZoneInfo
+
+from .columns import BAR_COLUMNS, parse_datetimes, read_csv_columns, columns_to_bars
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# pyarrow is slow to import, so it is only imported by Arrow based formats when used
+ARROW_AVAILABLE: bool = bool(find_spec("pyarrow"))
+
+
+# Structured dtype of exported bar records, datetime is wall clock in DB_TZ
+BAR_DTYPE: np.dtype = np.dtype([
+    ("datetime", "M8[s]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+    ("turnover", "f8"),
+    ("open_interest", "f8"),
+])
+
+# Fields of exported tick records after symbol, exchange and datetime
+TICK_FIELDS: List[str] = [
+    "last_price",
+    "last_volume",
+    "volume",
+    "turnover",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+    "limit_up",
+    "limit_down",
+]
+for side in ["bid", "ask"]:
+    for n in range(1, 6):
+        TICK_FIELDS.append(f"{side}_price_{n}")
+        TICK_FIELDS.append(f"{side}_volume_{n}")
+
+# Reserved size of NPY header, so that record count can be filled in when closing
+NPY_HEADER_SIZE: int = 256
+
+
+def bars_to_array(bars: List[BarData]) -> np.ndarray:
+    """
+    Convert bars into a structured array of BAR_DTYPE.
+    """
+    return np.array(
+        [
+            (
+                bar.datetime.replace(tzinfo=None),
+                bar.open_price,
+                bar.high_price,
+                bar.low_price,
+                bar.close_price,
+                bar.volume,
+                bar.turnover,
+                bar.open_interest,
+            )
+            for bar in bars
+        ],
+        dtype=BAR_DTYPE
+    )
+
+
+def array_to_bars(
+    data: np.ndarray,
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval,
+    tz: tzinfo = DB_TZ
+) -> List[BarData]:
+    """
+    Convert a structured array of BAR_DTYPE back into bars, datetime is
+    treated as wall clock in tz.
+    """
+    columns: Dict[str, list] = {
+        name: data[name].tolist() for name in BAR_COLUMNS if name != "datetime"
+    }
+    columns["datetime"] = [
+        dt.replace(tzinfo=tz) for dt in data["datetime"].astype("M8[us]").tolist()
+    ]
+
+    return columns_to_bars(columns, symbol, exchange, interval)
+
+
+class BaseBarWriter(ABC):
+    """
+    Write bars into a file batch by batch.
+    """
+
+    format_name: str = ""
+    suffix: str = ""
+
+    def __init__(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> None:
+        """"""
+        self.file_path: str = file_path
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.interval: Interval = interval
+
+    @abstractmethod
+    def write(self, bars: List[BarData]) -> None:
+        """"""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """"""
+        pass
+
+
+class CsvBarWriter(BaseBarWriter):
+    """
+    Plain CSV with the same columns as importing.
+    """
+
+    format_name: str = "CSV"
+    suffix: str = ".csv"
+
+    def __init__(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> None:
+        """"""
+        super().__init__(file_path, symbol, exchange, interval)
+
+        fieldnames: list = [
+            "symbol",
+            "exchange",
+            "datetime",
+            "open",
+            "high",
+            "low",
+            "close",
+            "volume",
+            "turnover",
+            "open_interest"
+        ]
+
+        self.f: TextIO = open(file_path, "w")
+        self.writer = csv.writer(self.f, lineterminator="\n")
+        self.writer.writerow(fieldnames)
+
+    def write(self, bars: List[BarData]) -> None:
+        """"""
+        symbol: str = self.symbol
+        exchange_value: str = self.exchange.value
+
+        self.writer.writerows([
+            (
+                symbol,
+                exchange_value,
+                bar.datetime.isoformat(" ", "seconds")[:19],
+                bar.open_price,
+                bar.high_price,
+                bar.low_price,
+                bar.close_price,
+                bar.volume,
+                bar.turnover,
+                bar.open_interest,
+            )
+            for bar in bars
+        ])
+
+    def close(self) -> None:
+        """"""
+        self.f.close()
+
+
+class CsvTickWriter:
+    """
+    Write ticks into a CSV file batch by batch.
+    """
+
+    suffix: str = ".csv"
+
+    def __init__(self, file_path: str, symbol: str, exchange: Exchange) -> None:
+        """"""
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.getter: Callable = attrgetter(*TICK_FIELDS)
+
+        self.f: TextIO = open(file_path, "w")
+        self.writer = csv.writer(self.f, lineterminator="\n")
+        self.writer.writerow(["symbol", "exchange", "datetime"] + TICK_FIELDS)
+
+    def write(self, ticks: List[TickData]) -> None:
+        """"""
+        prefix: tuple = (self.symbol, self.exchange.value)
+        getter: Callable = self.getter
+
+        self.writer.writerows([
+            prefix + (tick.datetime.isoformat(" ", "microseconds")[:26],) + getter(tick)
+            for tick in ticks
+        ])
+
+    def close(self) -> None:
+        """"""
+        self.f.close()
+
+
+class NpyBarWriter(BaseBarWriter):
+    """
+    NumPy structured array of BAR_DTYPE, can be opened with np.load(mmap_mode="r").
+    """
+
+    format_name: str = "NumPy"
+    suffix: str = ".npy"
+
+    def __init__(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> None:
+        """"""
+        super().__init__(file_path, symbol, exchange, interval)
+
+        self.count: int = 0
+
+        self.f: BinaryIO = open(file_path, "wb")
+        self.write_header()
+
+    def write_header(self) -> None:
+        """
+        Write NPY version 1.0 header padded to fixed size.
+        """
+        descr: list = np.lib.format.dtype_to_descr(BAR_DTYPE)
+        header: str = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (descr, self.count)
+
+        # magic string, version, header length, header and newline
+        header_len: int = NPY_HEADER_SIZE - 10
+        header = header.ljust(header_len - 1) + "\n"
+
+        self.f.seek(0)
+        self.f.write(b"\x93NUMPY\x01\x00")
+        self.f.write(struct.pack("<H", header_len))
+        self.f.write(header.encode("latin1"))
+
+    def write(self, bars: List[BarData]) -> None:
+        """"""
+        data: np.ndarray = bars_to_array(bars)
+        self.f.write(data.tobytes())
+        self.count += len(data)
+
+    def close(self) -> None:
+        """"""
+        self.write_header()
+        self.f.close()
+
+
+class ArrowBarWriter(BaseBarWriter):
+    """
+    Base class of writers based on pyarrow.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> None:
+        """"""
+        import pyarrow as pa
+
+        super().__init__(file_path, symbol, exchange, interval)
+
+        fields: list = [pa.field("datetime", pa.timestamp("s"))]
+        for name in BAR_DTYPE.names[1:]:
+            fields.append(pa.field(name, pa.float64()))
+
+        metadata: Dict[str, str] = {
+            "symbol": symbol,
+            "exchange": exchange.value,
+            "interval": interval.value,
+            "timezone": str(DB_TZ),
+        }
+
+        self.schema: "pa.Schema" = pa.schema(fields, metadata=metadata)
+
+    def to_batch(self, bars: List[BarData]) -> "pa.RecordBatch":
+        """"""
+        import pyarrow as pa
+
+        data: np.ndarray = bars_to_array(bars)
+        arrays: list = [pa.array(data[name]) for name in BAR_DTYPE.names]
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class ParquetBarWriter(ArrowBarWriter):
+    """
+    Apache Parquet file, one row group per batch.
+    """
+
+    format_name: str = "Parquet"
+    suffix: str = ".parquet"
+
+    def __init__(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> None:
+        """"""
+        import pyarrow.parquet as pq
+
+        super().__init__(file_path, symbol, exchange, interval)
+
+        self.writer: "pq.ParquetWriter" = pq.ParquetWriter(file_path, self.schema)
+
+    def write(self, bars: List[BarData]) -> None:
+        """"""
+        self.writer.write_batch(self.to_batch(bars))
+
+    def close(self) -> None:
+        """"""
+        self.writer.close()
+
+
+class FeatherBarWriter(ArrowBarWriter):
+    """
+    Apache Arrow IPC file (Feather V2), uncompressed for memory mapping.
+    """
+
+    format_name: str = "Feather"
+    suffix: str = ".feather"
+
+    def __init__(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> None:
+        """"""
+        import pyarrow as pa
+
+        super().__init__(file_path, symbol, exchange, interval)
+
+        self.sink: "pa.OSFile" = pa.OSFile(file_path, "wb")
+        self.writer: "pa.ipc.RecordBatchFileWriter" = pa.ipc.new_file(self.sink, self.schema)
+
+    def write(self, bars: List[BarData]) -> None:
+        """"""
+        self.writer.write_batch(self.to_batch(bars))
+
+    def close(self) -> None:
+        """"""
+        self.writer.close()
+        self.sink.close()
+
+
+BAR_WRITERS: Dict[str, Type[BaseBarWriter]] = {}
+
+
+def register_bar_writer(writer_class: Type[BaseBarWriter]) -> None:
+    """
+    Register a bar writer class under its format name.
+    """
+    BAR_WRITERS[writer_class.format_name] = writer_class
+
+
+register_bar_writer(CsvBarWriter)
+register_bar_writer(NpyBarWriter)
+
+if ARROW_AVAILABLE:
+    register_bar_writer(ParquetBarWriter)
+    register_bar_writer(FeatherBarWriter)
+
+
+def convert_datetimes(
+    values: np.ndarray,
+    datetime_format: str,
+    tz: tzinfo,
+    source_tz: Optional[tzinfo] = None
+) -> List[datetime]:
+    """
+    Convert a datetime column of a binary file into datetime objects.
+
+    Naive timestamps are treated as wall clock in tz, the same as CSV
+    importing, while timestamps with timezone (stored as UTC) are converted
+    into tz. String columns are parsed with datetime_format.
+    """
+    if values.dtype.kind == "M":
+        dts: list = values.astype("M8[us]").tolist()
+
+        if source_tz:
+            return [dt.replace(tzinfo=source_tz).astimezone(tz) for dt in dts]
+        return [dt.replace(tzinfo=tz) for dt in dts]
+
+    return parse_datetimes([str(v) for v in values], datetime_format, tz)
+
+
+class BaseBarReader(ABC):
+    """
+    Read a file batch by batch as dicts of BAR_COLUMNS lists.
+
+    heads maps column names in BAR_COLUMNS to the column names in the file,
+    turnover and open interest are optional and filled with 0 if missing.
+    """
+
+    format_name: str = ""
+    suffix: str = ""
+
+    def __init__(
+        self,
+        file_path: str,
+        heads: Dict[str, str],
+        datetime_format: str,
+        tz: tzinfo
+    ) -> None:
+        """"""
+        self.file_path: str = file_path
+        self.heads: Dict[str, str] = heads
+        self.datetime_format: str = datetime_format
+        self.tz: tzinfo = tz
+
+    @abstractmethod
+    def read(self, batch_size: int) -> Iterator[Dict[str, list]]:
+        """"""
+        pass
+
+    def check_heads(self, names: List[str]) -> None:
+        """"""
+        for name in BAR_COLUMNS:
+            head: str = self.heads.get(name, "")
+            if head not in names and name not in {"turnover", "open_interest"}:
+                raise KeyError(head)
+
+    def to_columns(
+        self,
+        arrays: Dict[str, np.ndarray],
+        source_tz: Optional[tzinfo] = None
+    ) -> Dict[str, list]:
+        """
+        Convert arrays keyed by file column names into a batch of columns.
+        """
+        size: int = 0
+        columns: Dict[str, list] = {}
+
+        for name in BAR_COLUMNS:
+            values: Optional[np.ndarray] = arrays.get(self.heads.get(name, ""), None)
+
+            if values is None:
+                columns[name] = None
+            elif name == "datetime":
+                columns[name] = convert_datetimes(values, self.datetime_format, self.tz, source_tz)
+                size = len(values)
+            else:
+                columns[name] = values.astype(float, copy=False).tolist()
+
+        for name, values in columns.items():
+            if values is None:
+                columns[name] = [0.0] * size
+
+        return columns
+
+
+class CsvBarReader(BaseBarReader):
+    """"""
+
+    format_name: str = "CSV"
+    suffix: str = ".csv"
+
+    def read(self, batch_size: int) -> Iterator[Dict[str, list]]:
+        """"""
+        return read_csv_columns(
+            self.file_path, self.heads, self.datetime_format, self.tz, batch_size
+        )
+
+
+class NpyBarReader(BaseBarReader):
+    """
+    NumPy structured array, memory mapped so that only the batch being
+    converted is read from disk.
+    """
+
+    format_name: str = "NumPy"
+    suffix: str = ".npy"
+
+    def read(self, batch_size: int) -> Iterator[Dict[str, list]]:
+        """"""
+        data: np.ndarray = np.load(self.file_path, mmap_mode="r")
+        names: list = list(data.dtype.names or [])
+        self.check_heads(names)
+
+        for i in range(0, len(data), batch_size):
+            chunk: np.ndarray = data[i: i + batch_size]
+            arrays: Dict[str, np.ndarray] = {name: chunk[name] for name in names}
+            yield self.to_columns(arrays)
+
+
+class ArrowBarReader(BaseBarReader):
+    """
+    Base class of readers based on pyarrow.
+    """
+
+    def convert_batch(self, batch: "pa.RecordBatch") -> Dict[str, list]:
+        """"""
+        import pyarrow as pa
+
+        arrays: Dict[str, np.ndarray] = {}
+        source_tz: Optional[tzinfo] = None
+
+        for name, column in zip(batch.schema.names, batch.columns):
+            if pa.types.is_timestamp(column.type) and column.type.tz:
+                source_tz = ZoneInfo("UTC")
+                column = column.cast(pa.timestamp(column.type.unit))
+
+            arrays[name] = column.to_numpy(zero_copy_only=False)
+
+        return self.to_columns(arrays, source_tz)
+
+
+class ParquetBarReader(ArrowBarReader):
+    """"""
+
+    format_name: str = "Parquet"
+    suffix: str = ".parquet"
+
+    def read(self, batch_size: int) -> Iterator[Dict[str, list]]:
+        """"""
+        import pyarrow.parquet as pq
+
+        parquet_file: "pq.ParquetFile" = pq.ParquetFile(self.file_path)
+
+        names: list = parquet_file.schema_arrow.names
+        self.check_heads(names)
+
+        columns: list = [head for head in self.heads.values() if head in names]
+
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield self.convert_batch(batch)
+
+
+class FeatherBarReader(ArrowBarReader):
+    """
+    Arrow IPC file (Feather V2), memory mapped and read zero-copy if uncompressed.
+    """
+
+    format_name: str = "Feather"
+    suffix: str = ".feather"
+
+    def read(self, batch_size: int) -> Iterator[Dict[str, list]]:
+        """"""
+        import pyarrow as pa
+
+        with pa.memory_map(self.file_path, "r") as source:
+            reader: "pa.ipc.RecordBatchFileReader" = pa.ipc.open_file(source)
+            self.check_heads(reader.schema.names)
+
+            for i in range(reader.num_record_batches):
+                record_batch: "pa.RecordBatch" = reader.get_batch(i)
+
+                for offset in range(0, record_batch.num_rows, batch_size):
+                    yield self.convert_batch(record_batch.slice(offset, batch_size))
+
+
+BAR_READERS: Dict[str, Type[BaseBarReader]] = {}
+
+
+def register_bar_reader(reader_class: Type[BaseBarReader]) -> None:
+    """
+    Register a bar reader class under its format name.
+    """
+    BAR_READERS[reader_class.format_name] = reader_class
+
+
+def get_bar_reader(file_path: str) -> Optional[Type[BaseBarReader]]:
+    """
+    Get registered reader class by file suffix.
+    """
+    for reader_class in BAR_READERS.values():
+        if file_path.lower().endswith(reader_class.suffix):
+            return reader_class
+
+    return None
+
+
+def read_bar_file(
+    file_path: str,
+    heads: Dict[str, str],
+    datetime_format: str,
+    tz_name: str,
+    batch_size: int,
+    format_name: str = ""
+) -> Dict[str, list]:
+    """
+    Read the whole file into a dict of columns, the reader is chosen by
+    format_name, or by file suffix if not given.
+
+    Module level function so that it can be run inside a process pool.
+    """
+    if format_name:
+        reader_class: Type[BaseBarReader] = BAR_READERS[format_name]
+    else:
+        reader_class: Optional[Type[BaseBarReader]] = get_bar_reader(file_path)
+        if not reader_class:
+            raise ValueError(f"Unsupported file format: {file_path}")
+
+    reader: BaseBarReader = reader_class(file_path, heads, datetime_format, ZoneInfo(tz_name))
+    columns: Dict[str, list] = {name: [] for name in BAR_COLUMNS}
+
+    for batch in reader.read(batch_size):
+        for name in BAR_COLUMNS:
+            columns[name].extend(batch[name])
+
+    return columns
+
+
+register_bar_reader(CsvBarReader)
+register_bar_reader(NpyBarReader)
+
+if ARROW_AVAILABLE:
+    register_bar_reader(ParquetBarReader)
+    register_bar_reader(FeatherBarReader)
@@ -0,0 +1,217 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from vnpy.trader.constant import Interval, Exchange
+
+from .formats import BAR_DTYPE
+
+
+# Default limit of price change from previous close before a bar is reported as jump
+JUMP_LIMIT: float = 0.2
+
+# Number of bar times kept as samples for each check
+MAX_SAMPLES: int = 10
+
+PRICE_FIELDS: List[str] = ["open", "high", "low", "close"]
+AMOUNT_FIELDS: List[str] = ["volume", "turnover", "open_interest"]
+
+# Checks run on each bar, only the last one can not be repaired
+QUALITY_CHECKS: List[str] = [
+    "zero_price",
+    "invalid_range",
+    "negative_amount",
+    "duplicate",
+    "jump",
+]
+
+# Unit bars of an interval are aligned to when checking duplicates
+BUCKET_UNITS: Dict[Interval, str] = {
+    Interval.MINUTE: "m",
+    Interval.HOUR: "h",
+    Interval.DAILY: "D",
+    Interval.WEEKLY: "W",
+}
+
+
+class ScanAction(Enum):
+    """"""
+
+    REPORT = "report"
+    QUARANTINE = "quarantine"
+    REPAIR = "repair"
+
+
+@dataclass
+class ScanResult:
+    """
+    Quality issues found in a series, with bars needed for fixing them.
+
+    issues is the number of bars failing each check, a bar can fail more
+    than one check. bad holds all bars with any issue, repaired holds
+    fixed copies of bars which can be repaired and duplicates holds times
+    of bars duplicating a previous one, all as BAR_DTYPE records.
+    """
+
+    symbol: str
+    exchange: Exchange
+    interval: Interval
+    count: int = 0
+    issues: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(QUALITY_CHECKS, 0))
+    samples: Dict[str, List[datetime]] = field(default_factory=dict)
+    bad: List[np.ndarray] = field(default_factory=list, repr=False)
+    repaired: List[np.ndarray] = field(default_factory=list, repr=False)
+    duplicates: List[np.ndarray] = field(default_factory=list, repr=False)
+    removed: int = 0
+    fixed: int = 0
+    quarantine_path: str = ""
+
+    @property
+    def bad_count(self) -> int:
+        """"""
+        return sum(len(data) for data in self.bad)
+
+    def update(self, data: np.ndarray, masks: Dict[str, np.ndarray]) -> None:
+        """
+        Add statistics of a batch checked.
+        """
+        self.count += len(data)
+
+        for name, mask in masks.items():
+            n: int = int(np.count_nonzero(mask))
+            if not n:
+                continue
+
+            self.issues[name] += n
+
+            samples: List[datetime] = self.samples.setdefault(name, [])
+            if len(samples) < MAX_SAMPLES:
+                dts: np.ndarray = data["datetime"][mask][:MAX_SAMPLES - len(samples)]
+                samples.extend(dts.astype("M8[us]").tolist())
+
+
+class BarScanner:
+    """
+    Check batches of bars of a series in time order with vectorized rules.
+
+    Rules are: prices not positive (zero_price), high below low or open
+    and close outside of high and low (invalid_range), negative volume,
+    turnover or open interest (negative_amount), more than one bar in the
+    same minute, hour, day or week (duplicate), and high or low moving
+    more than jump_limit from previous close (jump). The last bar of each
+    batch is kept, so results never depend on how bars are split into
+    batches.
+    """
+
+    def __init__(self, interval: Interval, jump_limit: float = JUMP_LIMIT) -> None:
+        """"""
+        self.unit: str = BUCKET_UNITS.get(interval, "s")
+        self.jump_limit: float = jump_limit
+
+        # Last bar checked, and last positive close for repairing prices
+        self.last: Optional[np.ndarray] = None
+        self.last_close: float = np.nan
+
+    def get_buckets(self, dts: np.ndarray) -> np.ndarray:
+        """"""
+        # Weeks of numpy start on Thursday, shift so that they start on Monday
+        if self.unit == "W":
+            dts = dts + np.timedelta64(3, "D")
+
+        return dts.astype(f"M8[{self.unit}]")
+
+    def check(self, data: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Get mask of bars failing each check.
+        """
+        if not len(data):
+            return {name: np.zeros(0, dtype=bool) for name in QUALITY_CHECKS}
+
+        masks: Dict[str, np.ndarray] = {}
+
+        masks["zero_price"] = np.logical_or.reduce([~(data[name] > 0) for name in PRICE_FIELDS])
+
+        high: np.ndarray = data["high"]
+        low: np.ndarray = data["low"]
+        masks["invalid_range"] = (
+            (high < low)
+            | (data["open"] > high) | (data["open"] < low)
+            | (data["close"] > high) | (data["close"] < low)
+        )
+
+        masks["negative_amount"] = np.logical_or.reduce([data[name] < 0 for name in AMOUNT_FIELDS])
+
+        # Compare with previous bar, which is the last one of previous batch for the first bar
+        if self.last is not None:
+            previous: np.ndarray = np.concatenate([self.last, data[:-1]])
+        else:
+            previous: np.ndarray = np.concatenate([data[:1], data[:-1]])
+
+        buckets: np.ndarray = self.get_buckets(data["datetime"])
+        previous_buckets: np.ndarray = self.get_buckets(previous["datetime"])
+        masks["duplicate"] = buckets == previous_buckets
+
+        previous_close: np.ndarray = previous["close"]
+        with np.errstate(invalid="ignore"):
+            masks["jump"] = (previous_close > 0) & (
+                (high > previous_close * (1 + self.jump_limit))
+                | (low < previous_close * (1 - self.jump_limit))
+            )
+
+        # First bar of the series has nothing to compare with
+        if self.last is None:
+            masks["duplicate"][0] = False
+            masks["jump"][0] = False
+
+        self.last = data[-1:].copy()
+
+        return masks
+
+    def repair(self, data: np.ndarray, masks: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Get repaired copies of bars with price or amount issues.
+
+        Prices not positive are replaced by close of the bar, or the last
+        positive close before it. High and low are widened to cover open
+        and close, negative amounts are set to zero. Duplicates and bars
+        without any valid price before them are not included. Must be
+        called for every batch in time order.
+        """
+        if not len(data):
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        close: np.ndarray = data["close"]
+        valid: np.ndarray = close > 0
+
+        # Last positive close up to each bar, and strictly before each bar
+        index: np.ndarray = np.maximum.accumulate(np.where(valid, np.arange(len(data)), -1))
+        filled: np.ndarray = np.where(index >= 0, close[index], self.last_close)
+        before: np.ndarray = np.concatenate([[self.last_close], filled[:-1]])
+
+        self.last_close = filled[-1]
+
+        reference: np.ndarray = np.where(valid, close, before)
+
+        fixable: np.ndarray = (
+            (masks["zero_price"] | masks["invalid_range"] | masks["negative_amount"])
+            & ~masks["duplicate"]
+            & ~np.isnan(reference)
+        )
+
+        result: np.ndarray = data[fixable].copy()
+        reference = reference[fixable]
+
+        for name in PRICE_FIELDS:
+            result[name] = np.where(result[name] > 0, result[name], reference)
+
+        prices: List[np.ndarray] = [result[name] for name in PRICE_FIELDS]
+        result["high"] = np.maximum.reduce(prices)
+        result["low"] = np.minimum.reduce(prices)
+
+        for name in AMOUNT_FIELDS:
+            result[name] = np.maximum(result[name], 0)
+
+        return result
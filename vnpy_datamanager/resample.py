@@ -0,0 +1,102 @@
+from datetime import datetime, tzinfo
+from typing import Dict, List
+
+import numpy as np
+
+from vnpy.trader.constant import Interval
+from vnpy.trader.database import DB_TZ
+
+from .formats import BAR_DTYPE
+from .session import TradingSession
+
+
+# Intervals in ascending order, bars can only be resampled into a later one
+RESAMPLE_INTERVALS: List[Interval] = [
+    Interval.MINUTE,
+    Interval.HOUR,
+    Interval.DAILY,
+    Interval.WEEKLY,
+]
+
+
+def can_resample(source: Interval, target: Interval) -> bool:
+    """"""
+    if source not in RESAMPLE_INTERVALS or target not in RESAMPLE_INTERVALS:
+        return False
+    return RESAMPLE_INTERVALS.index(source) < RESAMPLE_INTERVALS.index(target)
+
+
+def convert_wall_clock(dts: np.ndarray, source_tz: tzinfo, tz: tzinfo) -> np.ndarray:
+    """
+    Convert wall clock datetimes in source_tz into wall clock in tz.
+
+    Offsets are only computed once for each distinct hour.
+    """
+    if str(source_tz) == str(tz) or not len(dts):
+        return dts
+
+    hours: np.ndarray = dts.astype("M8[h]")
+    unique, inverse = np.unique(hours, return_inverse=True)
+
+    offsets: List[np.timedelta64] = []
+    for hour in unique.tolist():
+        local: datetime = hour.replace(tzinfo=source_tz).astimezone(tz).replace(tzinfo=None)
+        offsets.append(np.timedelta64(local - hour, "s"))
+
+    return dts + np.array(offsets, dtype="m8[s]")[inverse]
+
+
+def resample_array(
+    data: np.ndarray,
+    interval: Interval,
+    session: TradingSession,
+    source_tz: tzinfo = DB_TZ
+) -> np.ndarray:
+    """
+    Aggregate sorted bars of BAR_DTYPE into bars of a higher interval.
+
+    Bars are grouped by trading day of session, and by clock hour within
+    it for hour bars, or by week of trading day for weekly bars. Datetime
+    of the result is the start of each group as wall clock in session tz.
+    """
+    if not len(data):
+        return np.empty(0, dtype=BAR_DTYPE)
+
+    local: np.ndarray = convert_wall_clock(data["datetime"], source_tz, session.tz)
+    dates: np.ndarray = session.get_trading_dates(local)
+
+    if interval == Interval.HOUR:
+        hours: np.ndarray = local.astype("M8[h]")
+        labels: np.ndarray = hours.astype("M8[s]")
+        changed: np.ndarray = (np.diff(dates) != 0) | (np.diff(hours) != 0)
+    elif interval == Interval.DAILY:
+        labels: np.ndarray = dates.astype("M8[s]")
+        changed: np.ndarray = np.diff(dates) != 0
+    elif interval == Interval.WEEKLY:
+        # Day 0 of numpy is a Thursday, so shift by 3 days to start from Monday
+        days: np.ndarray = dates.astype(np.int64)
+        mondays: np.ndarray = days - (days + 3) % 7
+        labels: np.ndarray = mondays.astype("M8[D]").astype("M8[s]")
+        changed: np.ndarray = np.diff(mondays) != 0
+    else:
+        raise ValueError(f"Unsupported resample interval: {interval.value}")
+
+    starts: np.ndarray = np.concatenate([[0], np.flatnonzero(changed) + 1])
+    ends: np.ndarray = np.append(starts[1:], len(data)) - 1
+
+    columns: Dict[str, np.ndarray] = {
+        "datetime": labels[starts],
+        "open": data["open"][starts],
+        "high": np.maximum.reduceat(data["high"], starts),
+        "low": np.minimum.reduceat(data["low"], starts),
+        "close": data["close"][ends],
+        "volume": np.add.reduceat(data["volume"], starts),
+        "turnover": np.add.reduceat(data["turnover"], starts),
+        "open_interest": data["open_interest"][ends],
+    }
+
+    result: np.ndarray = np.empty(len(starts), dtype=BAR_DTYPE)
+    for name, values in columns.items():
+        result[name] = values
+
+    return result
@@ -0,0 +1,198 @@
+from datetime import datetime, date, time, timedelta, tzinfo
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from vnpy.trader.constant import Interval, Exchange
+from vnpy.trader.database import DB_TZ
+from vnpy.trader.utility import ZoneInfo
+
+
+INTERVAL_DELTA_MAP: Dict[Interval, timedelta] = {
+    Interval.MINUTE: timedelta(minutes=1),
+    Interval.HOUR: timedelta(hours=1),
+    Interval.DAILY: timedelta(days=1),
+}
+
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+
+# Full day, used for daily bars and exchanges without known trading hours
+ALL_DAY: List[Tuple[time, time]] = [(time(0, 0), time(0, 0))]
+
+
+class TradingSession:
+    """
+    Trading hours of an exchange.
+
+    Periods are given in exchange local time, a period whose end is not later
+    than its start runs over midnight into the next day (e.g. night session).
+    Only the time ranges listed are treated as trading, so bars missing
+    outside of them are never reported as gaps.
+
+    Bars at or after daily_end belong to the next trading day, e.g. set it
+    to 15:00 if night session is included. By default trading day is the
+    same as calendar day.
+
+    complete tells whether periods cover all trading hours. If not (e.g.
+    night session left out), bars may exist outside of periods, so new
+    bars are queried even when no period is due.
+    """
+
+    def __init__(
+        self,
+        periods: List[Tuple[time, time]],
+        tz: tzinfo = CHINA_TZ,
+        weekdays: Set[int] = None,
+        holidays: Set[date] = None,
+        daily_end: time = None,
+        complete: bool = True
+    ) -> None:
+        """"""
+        self.tz: tzinfo = tz
+        self.weekdays: Set[int] = weekdays if weekdays is not None else {0, 1, 2, 3, 4}
+        self.holidays: Set[date] = holidays or set()
+        self.daily_end: Optional[time] = daily_end
+        self.complete: bool = complete
+
+        # Convert periods into offsets from midnight of the trading day
+        self.offsets: List[Tuple[timedelta, timedelta]] = []
+
+        for start, end in periods:
+            start_offset: timedelta = timedelta(hours=start.hour, minutes=start.minute)
+            end_offset: timedelta = timedelta(hours=end.hour, minutes=end.minute)
+
+            if end_offset <= start_offset:
+                end_offset += timedelta(days=1)
+
+            self.offsets.append((start_offset, end_offset))
+
+        self.offsets.sort()
+
+    def is_trading_day(self, d: date) -> bool:
+        """"""
+        return d.weekday() in self.weekdays and d not in self.holidays
+
+    def get_day_shift(self) -> timedelta:
+        """
+        Get time added to wall clock so that its date is the trading day.
+        """
+        if not self.daily_end:
+            return timedelta(0)
+
+        end_offset: timedelta = timedelta(hours=self.daily_end.hour, minutes=self.daily_end.minute)
+        return timedelta(days=1) - end_offset
+
+    def get_trading_dates(self, dts: np.ndarray) -> np.ndarray:
+        """
+        Get trading day of each datetime, given as wall clock in session tz.
+
+        Days which are not trading days are rolled forward to the next one.
+        """
+        shift: np.timedelta64 = np.timedelta64(self.get_day_shift())
+        dates: np.ndarray = (dts + shift).astype("M8[D]")
+
+        weekmask: List[int] = [int(i in self.weekdays) for i in range(7)]
+        holidays: List[date] = sorted(self.holidays)
+
+        return np.busday_offset(dates, 0, roll="forward", weekmask=weekmask, holidays=holidays)
+
+    def next_bar_time(
+        self,
+        dt: datetime,
+        step: timedelta,
+        limit: datetime
+    ) -> Optional[datetime]:
+        """
+        Get the first time on grid dt + k * step (k >= 0) before limit whose
+        bar [t, t + step) overlaps a trading period, or None if there is none.
+        """
+        local_dt: datetime = dt.astimezone(self.tz)
+        local_limit: datetime = limit.astimezone(self.tz)
+
+        # Periods running over midnight may start on the previous day
+        d: date = local_dt.date() - timedelta(days=1)
+
+        while True:
+            midnight: datetime = datetime.combine(d, time(0, 0), tzinfo=self.tz)
+            if midnight >= local_limit:
+                return None
+
+            if self.is_trading_day(d):
+                for start_offset, end_offset in self.offsets:
+                    period_start: datetime = midnight + start_offset
+                    period_end: datetime = midnight + end_offset
+
+                    if period_end <= local_dt:
+                        continue
+
+                    k: int = max(0, (period_start - local_dt) // step)
+                    t: datetime = local_dt + k * step
+
+                    if t >= local_limit:
+                        return None
+                    if t < period_end:
+                        return t.astimezone(dt.tzinfo)
+
+            d += timedelta(days=1)
+
+
+TRADING_SESSIONS: Dict[Exchange, TradingSession] = {}
+
+# Only core day sessions of Chinese futures are listed, since night session
+# hours differ from product to product
+FUTURES_PERIODS: List[Tuple[time, time]] = [
+    (time(9, 0), time(10, 15)),
+    (time(10, 30), time(11, 30)),
+    (time(13, 30), time(15, 0)),
+]
+
+STOCK_PERIODS: List[Tuple[time, time]] = [
+    (time(9, 30), time(11, 30)),
+    (time(13, 0), time(15, 0)),
+]
+
+# Trading day of futures ends at 15:00, so that night session belongs to
+# the next trading day whether it is traded or not
+FUTURES_DAILY_END: time = time(15, 0)
+
+for exchange in [Exchange.SHFE, Exchange.DCE, Exchange.CZCE, Exchange.INE]:
+    TRADING_SESSIONS[exchange] = TradingSession(
+        FUTURES_PERIODS, daily_end=FUTURES_DAILY_END, complete=False
+    )
+
+TRADING_SESSIONS[Exchange.CFFEX] = TradingSession(STOCK_PERIODS, daily_end=FUTURES_DAILY_END)
+
+for exchange in [Exchange.SSE, Exchange.SZSE]:
+    TRADING_SESSIONS[exchange] = TradingSession(STOCK_PERIODS)
+
+
+def get_trading_session(exchange: Exchange, interval: Interval) -> TradingSession:
+    """
+    Get trading session for checking gaps of bar data.
+
+    Exchanges without known trading hours are treated as trading all day on
+    weekdays. Daily bars only use the trading days of the session.
+    """
+    session: Optional[TradingSession] = TRADING_SESSIONS.get(exchange, None)
+
+    if not session:
+        return TradingSession(ALL_DAY, DB_TZ)
+
+    if interval == Interval.DAILY:
+        return TradingSession(
+            ALL_DAY,
+            session.tz,
+            session.weekdays,
+            session.holidays,
+            session.daily_end,
+            session.complete
+        )
+
+    return session
+
+
+def set_trading_session(exchange: Exchange, session: TradingSession) -> None:
+    """
+    Set trading session of an exchange, e.g. to include night session or holidays.
+    """
+    TRADING_SESSIONS[exchange] = session
@@ -0,0 +1,253 @@
+import json
+import zlib
+from datetime import datetime
+from threading import Lock
+from typing import Iterable, List
+from zipfile import ZipFile, ZIP_STORED
+
+import numpy as np
+
+from vnpy.trader.constant import Interval, Exchange
+
+from .formats import BAR_DTYPE
+
+
+SNAPSHOT_VERSION: int = 1
+
+MANIFEST_NAME: str = "manifest.json"
+
+# Number of bars in each compressed chunk of a series
+SNAPSHOT_CHUNK_SIZE: int = 100_000
+
+COMPRESS_LEVEL: int = 6
+
+# All fields of BAR_DTYPE are 8 bytes, so records can be viewed as rows of int64
+FIELD_COUNT: int = len(BAR_DTYPE.names)
+
+# Decimal places tried for storing a float field as exact integers
+MAX_DECIMALS: int = 8
+
+# Marks a float field stored by its bit pattern
+RAW_BITS: int = -1
+
+
+def to_integers(values: np.ndarray) -> tuple:
+    """
+    Get values as int64 scaled by the fewest decimal places which keep
+    them exact, or their bit patterns if no such scale exists.
+    """
+    if len(values) and np.all(np.isfinite(values)):
+        limit: float = np.abs(values).max()
+
+        for decimals in range(MAX_DECIMALS + 1):
+            scale: float = 10.0 ** decimals
+
+            # Larger integers can not be converted back exactly
+            if limit * scale >= 2 ** 53:
+                break
+
+            integers: np.ndarray = np.round(values * scale).astype(np.int64)
+
+            # Compare bit patterns, so that negative zero is kept as well
+            if np.array_equal((integers / scale).view(np.int64), values.view(np.int64)):
+                return integers, decimals
+
+    return values.view(np.int64), RAW_BITS
+
+
+def encode_chunk(data: np.ndarray, level: int = COMPRESS_LEVEL) -> bytes:
+    """
+    Compress bar records of BAR_DTYPE losslessly.
+
+    Datetime is taken as int64 seconds, and each float field as int64
+    scaled by its decimal places (or its bit pattern if not a short
+    decimal). Every column is then replaced by its difference from the
+    previous bar, zigzag encoded so that small negative changes also have
+    leading zero bytes. Bytes of the same position are grouped together
+    before zlib compression, turning regular timestamps and slowly moving
+    prices into long runs.
+    """
+    data = np.ascontiguousarray(data, dtype=BAR_DTYPE)
+
+    columns: List[np.ndarray] = [data["datetime"].view(np.int64)]
+    header: List[int] = [0]
+
+    for name in BAR_DTYPE.names[1:]:
+        integers, decimals = to_integers(data[name])
+        columns.append(integers)
+        header.append(decimals)
+
+    deltas: np.ndarray = np.diff(np.stack(columns), axis=1, prepend=0)
+    zigzag: np.ndarray = np.ascontiguousarray((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+
+    shuffled: np.ndarray = zigzag.view(np.uint8).reshape(FIELD_COUNT, -1, 8).transpose(0, 2, 1)
+
+    return np.array(header, dtype=np.int8).tobytes() + zlib.compress(shuffled.tobytes(), level)
+
+
+def decode_chunk(blob: bytes) -> np.ndarray:
+    """
+    Get bar records of BAR_DTYPE back from data compressed by encode_chunk.
+    """
+    header: np.ndarray = np.frombuffer(blob[:FIELD_COUNT], dtype=np.int8)
+    raw: np.ndarray = np.frombuffer(zlib.decompress(blob[FIELD_COUNT:]), dtype=np.uint8)
+
+    zigzag: np.ndarray = np.ascontiguousarray(
+        raw.reshape(FIELD_COUNT, 8, -1).transpose(0, 2, 1)
+    ).view(np.uint64).reshape(FIELD_COUNT, -1)
+
+    deltas: np.ndarray = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    columns: np.ndarray = np.cumsum(deltas, axis=1)
+
+    data: np.ndarray = np.empty(columns.shape[1], dtype=BAR_DTYPE)
+    data["datetime"] = columns[0].view("M8[s]")
+
+    for i, name in enumerate(BAR_DTYPE.names[1:], 1):
+        decimals: int = int(header[i])
+
+        if decimals == RAW_BITS:
+            data[name] = columns[i].view(np.float64)
+        else:
+            data[name] = columns[i] / 10.0 ** decimals
+
+    return data
+
+
+class SnapshotWriter:
+    """
+    Write bar series into a snapshot file, a zip archive of compressed
+    chunks with a manifest listing every series.
+
+    Series can be written from multiple threads at the same time, only
+    adding compressed chunks into the archive is serialized.
+    """
+
+    def __init__(self, path: str, chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> None:
+        """"""
+        self.chunk_size: int = chunk_size
+
+        self.zip_file: ZipFile = ZipFile(path, "w", ZIP_STORED, allowZip64=True)
+        self.lock: Lock = Lock()
+
+        self.series: List[dict] = []
+
+    def write_series(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        arrays: Iterable[np.ndarray]
+    ) -> int:
+        """
+        Write batches of bars of a series in time order, and get number of
+        bars written.
+        """
+        with self.lock:
+            folder: str = f"{len(self.series):06d}"
+
+            info: dict = {
+                "symbol": symbol,
+                "exchange": exchange.value,
+                "interval": interval.value,
+                "count": 0,
+                "start": "",
+                "end": "",
+                "chunks": [],
+            }
+            self.series.append(info)
+
+        buffer: List[np.ndarray] = []
+        size: int = 0
+
+        for data in arrays:
+            if not len(data):
+                continue
+
+            buffer.append(data)
+            size += len(data)
+
+            while size >= self.chunk_size:
+                data = np.concatenate(buffer)
+                self.write_chunk(info, folder, data[:self.chunk_size])
+
+                buffer = [data[self.chunk_size:]]
+                size -= self.chunk_size
+
+        if size:
+            self.write_chunk(info, folder, np.concatenate(buffer))
+
+        return info["count"]
+
+    def write_chunk(self, info: dict, folder: str, data: np.ndarray) -> None:
+        """"""
+        blob: bytes = encode_chunk(data)
+        name: str = f"{folder}/{len(info['chunks']):06d}.bin"
+
+        with self.lock:
+            self.zip_file.writestr(name, blob)
+
+        info["chunks"].append(name)
+        info["count"] += len(data)
+        info["end"] = str(data["datetime"][-1])
+        if not info["start"]:
+            info["start"] = str(data["datetime"][0])
+
+    def close(self) -> None:
+        """
+        Write manifest and close the file.
+        """
+        manifest: dict = {
+            "version": SNAPSHOT_VERSION,
+            "created": datetime.now().isoformat(),
+            "chunk_size": self.chunk_size,
+            "series": [info for info in self.series if info["count"]],
+        }
+
+        with self.lock:
+            self.zip_file.writestr(MANIFEST_NAME, json.dumps(manifest, indent=4))
+            self.zip_file.close()
+
+
+class SnapshotReader:
+    """
+    Read chunks of bar series from a snapshot file.
+
+    Chunks can be read from multiple threads: ZipFile serializes access to
+    the underlying file by itself, while decompression runs in parallel in
+    each calling thread.
+    """
+
+    def __init__(self, path: str) -> None:
+        """"""
+        self.zip_file: ZipFile = ZipFile(path, "r")
+
+        manifest: dict = json.loads(self.zip_file.read(MANIFEST_NAME))
+        if manifest["version"] > SNAPSHOT_VERSION:
+            self.zip_file.close()
+            raise ValueError(f"Unsupported snapshot version {manifest['version']}")
+
+        self.series: List[dict] = manifest["series"]
+        for info in self.series:
+            info["exchange"] = Exchange(info["exchange"])
+            info["interval"] = Interval(info["interval"])
+
+    @property
+    def count(self) -> int:
+        """"""
+        return sum(info["count"] for info in self.series)
+
+    def read_chunk(self, name: str) -> np.ndarray:
+        """"""
+        return decode_chunk(self.zip_file.read(name))
+
+    def close(self) -> None:
+        """"""
+        self.zip_file.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        """"""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """"""
+        self.close()
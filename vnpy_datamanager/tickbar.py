@@ -0,0 +1,145 @@
+from datetime import timezone
+from operator import attrgetter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from vnpy.trader.object import TickData
+
+from .formats import BAR_DTYPE
+from .resample import convert_wall_clock
+
+
+# Fields of tick data used for building bars
+TICK_COLUMNS: List[str] = [
+    "last_price",
+    "high_price",
+    "low_price",
+    "volume",
+    "turnover",
+    "open_interest",
+]
+
+
+class TickBarBuilder:
+    """
+    Build minute bars from batches of ticks in time order.
+
+    Follows BarGenerator of vnpy: ticks without last price are ignored,
+    volume and turnover are the increase of daily cumulative values from
+    the previous tick, and a rise of daily high (or fall of daily low)
+    between two ticks is included in bar high (or low). Ticks of the last
+    minute in a batch are kept until a later minute arrives or flush is
+    called, so bars never depend on how ticks are split into batches.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        # Columns of ticks in the unfinished minute, with changes already computed
+        self.pending: Optional[Dict[str, np.ndarray]] = None
+
+        # Values of the previous tick
+        self.last_values: Optional[Dict[str, float]] = None
+
+    def update(self, ticks: List[TickData]) -> np.ndarray:
+        """
+        Add ticks and get bars of minutes finished, as BAR_DTYPE records
+        with datetime in wall clock of the ticks.
+        """
+        ticks = [tick for tick in ticks if tick.last_price]
+        if not ticks:
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        fields: np.ndarray = np.array(list(map(attrgetter(*TICK_COLUMNS), ticks)), dtype=float)
+        columns: Dict[str, np.ndarray] = {
+            name: fields[:, i] for i, name in enumerate(TICK_COLUMNS)
+        }
+
+        # Convert through timestamps, which is much faster than datetime objects
+        timestamps: np.ndarray = np.array([tick.datetime.timestamp() for tick in ticks])
+        utc: np.ndarray = np.round(timestamps * 1_000_000).astype("M8[us]")
+        columns["datetime"] = convert_wall_clock(utc, timezone.utc, ticks[0].datetime.tzinfo)
+
+        # Compare each tick with the previous one, first tick ever has no change
+        if self.last_values:
+            previous: Dict[str, np.ndarray] = {
+                name: np.concatenate([[self.last_values[name]], values[:-1]])
+                for name, values in columns.items() if name != "datetime"
+            }
+        else:
+            previous: Dict[str, np.ndarray] = {
+                name: np.concatenate([values[:1], values[:-1]])
+                for name, values in columns.items() if name != "datetime"
+            }
+
+        self.last_values = {
+            name: values[-1] for name, values in columns.items() if name != "datetime"
+        }
+
+        columns["volume_change"] = np.maximum(columns["volume"] - previous["volume"], 0)
+        columns["turnover_change"] = np.maximum(columns["turnover"] - previous["turnover"], 0)
+        columns["high_change"] = np.where(
+            columns["high_price"] > previous["high_price"], columns["high_price"], -np.inf
+        )
+        columns["low_change"] = np.where(
+            columns["low_price"] < previous["low_price"], columns["low_price"], np.inf
+        )
+
+        if self.pending:
+            columns = {
+                name: np.concatenate([self.pending[name], values])
+                for name, values in columns.items() if name in self.pending
+            }
+
+        # Keep ticks of the last minute for next batch
+        minutes: np.ndarray = columns["datetime"].astype("M8[m]")
+        last: int = np.searchsorted(minutes, minutes[-1], "left")
+
+        self.pending = {name: values[last:] for name, values in columns.items()}
+
+        return self.build_bars({name: values[:last] for name, values in columns.items()})
+
+    def flush(self) -> np.ndarray:
+        """
+        Get bar of the last minute after all ticks are added.
+        """
+        if not self.pending:
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        columns: Dict[str, np.ndarray] = self.pending
+        self.pending = None
+
+        return self.build_bars(columns)
+
+    def build_bars(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """"""
+        minutes: np.ndarray = columns["datetime"].astype("M8[m]")
+        if not len(minutes):
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        starts: np.ndarray = np.concatenate([[0], np.flatnonzero(np.diff(minutes)) + 1])
+        ends: np.ndarray = np.append(starts[1:], len(minutes)) - 1
+
+        price: np.ndarray = columns["last_price"]
+
+        # Change of daily high and low is not counted for the first tick of a minute
+        high_change: np.ndarray = columns["high_change"].copy()
+        high_change[starts] = -np.inf
+        low_change: np.ndarray = columns["low_change"].copy()
+        low_change[starts] = np.inf
+
+        bars: np.ndarray = np.empty(len(starts), dtype=BAR_DTYPE)
+        bars["datetime"] = minutes[starts]
+        bars["open"] = price[starts]
+        bars["high"] = np.maximum(
+            np.maximum.reduceat(price, starts), np.maximum.reduceat(high_change, starts)
+        )
+        bars["low"] = np.minimum(
+            np.minimum.reduceat(price, starts), np.minimum.reduceat(low_change, starts)
+        )
+        bars["close"] = price[ends]
+        bars["volume"] = np.add.reduceat(columns["volume_change"], starts)
+        bars["turnover"] = np.add.reduceat(columns["turnover_change"], starts)
+        bars["open_interest"] = columns["open_interest"][ends]
+
+        return bars
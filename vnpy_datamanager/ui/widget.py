@@ -1,34 +1,77 @@
-from typing import List, Tuple, Dict
-from functools import partial
+import os
+from typing import Any, List, Tuple, Dict, Optional, Callable
+from bisect import bisect_right
+from operator import attrgetter
 from datetime import datetime, timedelta
 
-from vnpy.trader.ui import QtWidgets, QtCore
-from vnpy.trader.engine import MainEngine, EventEngine
+import numpy as np
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.ui import QtWidgets, QtCore, QtGui
+from vnpy.trader.engine import MainEngine
 from vnpy.trader.constant import Interval, Exchange
-from vnpy.trader.object import BarData
-from vnpy.trader.database import DB_TZ
+from vnpy.trader.object import BarData, TickData
+from vnpy.trader.database import DB_TZ, TickOverview
 from vnpy.trader.utility import available_timezones
 
-from ..engine import APP_NAME, ManagerEngine, BarOverview
-
+from ..engine import (
+    APP_NAME,
+    EVENT_DATAMANAGER_JOB,
+    EVENT_DATAMANAGER_OVERVIEW,
+    FILE_NAME_PATTERN,
+    ManagerEngine,
+    BarOverview,
+    BarPager,
+    TickPager,
+    ImportSummary,
+    JobData,
+    JobStatus,
+    OverviewChange
+)
+from ..formats import BAR_READERS, bars_to_array
+from ..quality import ScanAction, ScanResult
+from ..resample import RESAMPLE_INTERVALS, can_resample
+
+
+# Fields of ticks shown in table after time
+TICK_TABLE_FIELDS: List[str] = [
+    "last_price",
+    "volume",
+    "turnover",
+    "open_interest",
+    "bid_price_1",
+    "bid_volume_1",
+    "ask_price_1",
+    "ask_volume_1",
+]
 
 INTERVAL_NAME_MAP = {
     Interval.MINUTE: "Minute",
     Interval.HOUR: "Hour",
     Interval.DAILY: "Daily",
+    Interval.WEEKLY: "Weekly",
+    Interval.TICK: "Tick",
 }
 
 
 class ManagerWidget(QtWidgets.QWidget):
     """"""
 
+    signal_job: QtCore.Signal = QtCore.Signal(Event)
+    signal_overview: QtCore.Signal = QtCore.Signal(Event)
+
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
         """"""
         super().__init__()
 
         self.engine: ManagerEngine = main_engine.get_engine(APP_NAME)
+        self.event_engine: EventEngine = event_engine
+
+        # Functions called with result of background jobs once finished
+        self.job_callbacks: Dict[int, Callable] = {}
 
         self.init_ui()
+        self.register_event()
 
     def init_ui(self) -> None:
         """"""
@@ -37,24 +80,46 @@ class ManagerWidget(QtWidgets.QWidget):
         self.init_tree()
         self.init_table()
 
+        self.job_monitor: JobMonitor = JobMonitor(self.engine)
+
         refresh_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Refresh")
         refresh_button.clicked.connect(self.refresh_tree)
 
         import_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Import data")
         import_button.clicked.connect(self.import_data)
 
+        import_folder_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Import folder")
+        import_folder_button.clicked.connect(self.import_folder)
+
         update_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Update data")
         update_button.clicked.connect(self.update_data)
 
         download_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Download data")
         download_button.clicked.connect(self.download_data)
 
+        build_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Build bars")
+        build_button.clicked.connect(self.build_bar_data)
+
+        scan_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Check all")
+        scan_button.clicked.connect(self.scan_all_data)
+
+        snapshot_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Backup")
+        snapshot_button.clicked.connect(self.create_snapshot)
+
+        restore_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Restore")
+        restore_button.clicked.connect(self.restore_snapshot)
+
         hbox1: QtWidgets.QHBoxLayout = QtWidgets.QHBoxLayout()
         hbox1.addWidget(refresh_button)
         hbox1.addStretch()
         hbox1.addWidget(import_button)
+        hbox1.addWidget(import_folder_button)
         hbox1.addWidget(update_button)
         hbox1.addWidget(download_button)
+        hbox1.addWidget(build_button)
+        hbox1.addWidget(scan_button)
+        hbox1.addWidget(snapshot_button)
+        hbox1.addWidget(restore_button)
 
         hbox2: QtWidgets.QHBoxLayout = QtWidgets.QHBoxLayout()
         hbox2.addWidget(self.tree)
@@ -63,9 +128,18 @@ class ManagerWidget(QtWidgets.QWidget):
         vbox: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout()
         vbox.addLayout(hbox1)
         vbox.addLayout(hbox2)
+        vbox.addWidget(self.job_monitor)
 
         self.setLayout(vbox)
 
+    def register_event(self) -> None:
+        """"""
+        self.signal_job.connect(self.process_job_event)
+        self.event_engine.register(EVENT_DATAMANAGER_JOB, self.signal_job.emit)
+
+        self.signal_overview.connect(self.process_overview_event)
+        self.event_engine.register(EVENT_DATAMANAGER_OVERVIEW, self.signal_overview.emit)
+
     def init_tree(self) -> None:
         """"""
         labels: list = [
@@ -76,14 +150,19 @@ class ManagerWidget(QtWidgets.QWidget):
             "Volume of data",
             "Start time",
             "End time",
-            "",
-            "",
-            "",
         ]
 
-        self.tree: QtWidgets.QTreeWidget = QtWidgets.QTreeWidget()
-        self.tree.setColumnCount(len(labels))
-        self.tree.setHeaderLabels(labels)
+        self.tree_model: OverviewTreeModel = OverviewTreeModel(labels)
+        self.tree_loaded: bool = False
+        self.tick_keys: set = set()
+
+        self.tree: QtWidgets.QTreeView = QtWidgets.QTreeView()
+        self.tree.setModel(self.tree_model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.tree.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self.show_tree_menu)
+        self.tree.doubleClicked.connect(self.show_tree_data)
 
     def init_table(self) -> None:
         """"""
@@ -98,99 +177,175 @@ class ManagerWidget(QtWidgets.QWidget):
             "Open interest",
         ]
 
-        self.table: QtWidgets.QTableWidget = QtWidgets.QTableWidget()
-        self.table.setColumnCount(len(labels))
-        self.table.setHorizontalHeaderLabels(labels)
+        self.table_model: BarTableModel = BarTableModel(labels)
+
+        tick_labels: list = [
+            "Time",
+            "Last price",
+            "Volume",
+            "Turnover",
+            "Open interest",
+            "Bid price",
+            "Bid volume",
+            "Ask price",
+            "Ask volume",
+        ]
+        self.tick_model: TickTableModel = TickTableModel(tick_labels)
+
+        self.table: QtWidgets.QTableView = QtWidgets.QTableView()
+        self.table.setModel(self.table_model)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.Fixed
+        )
         self.table.horizontalHeader().setSectionResizeMode(
-            QtWidgets.QHeaderView.ResizeToContents
+            QtWidgets.QHeaderView.Stretch
         )
 
     def refresh_tree(self) -> None:
+        """
+        Build the tree on first call, later calls reload overviews from
+        database and only rows changed are updated by overview events.
+        """
+        if self.tree_loaded:
+            self.engine.refresh_bar_overview()
+            self.refresh_tick_tree()
+            return
+
+        overviews: List[BarOverview] = self.engine.get_bar_overview()
+        self.tree_model.set_overviews(overviews)
+        self.refresh_tick_tree()
+
+        # Expand top-level nodes, series are only populated when an exchange is expanded
+        for row in range(self.tree_model.rowCount()):
+            self.tree.expand(self.tree_model.index(row, 0))
+
+        self.tree_loaded = True
+
+    def refresh_tick_tree(self) -> None:
+        """
+        Update rows of tick data, which are listed under Tick interval node.
+        """
+        overviews: List[TickOverview] = self.engine.get_tick_overview()
+
+        keys: set = set()
+        for data in overviews:
+            overview: BarOverview = BarOverview(
+                data.symbol, data.exchange, Interval.TICK, data.count, data.start, data.end
+            )
+            self.tree_model.update_overview(overview)
+            keys.add((data.symbol, data.exchange))
+
+        for symbol, exchange in self.tick_keys - keys:
+            self.tree_model.remove_overview(symbol, exchange, Interval.TICK)
+
+        self.tick_keys = keys
+
+    def process_overview_event(self, event: Event) -> None:
         """"""
-        self.tree.clear()
+        if not self.tree_loaded:
+            return
 
-        # Initialize the node cache dictionary
-        interval_childs: Dict[Interval, QtWidgets.QTreeWidgetItem] = {}
-        exchange_childs: Dict[tuple[Interval, Exchange], QtWidgets.QTreeWidgetItem] = {}
+        changes: List[OverviewChange] = event.data
 
-        # Query data summaries and sort them based on contract codes
-        overviews: List[BarOverview] = self.engine.get_bar_overview()
-        overviews.sort(key=lambda x: x.symbol)
+        for change in changes:
+            if change.overview:
+                self.tree_model.update_overview(change.overview)
+            else:
+                self.tree_model.remove_overview(change.symbol, change.exchange, change.interval)
 
-        # Add data cycle nodes
-        for interval in [Interval.MINUTE, Interval.HOUR, Interval.DAILY]:
-            interval_child = QtWidgets.QTreeWidgetItem()
-            interval_childs[interval] = interval_child
+    def show_tree_menu(self, pos: QtCore.QPoint) -> None:
+        """"""
+        index: QtCore.QModelIndex = self.tree.indexAt(pos)
+        overview: Optional[BarOverview] = self.tree_model.get_overview(index)
+        if not overview:
+            return
+
+        if overview.interval == Interval.TICK:
+            self.show_tick_menu(overview, pos)
+            return
 
-            interval_name: str = INTERVAL_NAME_MAP[interval]
-            interval_child.setText(0, interval_name)
+        # Only bulk delete is offered for multiple series selected
+        overviews: List[BarOverview] = self.get_selected_overviews()
+        if len(overviews) > 1 and overview in overviews:
+            menu: QtWidgets.QMenu = QtWidgets.QMenu(self)
+            delete_action: QtGui.QAction = menu.addAction(f"Delete {len(overviews)} series")
 
-        # Traverse to add data nodes
-        for overview in overviews:
-            # Get exchange nodes
-            key: tuple = (overview.interval, overview.exchange)
-            exchange_child: QtWidgets.QTreeWidgetItem = exchange_childs.get(key, None)
+            action: QtGui.QAction = menu.exec_(self.tree.viewport().mapToGlobal(pos))
+            if action == delete_action:
+                self.delete_bulk_data(overviews)
+            return
 
-            if not exchange_child:
-                interval_child: QtWidgets.QTreeWidgetItem = interval_childs[
-                    overview.interval
-                ]
+        menu: QtWidgets.QMenu = QtWidgets.QMenu(self)
+        show_action: QtGui.QAction = menu.addAction("Show")
+        output_action: QtGui.QAction = menu.addAction("Output")
+        resample_action: QtGui.QAction = menu.addAction("Resample")
+        scan_action: QtGui.QAction = menu.addAction("Check")
+        menu.addSeparator()
+        delete_action: QtGui.QAction = menu.addAction("Delete")
 
-                exchange_child: QtWidgets.QTreeWidgetItem = QtWidgets.QTreeWidgetItem(
-                    interval_child
-                )
-                exchange_child.setText(0, overview.exchange.value)
-
-                exchange_childs[key] = exchange_child
-
-            # Create data nodes
-            item = QtWidgets.QTreeWidgetItem(exchange_child)
-
-            item.setText(1, f"{overview.symbol}.{overview.exchange.value}")
-            item.setText(2, overview.symbol)
-            item.setText(3, overview.exchange.value)
-            item.setText(4, str(overview.count))
-            item.setText(5, overview.start.strftime("%Y-%m-%d %H:%M:%S"))
-            item.setText(6, overview.end.strftime("%Y-%m-%d %H:%M:%S"))
-
-            output_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Output")
-            output_func = partial(
-                self.output_data,
-                overview.symbol,
-                overview.exchange,
-                overview.interval,
-                overview.start,
-                overview.end,
+        action: QtGui.QAction = menu.exec_(self.tree.viewport().mapToGlobal(pos))
+
+        if action == show_action:
+            self.show_data(
+                overview.symbol, overview.exchange, overview.interval, overview.start, overview.end
             )
-            output_button.clicked.connect(output_func)
-
-            show_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Show")
-            show_func = partial(
-                self.show_data,
-                overview.symbol,
-                overview.exchange,
-                overview.interval,
-                overview.start,
-                overview.end,
+        elif action == output_action:
+            self.output_data(
+                overview.symbol, overview.exchange, overview.interval, overview.start, overview.end
             )
-            show_button.clicked.connect(show_func)
-
-            delete_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Delete")
-            delete_func = partial(
-                self.delete_data, overview.symbol, overview.exchange, overview.interval
+        elif action == resample_action:
+            self.resample_data(overview.symbol, overview.exchange, overview.interval)
+        elif action == scan_action:
+            self.scan_data(overview.symbol, overview.exchange, overview.interval)
+        elif action == delete_action:
+            self.delete_data(
+                overview.symbol, overview.exchange, overview.interval, overview.start, overview.end
             )
-            delete_button.clicked.connect(delete_func)
 
-            self.tree.setItemWidget(item, 7, show_button)
-            self.tree.setItemWidget(item, 8, output_button)
-            self.tree.setItemWidget(item, 9, delete_button)
+    def get_selected_overviews(self) -> List[BarOverview]:
+        """"""
+        overviews: List[BarOverview] = []
+
+        for index in self.tree.selectionModel().selectedRows():
+            overview: Optional[BarOverview] = self.tree_model.get_overview(index)
+            if overview and overview.interval != Interval.TICK:
+                overviews.append(overview)
 
-        # Expand top-level nodes
-        self.tree.addTopLevelItems(list(interval_childs.values()))
+        return overviews
+
+    def show_tick_menu(self, overview: BarOverview, pos: QtCore.QPoint) -> None:
+        """"""
+        menu: QtWidgets.QMenu = QtWidgets.QMenu(self)
+        show_action: QtGui.QAction = menu.addAction("Show")
+        output_action: QtGui.QAction = menu.addAction("Output")
+        build_action: QtGui.QAction = menu.addAction("Build bars")
+        menu.addSeparator()
+        delete_action: QtGui.QAction = menu.addAction("Delete")
+
+        action: QtGui.QAction = menu.exec_(self.tree.viewport().mapToGlobal(pos))
+
+        if action == show_action:
+            self.show_tick_data(overview.symbol, overview.exchange, overview.start, overview.end)
+        elif action == output_action:
+            self.output_tick_data(overview.symbol, overview.exchange, overview.start, overview.end)
+        elif action == build_action:
+            self.start_build(overview.symbol, overview.exchange, overview.start, overview.end)
+        elif action == delete_action:
+            self.delete_tick_data(overview.symbol, overview.exchange)
+
+    def show_tree_data(self, index: QtCore.QModelIndex) -> None:
+        """"""
+        overview: Optional[BarOverview] = self.tree_model.get_overview(index)
+        if not overview:
+            return
 
-        for interval_child in interval_childs.values():
-            interval_child.setExpanded(True)
+        if overview.interval == Interval.TICK:
+            self.show_tick_data(overview.symbol, overview.exchange, overview.start, overview.end)
+        else:
+            self.show_data(
+                overview.symbol, overview.exchange, overview.interval, overview.start, overview.end
+            )
 
     def import_data(self) -> None:
         """"""
@@ -213,8 +368,12 @@ class ManagerWidget(QtWidgets.QWidget):
         turnover_head: str = dialog.turnover_edit.text()
         open_interest_head: str = dialog.open_interest_edit.text()
         datetime_format: str = dialog.format_edit.text()
+        merge: bool = dialog.merge_check.isChecked()
 
-        start, end, count = self.engine.import_data_from_csv(
+        self.submit_job(
+            f"Import {os.path.basename(file_path)}",
+            self.engine.import_data_from_file,
+            lambda result: self.show_import_result(symbol, exchange, interval, *result),
             file_path,
             symbol,
             exchange,
@@ -229,10 +388,21 @@ class ManagerWidget(QtWidgets.QWidget):
             turnover_head,
             open_interest_head,
             datetime_format,
+            merge=merge
         )
 
+    def show_import_result(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        count: int
+    ) -> None:
+        """"""
         msg: str = f"\
-        CSV loaded successfully\n\
+        File loaded successfully\n\
         Symbol: {symbol}\n\
         Exchange: {exchange.value}\n\
         Interval: {interval.value}\n\
@@ -242,6 +412,65 @@ class ManagerWidget(QtWidgets.QWidget):
         "
         QtWidgets.QMessageBox.information(self, "Loaded successfully!", msg)
 
+    def import_folder(self) -> None:
+        """"""
+        dialog: ImportDialog = ImportDialog(folder=True)
+        n: int = dialog.exec_()
+        if n != dialog.Accepted:
+            return
+
+        path: str = dialog.file_edit.text()
+        name_pattern: str = dialog.pattern_edit.text()
+        interval = dialog.interval_combo.currentData()
+        tz_name: str = dialog.tz_combo.currentText()
+        datetime_head: str = dialog.datetime_edit.text()
+        open_head: str = dialog.open_edit.text()
+        low_head: str = dialog.low_edit.text()
+        high_head: str = dialog.high_edit.text()
+        close_head: str = dialog.close_edit.text()
+        volume_head: str = dialog.volume_edit.text()
+        turnover_head: str = dialog.turnover_edit.text()
+        open_interest_head: str = dialog.open_interest_edit.text()
+        datetime_format: str = dialog.format_edit.text()
+        merge: bool = dialog.merge_check.isChecked()
+
+        self.submit_job(
+            f"Import {os.path.basename(path)}",
+            self.engine.import_data_from_folder,
+            lambda summary: self.show_folder_result(interval, summary),
+            path,
+            name_pattern,
+            interval,
+            tz_name,
+            datetime_head,
+            open_head,
+            high_head,
+            low_head,
+            close_head,
+            volume_head,
+            turnover_head,
+            open_interest_head,
+            datetime_format,
+            merge=merge
+        )
+
+    def show_folder_result(self, interval: Interval, summary: ImportSummary) -> None:
+        """"""
+        msg: str = f"\
+        CSV folder loaded\n\
+        Interval: {interval.value}\n\
+        Files loaded: {len(summary.results)}\n\
+        Files failed: {len(summary.errors)}\n\
+        Start: {summary.start}\n\
+        End: {summary.end}\n\
+        Count: {summary.count}\n\
+        "
+
+        for file_path, error in summary.errors.items():
+            msg += f"\n{file_path}: {error}"
+
+        QtWidgets.QMessageBox.information(self, "Folder loaded!", msg)
+
     def output_data(
         self,
         symbol: str,
@@ -258,17 +487,32 @@ class ManagerWidget(QtWidgets.QWidget):
             return
         start, end = dialog.get_date_range()
 
-        # Get output file path
-        path, _ = QtWidgets.QFileDialog.getSaveFileName(
-            self, "Export data", "", "CSV(*.csv)"
+        # Get output file path and format
+        formats: Dict[str, str] = self.engine.get_export_formats()
+        filters: Dict[str, str] = {
+            f"{name}(*{suffix})": name for name, suffix in formats.items()
+        }
+
+        path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export data", "", ";;".join(filters)
         )
         if not path:
             return
 
-        result: bool = self.engine.output_data_to_csv(
-            path, symbol, exchange, interval, start, end
+        format_name: str = filters.get(selected_filter, "CSV")
+        suffix: str = formats[format_name]
+        if not path.endswith(suffix):
+            path += suffix
+
+        self.submit_job(
+            f"Export {symbol}.{exchange.value} {interval.value}",
+            self.engine.export_bar_data,
+            self.show_export_result,
+            path, symbol, exchange, interval, start, end, format_name
         )
 
+    def show_export_result(self, result: bool) -> None:
+        """"""
         if not result:
             QtWidgets.QMessageBox.warning(
                 self,
@@ -292,31 +536,61 @@ class ManagerWidget(QtWidgets.QWidget):
             return
         start, end = dialog.get_date_range()
 
-        bars: List[BarData] = self.engine.load_bar_data(
+        pager: BarPager = self.engine.iter_bar_data(
             symbol, exchange, interval, start, end
         )
+        self.table_model.set_pager(pager)
+        self.table.setModel(self.table_model)
+
+    def show_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+    ) -> None:
+        """"""
+        dialog: DateRangeDialog = DateRangeDialog(start, end)
+        n: int = dialog.exec_()
+        if n != dialog.Accepted:
+            return
+        start, end = dialog.get_date_range()
 
-        self.table.setRowCount(0)
-        self.table.setRowCount(len(bars))
+        pager: TickPager = self.engine.iter_tick_data(symbol, exchange, start, end)
+        self.tick_model.set_pager(pager)
+        self.table.setModel(self.tick_model)
 
-        for row, bar in enumerate(bars):
-            self.table.setItem(
-                row, 0, DataCell(bar.datetime.strftime("%Y-%m-%d %H:%M:%S"))
-            )
-            self.table.setItem(row, 1, DataCell(str(bar.open_price)))
-            self.table.setItem(row, 2, DataCell(str(bar.high_price)))
-            self.table.setItem(row, 3, DataCell(str(bar.low_price)))
-            self.table.setItem(row, 4, DataCell(str(bar.close_price)))
-            self.table.setItem(row, 5, DataCell(str(bar.volume)))
-            self.table.setItem(row, 6, DataCell(str(bar.turnover)))
-            self.table.setItem(row, 7, DataCell(str(bar.open_interest)))
+    def output_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+    ) -> None:
+        """"""
+        dialog: DateRangeDialog = DateRangeDialog(start, end)
+        n: int = dialog.exec_()
+        if n != dialog.Accepted:
+            return
+        start, end = dialog.get_date_range()
+
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export data", "", "CSV(*.csv)")
+        if not path:
+            return
+
+        self.submit_job(
+            f"Export {symbol}.{exchange.value} tick",
+            self.engine.export_tick_data,
+            self.show_export_result,
+            path, symbol, exchange, start, end
+        )
 
-    def delete_data(self, symbol: str, exchange: Exchange, interval: Interval) -> None:
+    def delete_tick_data(self, symbol: str, exchange: Exchange) -> None:
         """"""
         n = QtWidgets.QMessageBox.warning(
             self,
             "Deletion confirmed",
-            f"Please check if you want to delete all the data of {symbol} {exchange.value} {interval.value}.",
+            f"Please check if you want to delete all the tick data of {symbol} {exchange.value}.",
             QtWidgets.QMessageBox.Ok,
             QtWidgets.QMessageBox.Cancel,
         )
@@ -324,173 +598,1037 @@ class ManagerWidget(QtWidgets.QWidget):
         if n == QtWidgets.QMessageBox.Cancel:
             return
 
-        count: int = self.engine.delete_bar_data(symbol, exchange, interval)
+        self.submit_job(
+            f"Delete {symbol}.{exchange.value} tick",
+            self.engine.delete_tick_data,
+            lambda count: self.show_tick_delete_result(symbol, exchange, count),
+            symbol, exchange
+        )
+
+    def show_tick_delete_result(self, symbol: str, exchange: Exchange, count: int) -> None:
+        """"""
+        self.refresh_tick_tree()
 
         QtWidgets.QMessageBox.information(
             self,
             "Deleted successfully",
-            f"Total {count} of {symbol} {exchange.value} {interval.value} have been deleted.",
+            f"Total {count} ticks of {symbol} {exchange.value} have been deleted.",
             QtWidgets.QMessageBox.Ok,
         )
 
-    def update_data(self) -> None:
+    def resample_data(self, symbol: str, exchange: Exchange, interval: Interval) -> None:
         """"""
-        overviews: List[BarOverview] = self.engine.get_bar_overview()
-        total: int = len(overviews)
-        count: int = 0
-
-        dialog: QtWidgets.QProgressDialog = QtWidgets.QProgressDialog(
-            "Historical data update in progress", "Canceled", 0, 100
-        )
-        dialog.setWindowTitle("Update progress")
-        dialog.setWindowModality(QtCore.Qt.WindowModal)
-        dialog.setValue(0)
-
-        for overview in overviews:
-            if dialog.wasCanceled():
-                break
-
-            self.engine.download_bar_data(
-                overview.symbol,
-                overview.exchange,
-                overview.interval,
-                overview.end,
-                self.output,
+        targets: Dict[str, Interval] = {
+            INTERVAL_NAME_MAP.get(target, target.value): target
+            for target in RESAMPLE_INTERVALS if can_resample(interval, target)
+        }
+        if not targets:
+            QtWidgets.QMessageBox.information(
+                self, "Resample", f"{interval.value} bars cannot be resampled."
             )
-            count += 1
-            progress = int(round(count / total * 100, 0))
-            dialog.setValue(progress)
+            return
 
-        dialog.close()
+        name, ok = QtWidgets.QInputDialog.getItem(
+            self, "Resample", "Target interval", list(targets), 0, False
+        )
+        if not ok:
+            return
+        target: Interval = targets[name]
 
-    def download_data(self) -> None:
-        """"""
-        dialog: DownloadDialog = DownloadDialog(self.engine)
-        dialog.exec_()
+        self.submit_job(
+            f"Resample {symbol}.{exchange.value} {interval.value} to {target.value}",
+            self.engine.resample_bar_data,
+            lambda count: self.show_resample_result(symbol, exchange, target, count),
+            symbol, exchange, interval, target
+        )
 
-    def show(self) -> None:
+    def show_resample_result(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        target: Interval,
+        count: int
+    ) -> None:
         """"""
-        self.showMaximized()
-
-    def output(self, msg: str) -> None:
-        """Exporting logs during download"""
-        QtWidgets.QMessageBox.warning(
+        QtWidgets.QMessageBox.information(
             self,
-            "Data download",
-            msg,
-            QtWidgets.QMessageBox.Ok,
+            "Resampled successfully",
+            f"Total {count} {target.value} bars of {symbol} {exchange.value} have been saved.",
             QtWidgets.QMessageBox.Ok,
         )
 
+    def scan_data(self, symbol: str, exchange: Exchange, interval: Interval) -> None:
+        """"""
+        self.submit_job(
+            f"Check {symbol}.{exchange.value} {interval.value}",
+            self.engine.scan_bar_data,
+            self.show_scan_result,
+            symbol, exchange, interval
+        )
 
-class DataCell(QtWidgets.QTableWidgetItem):
-    """"""
+    def show_scan_result(self, result: ScanResult) -> None:
+        """"""
+        vt_symbol: str = f"{result.symbol}.{result.exchange.value}"
 
-    def __init__(self, text: str = "") -> None:
-        super().__init__(text)
+        if not result.bad:
+            QtWidgets.QMessageBox.information(
+                self, "Check finished", f"No bad bars found in {result.count} bars of {vt_symbol}."
+            )
+            return
 
-        self.setTextAlignment(QtCore.Qt.AlignCenter)
+        msg: str = f"{result.bad_count} bad bars found in {result.count} bars of {vt_symbol}\n"
+        for name, n in result.issues.items():
+            if n:
+                samples: str = ", ".join(str(dt) for dt in result.samples[name][:3])
+                msg += f"\n{name}: {n}, e.g. {samples}"
 
+        action: Optional[ScanAction] = self.ask_scan_action(msg)
+        if not action:
+            return
 
-class DateRangeDialog(QtWidgets.QDialog):
-    """"""
+        self.submit_job(
+            f"Fix {vt_symbol} {result.interval.value}",
+            self.engine.fix_bar_data,
+            self.show_fix_result,
+            result, action
+        )
 
-    def __init__(self, start: datetime, end: datetime, parent=None) -> None:
+    def show_fix_result(self, result: ScanResult) -> None:
         """"""
-        super().__init__(parent)
+        msg: str = f"{result.removed} bars removed, {result.fixed} bars repaired."
+        if result.quarantine_path:
+            msg += f"\nBad bars are saved in {result.quarantine_path}"
 
-        self.setWindowTitle("Select data intervals")
+        QtWidgets.QMessageBox.information(self, "Fixed successfully", msg)
 
-        self.start_edit: QtWidgets.QDateEdit = QtWidgets.QDateEdit(
-            QtCore.QDate(start.year, start.month, start.day)
-        )
-        self.end_edit: QtWidgets.QDateEdit = QtWidgets.QDateEdit(
-            QtCore.QDate(end.year, end.month, end.day)
+    def scan_all_data(self) -> None:
+        """"""
+        self.submit_job(
+            "Check all",
+            self.engine.scan_all_bar_data,
+            self.show_scan_all_result
         )
 
-        button: QtWidgets.QPushButton = QtWidgets.QPushButton("OK")
-        button.clicked.connect(self.accept)
-
-        form: QtWidgets.QFormLayout = QtWidgets.QFormLayout()
-        form.addRow("Start time", self.start_edit)
-        form.addRow("End time", self.end_edit)
-        form.addRow(button)
+    def show_scan_all_result(self, results: List[ScanResult]) -> None:
+        """"""
+        bad_results: List[ScanResult] = [result for result in results if result.bad]
 
-        self.setLayout(form)
+        if not bad_results:
+            QtWidgets.QMessageBox.information(
+                self, "Check finished", f"No bad bars found in {len(results)} series."
+            )
+            return
 
-    def get_date_range(self) -> Tuple[datetime, datetime]:
-        """"""
-        start = self.start_edit.dateTime().toPython()
-        end = self.end_edit.dateTime().toPython() + timedelta(days=1)
-        return start, end
+        msg: str = f"Bad bars found in {len(bad_results)} of {len(results)} series\n"
+        for result in bad_results:
+            msg += (
+                f"\n{result.symbol}.{result.exchange.value} {result.interval.value}: "
+                f"{result.bad_count} of {result.count}"
+            )
 
+        action: Optional[ScanAction] = self.ask_scan_action(msg)
+        if not action:
+            return
 
-class ImportDialog(QtWidgets.QDialog):
-    """"""
+        # Scan again, since data may have changed in the meantime
+        self.submit_job(
+            f"Check all and {action.value}",
+            self.engine.scan_all_bar_data,
+            self.show_fix_all_result,
+            action
+        )
 
-    def __init__(self, parent=None) -> None:
+    def show_fix_all_result(self, results: List[ScanResult]) -> None:
         """"""
-        super().__init__()
-
-        self.setWindowTitle("Import data from CSV file")
-        self.setFixedWidth(300)
+        removed: int = sum(result.removed for result in results)
+        fixed: int = sum(result.fixed for result in results)
 
-        self.setWindowFlags(
-            (self.windowFlags() | QtCore.Qt.CustomizeWindowHint)
-            & ~QtCore.Qt.WindowMaximizeButtonHint
+        QtWidgets.QMessageBox.information(
+            self, "Fixed successfully", f"{removed} bars removed, {fixed} bars repaired."
         )
 
-        file_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Selection of files")
-        file_button.clicked.connect(self.select_file)
+    def ask_scan_action(self, msg: str) -> Optional[ScanAction]:
+        """
+        Ask whether to quarantine or repair bad bars found.
+        """
+        box: QtWidgets.QMessageBox = QtWidgets.QMessageBox(self)
+        box.setWindowTitle("Check finished")
+        box.setText(msg)
 
-        load_button: QtWidgets.QPushButton = QtWidgets.QPushButton("OK")
-        load_button.clicked.connect(self.accept)
+        repair_button = box.addButton("Repair", QtWidgets.QMessageBox.AcceptRole)
+        quarantine_button = box.addButton("Quarantine", QtWidgets.QMessageBox.DestructiveRole)
+        box.addButton(QtWidgets.QMessageBox.Close)
 
-        self.file_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit()
-        self.symbol_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit()
+        box.exec_()
 
-        self.exchange_combo: QtWidgets.QComboBox = QtWidgets.QComboBox()
-        for i in Exchange:
-            self.exchange_combo.addItem(str(i.name), i)
+        if box.clickedButton() == repair_button:
+            return ScanAction.REPAIR
+        elif box.clickedButton() == quarantine_button:
+            return ScanAction.QUARANTINE
+        return None
 
-        self.interval_combo: QtWidgets.QComboBox = QtWidgets.QComboBox()
-        for i in Interval:
-            if i != Interval.TICK:
-                self.interval_combo.addItem(str(i.name), i)
+    def create_snapshot(self) -> None:
+        """"""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Backup all bar data", "", "Snapshot(*.zip)"
+        )
+        if not path:
+            return
 
-        self.tz_combo: QtWidgets.QComboBox = QtWidgets.QComboBox()
-        self.tz_combo.addItems(available_timezones())
-        self.tz_combo.setCurrentIndex(self.tz_combo.findText("Asia/Shanghai"))
+        if not path.endswith(".zip"):
+            path += ".zip"
 
-        self.datetime_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("datetime")
-        self.open_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("open")
-        self.high_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("high")
-        self.low_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("low")
-        self.close_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("close")
-        self.volume_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("volume")
-        self.turnover_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("turnover")
-        self.open_interest_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit(
-            "open_interest"
+        self.submit_job(
+            "Backup all bar data",
+            self.engine.create_snapshot,
+            lambda count: self.show_snapshot_result(path, count),
+            path
         )
 
-        self.format_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("%Y-%m-%d %H:%M:%S")
+    def show_snapshot_result(self, path: str, count: int) -> None:
+        """"""
+        QtWidgets.QMessageBox.information(
+            self,
+            "Backup finished",
+            f"Total {count} bars have been saved into {path}.",
+            QtWidgets.QMessageBox.Ok,
+        )
 
-        info_label: QtWidgets.QLabel = QtWidgets.QLabel("Information")
-        info_label.setAlignment(QtCore.Qt.AlignCenter)
+    def restore_snapshot(self) -> None:
+        """"""
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Restore bar data", "", "Snapshot(*.zip)"
+        )
+        if not path:
+            return
 
-        head_label: QtWidgets.QLabel = QtWidgets.QLabel("Head")
-        head_label.setAlignment(QtCore.Qt.AlignCenter)
+        n = QtWidgets.QMessageBox.question(
+            self,
+            "Restore bar data",
+            "Skip bars already stored?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No | QtWidgets.QMessageBox.Cancel,
+            QtWidgets.QMessageBox.No,
+        )
 
-        format_label: QtWidgets.QLabel = QtWidgets.QLabel("Format")
-        format_label.setAlignment(QtCore.Qt.AlignCenter)
+        if n == QtWidgets.QMessageBox.Cancel:
+            return
+        merge: bool = n == QtWidgets.QMessageBox.Yes
 
-        form: QtWidgets.QFormLayout = QtWidgets.QFormLayout()
-        form.addRow(file_button, self.file_edit)
-        form.addRow(QtWidgets.QLabel())
-        form.addRow(info_label)
-        form.addRow("Symbol", self.symbol_edit)
-        form.addRow("Exchange", self.exchange_combo)
-        form.addRow("Interval", self.interval_combo)
+        self.submit_job(
+            f"Restore {os.path.basename(path)}",
+            self.engine.restore_snapshot,
+            self.show_restore_result,
+            path, merge
+        )
+
+    def show_restore_result(self, count: int) -> None:
+        """"""
+        QtWidgets.QMessageBox.information(
+            self,
+            "Restore finished",
+            f"Total {count} bars have been restored.",
+            QtWidgets.QMessageBox.Ok,
+        )
+
+    def delete_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> None:
+        """"""
+        # Get delete date range, the whole series by default
+        dialog: DateRangeDialog = DateRangeDialog(start, end)
+        n: int = dialog.exec_()
+        if n != dialog.Accepted:
+            return
+        start, end = dialog.get_date_range()
+        end -= timedelta(seconds=1)
+
+        n = QtWidgets.QMessageBox.warning(
+            self,
+            "Deletion confirmed",
+            f"Please check if you want to delete the data of {symbol} {exchange.value} {interval.value} "
+            f"from {start:%Y-%m-%d} to {end:%Y-%m-%d}.",
+            QtWidgets.QMessageBox.Ok,
+            QtWidgets.QMessageBox.Cancel,
+        )
+
+        if n == QtWidgets.QMessageBox.Cancel:
+            return
+
+        self.submit_job(
+            f"Delete {symbol}.{exchange.value} {interval.value}",
+            self.engine.delete_bar_range,
+            lambda count: self.show_delete_result(symbol, exchange, interval, count),
+            symbol, exchange, interval, start, end
+        )
+
+    def delete_bulk_data(self, overviews: List[BarOverview]) -> None:
+        """"""
+        start: datetime = min(overview.start for overview in overviews)
+        end: datetime = max(overview.end for overview in overviews)
+
+        dialog: DateRangeDialog = DateRangeDialog(start, end)
+        n: int = dialog.exec_()
+        if n != dialog.Accepted:
+            return
+        start, end = dialog.get_date_range()
+        end -= timedelta(seconds=1)
+
+        n = QtWidgets.QMessageBox.warning(
+            self,
+            "Deletion confirmed",
+            f"Please check if you want to delete the data of {len(overviews)} series "
+            f"from {start:%Y-%m-%d} to {end:%Y-%m-%d}.",
+            QtWidgets.QMessageBox.Ok,
+            QtWidgets.QMessageBox.Cancel,
+        )
+
+        if n == QtWidgets.QMessageBox.Cancel:
+            return
+
+        keys: List[Tuple[str, Exchange, Interval]] = [
+            (overview.symbol, overview.exchange, overview.interval) for overview in overviews
+        ]
+
+        self.submit_job(
+            f"Delete {len(keys)} series",
+            self.engine.delete_bulk_bar_data,
+            lambda count: self.show_bulk_delete_result(len(keys), count),
+            keys, start, end
+        )
+
+    def show_bulk_delete_result(self, n: int, count: int) -> None:
+        """"""
+        QtWidgets.QMessageBox.information(
+            self,
+            "Deleted successfully",
+            f"Total {count} bars of {n} series have been deleted.",
+            QtWidgets.QMessageBox.Ok,
+        )
+
+    def show_delete_result(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        count: int
+    ) -> None:
+        """"""
+        QtWidgets.QMessageBox.information(
+            self,
+            "Deleted successfully",
+            f"Total {count} of {symbol} {exchange.value} {interval.value} have been deleted.",
+            QtWidgets.QMessageBox.Ok,
+        )
+
+    def update_data(self) -> None:
+        """"""
+        n = QtWidgets.QMessageBox.question(
+            self,
+            "Update data",
+            "Also check stored data for gaps and download the missing bars?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No | QtWidgets.QMessageBox.Cancel,
+            QtWidgets.QMessageBox.No,
+        )
+
+        if n == QtWidgets.QMessageBox.Cancel:
+            return
+        fill_gaps: bool = n == QtWidgets.QMessageBox.Yes
+
+        job_id: int = self.engine.start_update_all(fill_gaps)
+        if not job_id:
+            QtWidgets.QMessageBox.information(
+                self, "Update in progress", "Historical data update is already running."
+            )
+
+    def build_bar_data(self) -> None:
+        """"""
+        overviews: List[TickOverview] = self.engine.get_tick_overview()
+        if not overviews:
+            QtWidgets.QMessageBox.information(self, "Build bars", "No tick data in database.")
+            return
+
+        items: Dict[str, TickOverview] = {
+            f"{overview.symbol}.{overview.exchange.value}": overview for overview in overviews
+        }
+
+        name, ok = QtWidgets.QInputDialog.getItem(
+            self, "Build bars", "Build minute bars from ticks of", sorted(items), 0, False
+        )
+        if not ok:
+            return
+        overview: TickOverview = items[name]
+
+        self.start_build(overview.symbol, overview.exchange, overview.start, overview.end)
+
+    def start_build(self, symbol: str, exchange: Exchange, start: datetime, end: datetime) -> None:
+        """"""
+        self.submit_job(
+            f"Build bars {symbol}.{exchange.value}",
+            self.engine.build_bar_data,
+            None,
+            symbol, exchange, start, end
+        )
+
+    def submit_job(
+        self,
+        name: str,
+        func: Callable,
+        callback: Optional[Callable],
+        *args,
+        **kwargs
+    ) -> None:
+        """
+        Run engine function as background job, callback is called with
+        its return value in GUI thread once finished.
+        """
+        job_id: int = self.engine.submit_job(name, func, *args, **kwargs)
+
+        if callback:
+            self.job_callbacks[job_id] = callback
+
+    def process_job_event(self, event: Event) -> None:
+        """"""
+        job: JobData = event.data
+        self.job_monitor.update_job(job)
+
+        if job.active:
+            return
+
+        callback: Optional[Callable] = self.job_callbacks.pop(job.job_id, None)
+
+        if job.status == JobStatus.FAILED:
+            QtWidgets.QMessageBox.warning(self, "Job failed", f"{job.name} failed: {job.error}")
+        elif job.status == JobStatus.FINISHED and callback:
+            callback(job.result)
+
+    def download_data(self) -> None:
+        """"""
+        dialog: DownloadDialog = DownloadDialog(self.engine)
+        n: int = dialog.exec_()
+        if n != dialog.Accepted:
+            return
+
+        symbol: str = dialog.symbol_edit.text()
+        exchange: Exchange = Exchange(dialog.exchange_combo.currentData())
+        interval: Interval = Interval(dialog.interval_combo.currentData())
+
+        start_date = dialog.start_date_edit.date()
+        start: datetime = datetime(
+            start_date.year(), start_date.month(), start_date.day()
+        )
+        start: datetime = start.replace(tzinfo=DB_TZ)
+
+        # Messages of datafeed are written into log, since job is not run in GUI thread
+        if interval == Interval.TICK:
+            func: Callable = self.engine.download_tick_data
+            args: tuple = (symbol, exchange, start, self.engine.write_log)
+        else:
+            func: Callable = self.engine.download_bar_data
+            args: tuple = (
+                symbol, exchange, interval, start, self.engine.write_log, dialog.merge_check.isChecked()
+            )
+
+        self.submit_job(
+            f"Download {symbol}.{exchange.value} {interval.value}",
+            func,
+            self.show_download_result,
+            *args
+        )
+
+    def show_download_result(self, count: int) -> None:
+        """"""
+        QtWidgets.QMessageBox.information(
+            self, "End of download", f"Total data downloaded: {count} items"
+        )
+
+    def show(self) -> None:
+        """"""
+        self.showMaximized()
+
+
+class JobMonitor(QtWidgets.QTableWidget):
+    """
+    Table of background jobs with their progress, running jobs can be cancelled.
+    """
+
+    def __init__(self, engine: ManagerEngine) -> None:
+        """"""
+        super().__init__()
+
+        self.engine: ManagerEngine = engine
+
+        # Row of each job, newest job on top
+        self.rows: Dict[int, int] = {}
+
+        labels: list = ["ID", "Job", "Status", "Progress", "Message", "Cancel"]
+        self.setColumnCount(len(labels))
+        self.setHorizontalHeaderLabels(labels)
+        self.verticalHeader().setVisible(False)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.horizontalHeader().setSectionResizeMode(
+            4, QtWidgets.QHeaderView.Stretch
+        )
+        self.setMaximumHeight(200)
+
+    def update_job(self, job: JobData) -> None:
+        """"""
+        if job.job_id not in self.rows:
+            self.insertRow(0)
+            self.rows = {job_id: row + 1 for job_id, row in self.rows.items()}
+            self.rows[job.job_id] = 0
+
+            self.setItem(0, 0, QtWidgets.QTableWidgetItem(str(job.job_id)))
+            self.setItem(0, 1, QtWidgets.QTableWidgetItem(job.name))
+
+            button: QtWidgets.QPushButton = QtWidgets.QPushButton("Cancel")
+            button.clicked.connect(lambda: self.engine.cancel_job(job.job_id))
+            self.setCellWidget(0, 5, button)
+
+        row: int = self.rows[job.job_id]
+
+        if job.total:
+            progress: str = f"{job.finished}/{job.total}"
+        else:
+            progress: str = str(job.finished) if job.finished else ""
+
+        msg: str = job.error if job.status == JobStatus.FAILED else job.msg
+
+        self.setItem(row, 2, QtWidgets.QTableWidgetItem(job.status.value))
+        self.setItem(row, 3, QtWidgets.QTableWidgetItem(progress))
+        self.setItem(row, 4, QtWidgets.QTableWidgetItem(msg))
+
+        if not job.active:
+            self.removeCellWidget(row, 5)
+
+
+class TreeNode:
+    """
+    Node of the overview tree: an interval, an exchange or a series.
+    """
+
+    def __init__(self, parent: Optional["TreeNode"], name: str, overview: BarOverview = None) -> None:
+        """"""
+        self.parent: Optional[TreeNode] = parent
+        self.name: str = name
+        self.overview: Optional[BarOverview] = overview
+
+        # Children are kept sorted, only the first fetched ones are shown in view
+        self.children: List[TreeNode] = []
+        self.fetched: int = 0
+
+    def row(self) -> int:
+        """"""
+        return self.parent.children.index(self)
+
+    def find_row(self, name: str) -> int:
+        """
+        Get row of the first child with name not less than name, by binary
+        search over children sorted by name.
+        """
+        low: int = 0
+        high: int = len(self.children)
+
+        while low < high:
+            middle: int = (low + high) // 2
+
+            if self.children[middle].name < name:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+
+class OverviewTreeModel(QtCore.QAbstractItemModel):
+    """
+    Tree model of bar overviews grouped by interval and exchange.
+
+    Series rows of an exchange are only handed to the view when the node
+    is expanded, in batches of FETCH_SIZE.
+    """
+
+    FETCH_SIZE: int = 1000
+
+    def __init__(self, labels: list) -> None:
+        """"""
+        super().__init__()
+
+        self.labels: list = labels
+
+        self.root: TreeNode = TreeNode(None, "")
+        self.interval_nodes: Dict[Interval, TreeNode] = {}
+        self.exchange_nodes: Dict[Tuple[Interval, Exchange], TreeNode] = {}
+
+    def set_overviews(self, overviews: List[BarOverview]) -> None:
+        """"""
+        self.beginResetModel()
+
+        self.root = TreeNode(None, "")
+        self.interval_nodes = {}
+        self.exchange_nodes = {}
+
+        # Nodes are added without insert signals, since the whole model is reset
+        for interval in [Interval.MINUTE, Interval.HOUR, Interval.DAILY]:
+            self.get_interval_node(interval, False)
+
+        # Sort based on contract codes
+        for overview in sorted(overviews, key=lambda x: x.symbol):
+            exchange_node: TreeNode = self.get_exchange_node(overview.interval, overview.exchange, False)
+            exchange_node.children.append(TreeNode(exchange_node, overview.symbol, overview))
+
+        self.endResetModel()
+
+    def get_interval_node(self, interval: Interval, notify: bool = True) -> TreeNode:
+        """"""
+        node: Optional[TreeNode] = self.interval_nodes.get(interval, None)
+
+        if not node:
+            node = TreeNode(self.root, INTERVAL_NAME_MAP.get(interval, interval.value))
+            self.append_node(self.root, node, notify)
+            self.interval_nodes[interval] = node
+
+        return node
+
+    def get_exchange_node(self, interval: Interval, exchange: Exchange, notify: bool = True) -> TreeNode:
+        """"""
+        node: Optional[TreeNode] = self.exchange_nodes.get((interval, exchange), None)
+
+        if not node:
+            interval_node: TreeNode = self.get_interval_node(interval, notify)
+
+            node = TreeNode(interval_node, exchange.value)
+            self.append_node(interval_node, node, notify)
+            self.exchange_nodes[(interval, exchange)] = node
+
+        return node
+
+    def append_node(self, parent: TreeNode, node: TreeNode, notify: bool = True) -> None:
+        """
+        Append interval or exchange node, which are always shown.
+        """
+        if not notify:
+            parent.children.append(node)
+            parent.fetched += 1
+            return
+
+        row: int = len(parent.children)
+
+        self.beginInsertRows(self.get_index(parent), row, row)
+        parent.children.append(node)
+        parent.fetched += 1
+        self.endInsertRows()
+
+    def update_overview(self, overview: BarOverview) -> None:
+        """
+        Add or update the row of a series.
+        """
+        exchange_node: TreeNode = self.get_exchange_node(overview.interval, overview.exchange)
+        parent: QtCore.QModelIndex = self.get_index(exchange_node)
+
+        children: List[TreeNode] = exchange_node.children
+        row: int = exchange_node.find_row(overview.symbol)
+
+        if row < len(children) and children[row].name == overview.symbol:
+            children[row].overview = overview
+
+            if row < exchange_node.fetched:
+                self.dataChanged.emit(
+                    self.index(row, 0, parent),
+                    self.index(row, len(self.labels) - 1, parent)
+                )
+            return
+
+        node: TreeNode = TreeNode(exchange_node, overview.symbol, overview)
+
+        # Rows after the fetched ones are inserted without notifying view
+        if row < exchange_node.fetched or exchange_node.fetched == len(children):
+            self.beginInsertRows(parent, row, row)
+            children.insert(row, node)
+            exchange_node.fetched += 1
+            self.endInsertRows()
+        else:
+            children.insert(row, node)
+
+    def remove_overview(self, symbol: str, exchange: Exchange, interval: Interval) -> None:
+        """"""
+        exchange_node: Optional[TreeNode] = self.exchange_nodes.get((interval, exchange), None)
+        if not exchange_node:
+            return
+
+        children: List[TreeNode] = exchange_node.children
+        row: int = exchange_node.find_row(symbol)
+        if row == len(children) or children[row].name != symbol:
+            return
+
+        if row < exchange_node.fetched:
+            self.beginRemoveRows(self.get_index(exchange_node), row, row)
+            children.pop(row)
+            exchange_node.fetched -= 1
+            self.endRemoveRows()
+        else:
+            children.pop(row)
+
+        # Remove exchange node without any series
+        if not children:
+            interval_node: TreeNode = exchange_node.parent
+            exchange_row: int = exchange_node.row()
+
+            self.beginRemoveRows(self.get_index(interval_node), exchange_row, exchange_row)
+            interval_node.children.pop(exchange_row)
+            interval_node.fetched -= 1
+            self.endRemoveRows()
+
+            self.exchange_nodes.pop((interval, exchange))
+
+    def get_node(self, index: QtCore.QModelIndex) -> TreeNode:
+        """"""
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
+
+    def get_index(self, node: TreeNode) -> QtCore.QModelIndex:
+        """"""
+        if node is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row(), 0, node)
+
+    def get_overview(self, index: QtCore.QModelIndex) -> Optional[BarOverview]:
+        """"""
+        if not index.isValid():
+            return None
+        return self.get_node(index).overview
+
+    def index(
+        self,
+        row: int,
+        column: int,
+        parent: QtCore.QModelIndex = QtCore.QModelIndex()
+    ) -> QtCore.QModelIndex:
+        """"""
+        node: TreeNode = self.get_node(parent)
+
+        if row < 0 or row >= node.fetched or column < 0 or column >= len(self.labels):
+            return QtCore.QModelIndex()
+
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index: QtCore.QModelIndex) -> QtCore.QModelIndex:
+        """"""
+        if not index.isValid():
+            return QtCore.QModelIndex()
+
+        node: TreeNode = index.internalPointer()
+        return self.get_index(node.parent)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """"""
+        if parent.column() > 0:
+            return 0
+        return self.get_node(parent).fetched
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """"""
+        return len(self.labels)
+
+    def hasChildren(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+        """"""
+        if parent.column() > 0:
+            return False
+        return bool(self.get_node(parent).children)
+
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:
+        """"""
+        node: TreeNode = self.get_node(parent)
+        return node.fetched < len(node.children)
+
+    def fetchMore(self, parent: QtCore.QModelIndex) -> None:
+        """"""
+        node: TreeNode = self.get_node(parent)
+        fetched: int = min(node.fetched + self.FETCH_SIZE, len(node.children))
+
+        self.beginInsertRows(parent, node.fetched, fetched - 1)
+        node.fetched = fetched
+        self.endInsertRows()
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        """"""
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+
+        node: TreeNode = index.internalPointer()
+        column: int = index.column()
+        overview: Optional[BarOverview] = node.overview
+
+        if not overview:
+            return node.name if column == 0 else None
+
+        if column == 1:
+            return f"{overview.symbol}.{overview.exchange.value}"
+        elif column == 2:
+            return overview.symbol
+        elif column == 3:
+            return overview.exchange.value
+        elif column == 4:
+            return str(overview.count)
+        elif column == 5:
+            return overview.start.strftime("%Y-%m-%d %H:%M:%S")
+        elif column == 6:
+            return overview.end.strftime("%Y-%m-%d %H:%M:%S")
+
+        return None
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.DisplayRole
+    ) -> Any:
+        """"""
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.labels[section]
+        return None
+
+
+class BarTableModel(QtCore.QAbstractTableModel):
+    """
+    Table model over columns of bar arrays, cell text is formatted on demand.
+
+    Pages are fetched from the pager only when the view scrolls to them.
+    """
+
+    def __init__(self, labels: list) -> None:
+        """"""
+        super().__init__()
+
+        self.labels: list = labels
+        self.pager: Optional[BarPager] = None
+
+        # Column arrays of each fetched page and the first row of each page
+        self.chunks: List[List[np.ndarray]] = []
+        self.offsets: List[int] = []
+        self.size: int = 0
+
+    def set_pager(self, pager: BarPager) -> None:
+        """"""
+        self.beginResetModel()
+        self.pager = pager
+        self.chunks = []
+        self.offsets = []
+        self.size = 0
+        self.endResetModel()
+
+        if self.canFetchMore():
+            self.fetchMore()
+
+    def canFetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+        """"""
+        if parent.isValid() or not self.pager:
+            return False
+        return not self.pager.finished
+
+    def fetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> None:
+        """"""
+        if parent.isValid() or not self.pager:
+            return
+
+        bars: List[BarData] = self.pager.next_page()
+        if not bars:
+            return
+
+        columns: List[np.ndarray] = self.to_columns(bars)
+        size: int = len(bars)
+
+        self.beginInsertRows(QtCore.QModelIndex(), self.size, self.size + size - 1)
+        self.chunks.append(columns)
+        self.offsets.append(self.size)
+        self.size += size
+        self.endInsertRows()
+
+    def to_columns(self, bars: List[BarData]) -> List[np.ndarray]:
+        """"""
+        data: np.ndarray = bars_to_array(bars)
+        return [data[name] for name in data.dtype.names]
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """"""
+        if parent.isValid():
+            return 0
+        return self.size
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """"""
+        if parent.isValid():
+            return 0
+        return len(self.labels)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        """"""
+        if not index.isValid():
+            return None
+
+        if role == QtCore.Qt.DisplayRole:
+            row: int = index.row()
+            column: int = index.column()
+
+            i: int = bisect_right(self.offsets, row) - 1
+            value = self.chunks[i][column][row - self.offsets[i]]
+
+            if column:
+                return str(float(value))
+            return str(value).replace("T", " ")
+        elif role == QtCore.Qt.TextAlignmentRole:
+            return int(QtCore.Qt.AlignCenter)
+
+        return None
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.DisplayRole
+    ) -> Any:
+        """"""
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.labels[section]
+        return None
+
+
+class TickTableModel(BarTableModel):
+    """
+    Table model of ticks, paged the same way as bars.
+    """
+
+    def to_columns(self, ticks: List[TickData]) -> List[np.ndarray]:
+        """"""
+        dts: np.ndarray = np.array(
+            [tick.datetime.replace(tzinfo=None) for tick in ticks], dtype="M8[us]"
+        )
+
+        values: np.ndarray = np.array(
+            list(map(attrgetter(*TICK_TABLE_FIELDS), ticks)), dtype=float
+        )
+
+        return [dts] + [values[:, i] for i in range(len(TICK_TABLE_FIELDS))]
+
+
+class DateRangeDialog(QtWidgets.QDialog):
+    """"""
+
+    def __init__(self, start: datetime, end: datetime, parent=None) -> None:
+        """"""
+        super().__init__(parent)
+
+        self.setWindowTitle("Select data intervals")
+
+        self.start_edit: QtWidgets.QDateEdit = QtWidgets.QDateEdit(
+            QtCore.QDate(start.year, start.month, start.day)
+        )
+        self.end_edit: QtWidgets.QDateEdit = QtWidgets.QDateEdit(
+            QtCore.QDate(end.year, end.month, end.day)
+        )
+
+        button: QtWidgets.QPushButton = QtWidgets.QPushButton("OK")
+        button.clicked.connect(self.accept)
+
+        form: QtWidgets.QFormLayout = QtWidgets.QFormLayout()
+        form.addRow("Start time", self.start_edit)
+        form.addRow("End time", self.end_edit)
+        form.addRow(button)
+
+        self.setLayout(form)
+
+    def get_date_range(self) -> Tuple[datetime, datetime]:
+        """"""
+        start = self.start_edit.dateTime().toPython()
+        end = self.end_edit.dateTime().toPython() + timedelta(days=1)
+        return start, end
+
+
+class ImportDialog(QtWidgets.QDialog):
+    """"""
+
+    def __init__(self, parent=None, folder: bool = False) -> None:
+        """"""
+        super().__init__()
+
+        self.folder: bool = folder
+
+        if folder:
+            self.setWindowTitle("Import data from CSV folder")
+        else:
+            self.setWindowTitle("Import data from file")
+        self.setFixedWidth(300)
+
+        self.setWindowFlags(
+            (self.windowFlags() | QtCore.Qt.CustomizeWindowHint)
+            & ~QtCore.Qt.WindowMaximizeButtonHint
+        )
+
+        if folder:
+            file_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Selection of folder")
+        else:
+            file_button: QtWidgets.QPushButton = QtWidgets.QPushButton("Selection of files")
+        file_button.clicked.connect(self.select_file)
+
+        load_button: QtWidgets.QPushButton = QtWidgets.QPushButton("OK")
+        load_button.clicked.connect(self.accept)
+
+        self.file_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit()
+        self.symbol_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit()
+        self.pattern_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit(FILE_NAME_PATTERN)
+
+        self.exchange_combo: QtWidgets.QComboBox = QtWidgets.QComboBox()
+        for i in Exchange:
+            self.exchange_combo.addItem(str(i.name), i)
+
+        self.interval_combo: QtWidgets.QComboBox = QtWidgets.QComboBox()
+        for i in Interval:
+            if i != Interval.TICK:
+                self.interval_combo.addItem(str(i.name), i)
+
+        self.tz_combo: QtWidgets.QComboBox = QtWidgets.QComboBox()
+        self.tz_combo.addItems(available_timezones())
+        self.tz_combo.setCurrentIndex(self.tz_combo.findText("Asia/Shanghai"))
+
+        self.datetime_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("datetime")
+        self.open_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("open")
+        self.high_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("high")
+        self.low_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("low")
+        self.close_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("close")
+        self.volume_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("volume")
+        self.turnover_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("turnover")
+        self.open_interest_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit(
+            "open_interest"
+        )
+
+        self.format_edit: QtWidgets.QLineEdit = QtWidgets.QLineEdit("%Y-%m-%d %H:%M:%S")
+
+        self.merge_check: QtWidgets.QCheckBox = QtWidgets.QCheckBox("Skip bars already stored")
+
+        info_label: QtWidgets.QLabel = QtWidgets.QLabel("Information")
+        info_label.setAlignment(QtCore.Qt.AlignCenter)
+
+        head_label: QtWidgets.QLabel = QtWidgets.QLabel("Head")
+        head_label.setAlignment(QtCore.Qt.AlignCenter)
+
+        format_label: QtWidgets.QLabel = QtWidgets.QLabel("Format")
+        format_label.setAlignment(QtCore.Qt.AlignCenter)
+
+        form: QtWidgets.QFormLayout = QtWidgets.QFormLayout()
+        form.addRow(file_button, self.file_edit)
+        form.addRow(QtWidgets.QLabel())
+        form.addRow(info_label)
+        if folder:
+            form.addRow("File name pattern", self.pattern_edit)
+        else:
+            form.addRow("Symbol", self.symbol_edit)
+            form.addRow("Exchange", self.exchange_combo)
+        form.addRow("Interval", self.interval_combo)
         form.addRow("Time zone", self.tz_combo)
         form.addRow(QtWidgets.QLabel())
         form.addRow(head_label)
@@ -505,6 +1643,7 @@ class ImportDialog(QtWidgets.QDialog):
         form.addRow(QtWidgets.QLabel())
         form.addRow(format_label)
         form.addRow("Time format", self.format_edit)
+        form.addRow(self.merge_check)
         form.addRow(QtWidgets.QLabel())
         form.addRow(load_button)
 
@@ -512,7 +1651,17 @@ class ImportDialog(QtWidgets.QDialog):
 
     def select_file(self) -> None:
         """"""
-        result: str = QtWidgets.QFileDialog.getOpenFileName(self, filter="CSV (*.csv)")
+        if self.folder:
+            folder: str = QtWidgets.QFileDialog.getExistingDirectory(self)
+            if folder:
+                self.file_edit.setText(folder)
+            return
+
+        suffixes: str = " ".join(f"*{reader_class.suffix}" for reader_class in BAR_READERS.values())
+
+        result: str = QtWidgets.QFileDialog.getOpenFileName(
+            self, filter=f"Data files ({suffixes});;CSV (*.csv)"
+        )
         filename: str = result[0]
         if filename:
             self.file_edit.setText(filename)
@@ -552,49 +1701,17 @@ class DownloadDialog(QtWidgets.QDialog):
             QtCore.QDate(start_dt.year, start_dt.month, start_dt.day)
         )
 
+        self.merge_check: QtWidgets.QCheckBox = QtWidgets.QCheckBox("Skip bars already stored")
+
         button: QtWidgets.QPushButton = QtWidgets.QPushButton("Download")
-        button.clicked.connect(self.download)
+        button.clicked.connect(self.accept)
 
         form: QtWidgets.QFormLayout = QtWidgets.QFormLayout()
         form.addRow("Symbol", self.symbol_edit)
         form.addRow("Exchange", self.exchange_combo)
         form.addRow("Interval", self.interval_combo)
         form.addRow("Start date", self.start_date_edit)
+        form.addRow(self.merge_check)
         form.addRow(button)
 
         self.setLayout(form)
-
-    def download(self) -> None:
-        """"""
-        symbol: str = self.symbol_edit.text()
-        exchange: Exchange = Exchange(self.exchange_combo.currentData())
-        interval: Interval = Interval(self.interval_combo.currentData())
-
-        start_date = self.start_date_edit.date()
-        start: datetime = datetime(
-            start_date.year(), start_date.month(), start_date.day()
-        )
-        start: datetime = start.replace(tzinfo=DB_TZ)
-
-        if interval == Interval.TICK:
-            count: int = self.engine.download_tick_data(
-                symbol, exchange, start, self.output
-            )
-        else:
-            count: int = self.engine.download_bar_data(
-                symbol, exchange, interval, start, self.output
-            )
-
-        QtWidgets.QMessageBox.information(
-            self, "End of download", f"Total data downloaded: {count} items"
-        )
-
-    def output(self, msg: str) -> None:
-        """Exporting logs during download"""
-        QtWidgets.QMessageBox.warning(
-            self,
-            "Data download",
-            msg,
-            QtWidgets.QMessageBox.Ok,
-            QtWidgets.QMessageBox.Ok,
-        )